@@ -3,10 +3,8 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 from datetime import date
-from backend_files.scrapper import crime_index_countries 
+from backend_files import datasets
 from frontend_files.tabs.dashboard_tab import render_dashboard_tab
-from frontend_files.tabs.summary_tab import render_summary_tab
-from frontend_files.tabs.webscrapping_tab import render_top_countries_crime_index
 
 
 ## copy and run this line in your terminal --> streamlit run frontend.py
@@ -21,17 +19,25 @@ st.set_page_config(
 
 st.title("Crime Data Dashboard")
 
-# Define tabs
-tab1, tab2, tab3 = st.tabs(["Dashboard", "Summary", "Other countries Crime Index"])
+# Reloads the data if an ingest or monthly sync has written new crimes since the last run
+datasets.refresh()
 
-with tab1:
-    render_dashboard_tab()
+# Define tabs (only the open tab runs, so the Summary and web scraping tabs load their modules when first opened)
+tab1, tab2, tab3 = st.tabs(["Dashboard", "Summary", "Other countries Crime Index"], key="main_tabs", on_change="rerun")
 
-with tab2:
-    render_summary_tab()
+if tab1.open:
+    with tab1:
+        render_dashboard_tab()
 
-with tab3:
-    render_top_countries_crime_index()
+if tab2.open:
+    with tab2:
+        from frontend_files.tabs.summary_tab import render_summary_tab
+        render_summary_tab()
+
+if tab3.open:
+    with tab3:
+        from frontend_files.tabs.webscrapping_tab import render_top_countries_crime_index
+        render_top_countries_crime_index()
 
 
 
@@ -0,0 +1,295 @@
+## ==============================================================================================================
+## Aggregate Crime Cube
+"""
+Crime counts pre-aggregated by police force × category × year × month (and optionally a lat/lon grid cell).
+The chart summaries are slices of these cubes instead of separate groupbys over the raw crime rows.
+"""
+## ==============================================================================================================
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from backend_files.crime_store import STORE_PATH, read_crimes, store_exists
+
+# Dimensions every cube is counted over
+DIMENSIONS = ["police_force_id", "category", "year", "month"]
+
+# Grid cell dimensions added to the grid cube
+CELL_DIMENSIONS = ["lat_cell", "lon_cell"]
+
+# Size of a grid cell in degrees (≈ 1km)
+GRID_SIZE = 0.01
+
+# Where the cubes are kept between runs
+CUBE_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "crime_cube.parquet"
+GRID_CUBE_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "crime_grid_cube.parquet"
+
+
+def _compact(cube, grid_size=None):
+
+    """
+
+    Gives a cube compact column types and a stable row order.
+
+    """
+
+    # Dictionary-encodes the text dimensions and shrinks the numbers
+    cube = cube.astype({"police_force_id": "category", "category": "category", "year": "int16", "month": "int8", "crime_count": "int64"})
+    if grid_size is not None:
+        cube = cube.astype({"lat_cell": "int32", "lon_cell": "int32"})
+
+    # Returns the cube sorted by its dimensions
+    return cube.sort_values(_dimensions(grid_size)).reset_index(drop=True)
+
+
+def _dimensions(grid_size=None):
+
+    """
+
+    Returns the dimensions of a cube with or without grid cells.
+
+    """
+
+    return DIMENSIONS if grid_size is None else DIMENSIONS + CELL_DIMENSIONS
+
+
+def build_cube(df, grid_size=None):
+
+    """
+
+    A function to count crimes by force, category, year and month.
+
+    Input: Cleaned crime dataframe (police_force_id, category, year and month, plus latitude and longitude for a grid).
+           Grid cell size in degrees (None for no grid).
+
+    Output: Cube dataframe with one row per non-empty combination and a crime_count column.
+
+    """
+
+    keys = df[DIMENSIONS].copy()
+
+    # Turns coordinates into integer grid cells, at the store's float32 precision so a batch counted before it is
+    # stored lands in the same cells as when the cube is rebuilt from the store
+    if grid_size is not None:
+        keys["lat_cell"] = np.floor(df["latitude"].to_numpy(dtype="float32").astype("float64") / grid_size)
+        keys["lon_cell"] = np.floor(df["longitude"].to_numpy(dtype="float32").astype("float64") / grid_size)
+        keys = keys.dropna(subset=CELL_DIMENSIONS)
+
+    # Counts crimes per combination
+    cube = keys.groupby(_dimensions(grid_size), observed=True).size().reset_index(name="crime_count")
+
+    # Returns cube
+    return _compact(cube, grid_size)
+
+
+def update_cube(cube, df_new, grid_size=None, mode="overwrite"):
+
+    """
+
+    A function to add newly fetched crimes to a cube without recounting the old rows.
+
+    Input: Existing cube. Cleaned crime dataframe for the new months. Grid cell size the cube was built with.
+           "overwrite" replaces the force/months in df_new, "append" adds to them (the same modes as write_crimes).
+
+    Output: Updated cube dataframe.
+
+    """
+
+    # Counts only the new rows
+    return merge_counts(cube, build_cube(df_new, grid_size), grid_size, mode)
+
+
+def merge_counts(cube, new, grid_size=None, mode="overwrite"):
+
+    """
+
+    A function to add a cube of new counts to an existing cube.
+
+    Input: Existing cube. Cube counted from the new crimes. Grid cell size both were built with.
+           "overwrite" replaces the force/months in new, "append" adds to them.
+
+    Output: Updated cube dataframe.
+
+    """
+
+    dimensions = _dimensions(grid_size)
+
+    # Categoricals are compared as plain strings so differing category sets still match
+    old = cube.astype({"police_force_id": str, "category": str})
+    new = new.astype({"police_force_id": str, "category": str})
+
+    if mode == "overwrite":
+        # Drops the force/months being replaced
+        replaced = pd.MultiIndex.from_frame(new[["police_force_id", "year", "month"]].drop_duplicates())
+        keep = ~pd.MultiIndex.from_frame(old[["police_force_id", "year", "month"]]).isin(replaced)
+        cube = pd.concat([old[keep], new], ignore_index=True)
+    else:
+        # Adds the new counts to any matching rows
+        cube = pd.concat([old, new], ignore_index=True).groupby(dimensions, as_index=False)["crime_count"].sum()
+
+    # Returns cube
+    return _compact(cube, grid_size)
+
+
+def slice_cube(cube, by, police_forces=None, categories=None, years=None, months=None):
+
+    """
+
+    A function to sum a cube over every dimension not in `by`.
+
+    Input: Cube dataframe. Dimensions to keep. Police force IDs, categories, years and months to keep (None for all).
+
+    Output: Dataframe with the kept dimensions and a crime_count column.
+
+    """
+
+    # Filters the requested forces, categories and months
+    for column, values in [("police_force_id", police_forces), ("category", categories), ("year", years), ("month", months)]:
+        if values is not None:
+            cube = cube[cube[column].isin(list(values))]
+
+    # Sums the remaining rows
+    if not by:
+        return pd.DataFrame({"crime_count": [cube["crime_count"].sum()]})
+    result = cube.groupby(list(by), observed=True)["crime_count"].sum().reset_index()
+
+    # Drops the unused categories left over from the full cube
+    for column in result.select_dtypes("category").columns:
+        result[column] = result[column].cat.remove_unused_categories()
+
+    # Returns dataframe
+    return result
+
+
+def load_cube(grid=False, store_path=STORE_PATH):
+
+    """
+
+    A function to load a saved cube, building it from the crime store the first time.
+
+    Input: True for the grid cube. Store path.
+
+    Output: Cube dataframe.
+
+    """
+
+    path = GRID_CUBE_PATH if grid else CUBE_PATH
+    grid_size = GRID_SIZE if grid else None
+
+    # Reads the saved cube
+    if path.exists():
+        return pd.read_parquet(path)
+
+    # Counts the stored crimes, reading only the columns the cube needs
+    columns = DIMENSIONS + (["latitude", "longitude"] if grid else [])
+    cube = build_cube(read_crimes(columns=columns, path=store_path), grid_size)
+
+    # Only saves cubes of the store, not of the CSV fallback
+    if store_exists(store_path):
+        save_cube(cube, path)
+
+    # Returns cube
+    return cube
+
+
+def save_cube(cube, path):
+
+    """
+
+    A function to save a cube.
+
+    Input: Cube dataframe. Path to write to.
+
+    Output: None.
+
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cube.to_parquet(path, index=False)
+
+
+def add_crimes_to_cubes(df, mode="overwrite"):
+
+    """
+
+    A function to update the saved cubes after new crimes are written to the store.
+    Cubes that have not been built yet are left to be built from the store on first use.
+
+    Input: Cleaned crime dataframe that was written. Write mode used ("overwrite" or "append").
+
+    Output: None.
+
+    """
+
+    delta = CubeDelta()
+    delta.add(df)
+    delta.apply(mode)
+
+
+class CubeDelta:
+
+    """
+
+    Crime counts for the batches written during a run, added up in memory so the saved cubes are read and written
+    once at the end instead of once per batch.
+
+    """
+
+    def __init__(self):
+
+        # Counts per batch for the plain cube and the grid cube
+        self.counts = {None: [], GRID_SIZE: []}
+
+    def add(self, df):
+
+        """
+
+        A function to count a batch of crimes written to the store.
+
+        Input: Cleaned crime dataframe.
+
+        Output: None.
+
+        """
+
+        if len(df):
+            for grid_size, counts in self.counts.items():
+                counts.append(build_cube(df, grid_size))
+
+    def apply(self, mode="overwrite"):
+
+        """
+
+        A function to add the counted batches to the saved cubes.
+        With "overwrite" every force/month counted replaces the cube's old counts for it, which is right when the run
+        wrote each of those force/months in full (as write_batches does).
+
+        Input: Write mode ("overwrite" or "append").
+
+        Output: None.
+
+        """
+
+        for path, grid_size in [(CUBE_PATH, None), (GRID_CUBE_PATH, GRID_SIZE)]:
+            counts = self.counts[grid_size]
+            if path.exists() and counts:
+                # Adds the batches up before touching the saved cube
+                new = pd.concat(counts, ignore_index=True).astype({"police_force_id": str, "category": str})
+                new = new.groupby(_dimensions(grid_size), as_index=False)["crime_count"].sum()
+                save_cube(merge_counts(pd.read_parquet(path), _compact(new, grid_size), grid_size, mode), path)
+            counts.clear()
+
+
+def clear_cubes():
+
+    """
+
+    A function to delete the saved cubes so they are rebuilt from the store.
+
+    """
+
+    for path in [CUBE_PATH, GRID_CUBE_PATH]:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,340 @@
+## ==============================================================================================================
+## Local police.uk API Stub
+"""
+A small in-process HTTP server that mimics the police.uk endpoints used by the backend.
+Used by the benchmarks so they can run without touching the real API.
+"""
+## ==============================================================================================================
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import shapely
+from pathlib import Path
+
+# Forces table shipped with the repo
+FORCES_CSV = Path(__file__).parent / "data" / "forces.csv"
+
+# Crime categories returned by the stub
+CATEGORIES = [
+    "anti-social-behaviour", "bicycle-theft", "burglary", "criminal-damage-arson", "drugs",
+    "other-theft", "possession-of-weapons", "public-order", "robbery", "shoplifting",
+    "theft-from-the-person", "vehicle-crime", "violent-crime", "other-crime",
+]
+
+# Outcome categories returned by the stub (None means no outcome yet)
+OUTCOMES = [
+    None,
+    "Investigation complete; no suspect identified",
+    "Unable to prosecute suspect",
+    "Under investigation",
+    "Awaiting court outcome",
+    "Local resolution",
+]
+
+# (latitude, longitude, weight) of the population centres crimes are clustered around
+CITY_CENTRES = [
+    (51.507, -0.128, 10), (52.486, -1.890, 4), (53.480, -2.242, 4), (53.800, -1.549, 3),
+    (52.637, -1.135, 2), (53.408, -2.991, 3), (51.455, -2.588, 2), (54.978, -1.618, 2),
+    (53.383, -1.466, 2), (52.954, -1.158, 2), (51.481, -3.179, 2), (50.376, -4.143, 1),
+    (50.909, -1.404, 1), (52.206, 0.119, 1), (51.752, -1.258, 1), (52.629, 1.293, 1),
+]
+
+
+def make_synthetic_crimes(n_crimes=200_000, months=("2025-08", "2025-09", "2025-10"), seed=0):
+
+    """
+
+    A function to generate synthetic crimes clustered around UK cities.
+
+    Input: Number of crimes. List of months. Random seed.
+
+    Output: Dataframe with id, category, latitude, longitude, month, street_id and outcome columns.
+
+    """
+
+    # Creates a reproducible random generator
+    rng = np.random.default_rng(seed)
+
+    # Picks a city for each crime weighted by size
+    centres = np.array([(lat, lon) for lat, lon, _ in CITY_CENTRES])
+    weights = np.array([w for _, _, w in CITY_CENTRES], dtype=float)
+    city = rng.choice(len(centres), size=n_crimes, p=weights / weights.sum())
+
+    # Scatters crimes around each city
+    spread = rng.exponential(0.05, size=n_crimes)[:, None]
+    coords = centres[city] + rng.normal(size=(n_crimes, 2)) * spread
+
+    # Builds the crime table
+    return pd.DataFrame({
+        "id": np.arange(100_000_000, 100_000_000 + n_crimes),
+        "category": rng.integers(0, len(CATEGORIES), n_crimes),
+        "latitude": coords[:, 0].round(6),
+        "longitude": coords[:, 1].round(6),
+        "month": np.asarray(months)[rng.integers(0, len(months), n_crimes)],
+        "street_id": rng.integers(0, 5_000, n_crimes),
+        "outcome": rng.integers(0, len(OUTCOMES), n_crimes),
+    })
+
+
+def crime_to_record(row):
+
+    """
+
+    A function to convert a synthetic crime row into the police.uk JSON shape.
+
+    Input: Crime row (namedtuple).
+
+    Output: Dictionary matching the crimes-street response.
+
+    """
+
+    # Builds the outcome status (None when there is no outcome)
+    outcome = OUTCOMES[row.outcome]
+    outcome_status = None if outcome is None else {"category": outcome, "date": row.month}
+
+    # Returns the record
+    return {
+        "category": CATEGORIES[row.category],
+        "location_type": "Force",
+        "location": {
+            "latitude": f"{row.latitude:.6f}",
+            "street": {"id": int(row.street_id), "name": f"On or near Street {row.street_id}"},
+            "longitude": f"{row.longitude:.6f}",
+        },
+        "context": "",
+        "outcome_status": outcome_status,
+        "persistent_id": hashlib.sha256(str(row.id).encode()).hexdigest(),
+        "id": int(row.id),
+        "location_subtype": "",
+        "month": row.month,
+    }
+
+
+def parse_poly_string(poly_str):
+
+    """
+
+    A function to convert a police.uk poly string into a Shapely polygon.
+
+    Input: Polygon string of "lat,lng:lat,lng:..." pairs.
+
+    Output: Shapely polygon object in (lng, lat) order.
+
+    """
+
+    # Splits the string into (lng, lat) pairs
+    points = [tuple(map(float, pair.split(","))) for pair in poly_str.split(":")]
+    return shapely.Polygon([(lng, lat) for lat, lng in points])
+
+
+class StubPoliceAPI:
+
+    """
+
+    A local HTTP server that answers the police.uk endpoints from synthetic data.
+
+    Input: Crime dataframe (defaults to synthetic crimes). Seconds of artificial latency per request.
+           Maximum crimes per response before answering 503, like the real API.
+
+    Responses queued in `failures` as (status code, headers) tuples are sent, one per request, before any real answer.
+
+    """
+
+    def __init__(self, crimes=None, latency=0.0, crime_cap=10_000, port=0):
+
+        # Stores the crimes and server settings
+        self.crimes = make_synthetic_crimes() if crimes is None else crimes
+        self.latency = latency
+        self.crime_cap = crime_cap
+        self.port = port
+
+        # Error responses to send first, e.g. [(429, {"Retry-After": "2"}), (503, {})]
+        self.failures = []
+
+        # Counters read by the benchmarks
+        self.request_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+        # Crimes split by month, built on the first query
+        self._by_month = None
+
+    # == Query handlers ==
+    def months(self):
+
+        # Returns the available months, newest first
+        return sorted(self.crimes_by_month(), reverse=True)
+
+    def crimes_by_month(self):
+
+        """
+
+        Returns the crimes split into one dataframe per month, splitting the table on first use.
+
+        """
+
+        with self._lock:
+            if self._by_month is None:
+                self._by_month = dict(tuple(self.crimes.groupby("month")))
+
+        return self._by_month
+
+    def street_crimes(self, poly_str, month=None):
+
+        """
+
+        Returns the crimes inside a polygon for one month, or None when the cap is exceeded.
+
+        """
+
+        # Defaults to the latest month, like the real API
+        month = month or self.months()[0]
+        df = self.crimes_by_month().get(month, self.crimes.iloc[:0])
+
+        # Filters to the polygon's bounding box before the exact test
+        polygon = parse_poly_string(poly_str)
+        min_lng, min_lat, max_lng, max_lat = polygon.bounds
+        df = df[df["longitude"].between(min_lng, max_lng) & df["latitude"].between(min_lat, max_lat)]
+        df = df[shapely.contains_xy(polygon, df["longitude"].to_numpy(), df["latitude"].to_numpy())]
+
+        # Refuses oversized queries
+        if len(df) > self.crime_cap:
+            return None
+
+        return [crime_to_record(row) for row in df.itertuples(index=False)]
+
+    def handle(self, path, query):
+
+        """
+
+        Routes a request to the matching endpoint.
+
+        Output: (status code, JSON-serialisable body).
+
+        """
+
+        # Drops the /api prefix of the base URL
+        parts = [p for p in path.split("/") if p][1:]
+
+        if parts == ["forces"]:
+            forces = pd.read_csv(FORCES_CSV)
+            return 200, [{"id": r.police_force_id, "name": r.police_force_name} for r in forces.itertuples()]
+
+        if parts == ["crimes-street-dates"]:
+            return 200, [{"date": m, "stop-and-search": []} for m in self.months()]
+
+        if parts[:1] == ["crimes-street"] and "poly" in query:
+            crimes = self.street_crimes(query["poly"][0], query.get("date", [None])[0])
+            return (503, "") if crimes is None else (200, crimes)
+
+        if len(parts) == 2 and parts[1] == "neighbourhoods":
+            return 200, [{"id": f"{parts[0]}-{i}", "name": f"Neighbourhood {i}"} for i in range(3)]
+
+        if len(parts) == 2:
+            return 200, {"id": parts[1], "name": f"Neighbourhood {parts[1]}", "url_force": "", "contact_details": {}}
+
+        return 404, {"error": "not found"}
+
+    # == Server lifecycle ==
+    def start(self):
+
+        """
+
+        Starts the server on a background thread.
+
+        Output: Base URL of the stub.
+
+        """
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+
+                # Simulates network latency
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                # Sends a queued failure, or answers the request
+                with stub._lock:
+                    failure = stub.failures.pop(0) if stub.failures else None
+                if failure is not None:
+                    (status, headers), body = failure, {"error": "injected failure"}
+                else:
+                    url = urlparse(self.path)
+                    (status, body), headers = stub.handle(url.path, parse_qs(url.query)), {}
+                payload = json.dumps(body).encode()
+
+                # Compresses the payload if the client accepts gzip
+                gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+                if gzipped:
+                    payload = gzip.compress(payload, compresslevel=1)
+
+                # Updates the counters
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.bytes_sent += len(payload)
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+
+                # Keeps benchmark output quiet
+                pass
+
+        # Starts the server thread
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        return self.url
+
+    @property
+    def url(self):
+
+        # Base URL in the same form as the real API
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api"
+
+    def stop(self):
+
+        # Shuts the server down
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # Serves the stub until interrupted
+    stub = StubPoliceAPI()
+    print(f"Stub police.uk API running at {stub.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.stop()
@@ -1,14 +1,63 @@
 #Import Libraries
-import requests
+import logging
+import threading
+from collections import defaultdict, deque
+import orjson
 import pandas as pd
 import numpy as np
-import geopandas as gpd
+import pyarrow as pa
+import pyarrow.compute as pc
 from shapely.ops import triangulate
 from shapely.geometry import Polygon
 import mapbox_earcut as earcut
+import shapely
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
+from backend_files.fetch_engine import fetch_concurrently, DEFAULT_MAX_WORKERS
+from backend_files.http_client import api_get
+from backend_files.response_cache import get_response_cache
+from backend_files.triangle_index import has_force, get_force_triangles
+from backend_files.crime_store import write_crimes
+from backend_files.aggregate_cube import add_crimes_to_cubes
+from backend_files.datasets import invalidate
+from backend_files.tile_pyramid import rebuild_tiles
+from backend_files.outcomes import add_outcome_columns
+
+# Base URL of the police.uk API (overridden by the benchmarks to point at a local stub)
+API_BASE_URL = "https://data.police.uk/api"
+
+# Folder holding the force KML boundaries and reference CSVs
+DATA_DIR = Path(__file__).parent / "data"
+
+# Most vertices sent in one poly string, which keeps the GET URL short (about 2 KB)
+MAX_POLY_VERTICES = 100
+
+# Deepest a single triangle is subdivided after it overflows the API's crime cap
+MAX_SPLIT_DEPTH = 8
+
+# Cached in place of a response when police.uk refuses a polygon for having too many crimes
+TOO_MANY_CRIMES = b"__too_many_crimes__"
+
+logger = logging.getLogger(__name__)
+
+# Query polygons split after hitting the crime cap, and ones still over it at MAX_SPLIT_DEPTH whose crimes are missing
+_split_stats = {"splits": 0, "unfetched_polygons": 0}
+_split_stats_lock = threading.Lock()
+
+# Shape of the location field in crimes-street responses (coordinates arrive as strings)
+LOCATION_TYPE = pa.struct([
+    ("latitude", pa.string()),
+    ("street", pa.struct([("id", pa.int64()), ("name", pa.string())])),
+    ("longitude", pa.string()),
+])
+
+
+class TooManyCrimesError(Exception):
+
+    """
+
+    Raised when police.uk answers 503 because a polygon holds more than 10,000 crimes.
+
+    """
 
 ## ==============================================================================================================
 ## Get Police Force Table from API
@@ -27,8 +76,8 @@ def get_forces():
     """
 
     # Defines the connection to the API
-    url = "https://data.police.uk/api/forces"
-    response = requests.get(url)
+    url = f"{API_BASE_URL}/forces"
+    response = api_get(url, endpoint="forces")
 
     # Raises exception if connection fails
     if response.status_code != 200:                                 
@@ -47,6 +96,30 @@ def get_forces():
     return df
 
 
+def get_available_months():
+
+    """
+
+    A function to get the months police.uk has street-level crimes for.
+
+    Input: None.
+
+    Output: List of months as "YYYY-MM", newest first.
+
+    """
+
+    # Defines the connection to the API
+    url = f"{API_BASE_URL}/crimes-street-dates"
+    response = api_get(url, endpoint="crimes-street-dates")
+
+    # Raises exception if connection fails
+    if response.status_code != 200:
+        raise Exception(f"API error: {response.status_code}")
+
+    # Returns the months, newest first
+    return sorted((entry["date"] for entry in response.json()), reverse=True)
+
+
 ## ==============================================================================================================
 ## Get Neighbourhood Table from API
 ## ==============================================================================================================
@@ -65,8 +138,8 @@ def get_neighbourhood(id):
     """
 
     # Defines the connection to the API
-    url = f"https://data.police.uk/api/{id}/neighbourhoods"     # Defines the API url 
-    response = requests.get(url)                                # Defines the responce after we 'get' the url
+    url = f"{API_BASE_URL}/{id}/neighbourhoods"     # Defines the API url 
+    response = api_get(url, endpoint="neighbourhoods")          # Defines the responce after we 'get' the url
     
     # Raises exception if connection fails
     if response.status_code != 200:
@@ -130,39 +203,122 @@ def get_kml(neighbourhood_id):
     """
 
     # Get pathfile from neighbourhood ID
-    return f"data/{neighbourhood_id}.kml"
+    return str(DATA_DIR / f"{neighbourhood_id}.kml")
 
 
 
-def get_street_level_crimes(poly_str):
+def get_street_level_crimes(poly_str, date=None, use_cache=True):
 
     """
     
     Defines the function to call the API and retrieve the neighbourhood boundaries data table.
 
-    Input: A polygon string defining the area to get street-level crimes for.
+    Input: A polygon string defining the area to get street-level crimes for. Month as "YYYY-MM" (None for the latest month).
+           Whether to read and write the on-disk response cache.
 
     Output: Street-level crime dataframe for the neighbourhood.
 
     """
 
-    # Defines the connection to the API
-    url = f"https://data.police.uk/api/crimes-street/all-crime?poly={poly_str}"
-    response = requests.get(url)
-    
-    # Raises exception if connection fails
-    if response.status_code != 200:
-        raise Exception(f"API error: {response.status_code}")
+    # Checks the on-disk cache first
+    cache = get_response_cache() if use_cache else None
+    payload = cache.get("crimes-street", poly_str, date) if cache else None
+
+    if payload is None:
+
+        # Defines the connection to the API
+        # A 503 here means the area has too many crimes, so retrying would not help
+        url = f"{API_BASE_URL}/crimes-street/all-crime?poly={poly_str}"
+        if date is not None:
+            url += f"&date={date}"
+        response = api_get(url, endpoint="crimes-street", retry_statuses=(429, 500, 502, 504))
+
+        # Remembers oversized polygons so re-runs split them straight away
+        if response.status_code == 503:
+            payload = TOO_MANY_CRIMES
+
+        # Raises exception if connection fails
+        elif response.status_code != 200:
+            raise Exception(f"API error: {response.status_code}")
+
+        else:
+            payload = response.content
+
+        # Stores the raw response for next time
+        if cache:
+            cache.put("crimes-street", poly_str, date, payload)
+
+    # Raises a specific error so the caller can split the polygon
+    if payload == TOO_MANY_CRIMES:
+        raise TooManyCrimesError("API error: 503")
     
-    # Convert responce to json
-    data = response.json()
+    # Returns the decoded dataframe
+    return parse_street_crimes(payload)
 
-    # Converts json to dataframe
-    df = pd.DataFrame(data)
+
+def parse_street_crimes(payload):
+
+    """
+
+    A function to decode a crimes-street response straight into flat columns.
+
+    Input: Response body as bytes.
+
+    Output: Street-level crime dataframe with latitude, longitude and street_name in place of location,
+            and outcome_category and outcome_month in place of outcome_status.
+
+    """
+
+    # Decodes the JSON array of crimes
+    df = pd.DataFrame(orjson.loads(payload))
+
+    # Replaces the nested location dictionaries with typed columns
+    if "location" in df.columns:
+        df = pd.concat([df.drop(columns=["location"]), flatten_locations(df["location"])], axis=1)
+
+    # Replaces the outcome dictionaries with outcome_category and outcome_month
+    df = add_outcome_columns(df)
 
     # Returns dataframe
     return df
 
+
+def _to_float32(strings):
+
+    """
+
+    Casts an Arrow array of numeric strings to float32, turning anything unparseable into NaN.
+
+    """
+
+    try:
+        return pc.cast(strings, pa.float32()).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid:
+        return pd.to_numeric(strings.to_pandas(), errors="coerce").to_numpy(dtype="float32")
+
+
+def flatten_locations(locations):
+
+    """
+
+    A function to turn the nested location dictionaries into columns in one vectorised pass.
+
+    Input: Series or list of location dictionaries.
+
+    Output: Dataframe with float32 latitude and longitude, and street_name.
+
+    """
+
+    # Converts every dictionary into one Arrow struct array
+    struct = pa.array(list(locations), type=LOCATION_TYPE)
+
+    # Pulls each field out as a column
+    return pd.DataFrame({
+        "latitude": _to_float32(pc.struct_field(struct, "latitude")),
+        "longitude": _to_float32(pc.struct_field(struct, "longitude")),
+        "street_name": pc.struct_field(struct, ["street", "name"]).to_pandas(),
+    })
+
 def load_polygon_from_kml(filepath):
 
     """
@@ -175,6 +331,9 @@ def load_polygon_from_kml(filepath):
 
     """
 
+    # Imported here so geopandas is only loaded when a KML is parsed (the triangle index is built from them once)
+    import geopandas as gpd
+
     # Loads KML file using geopandas
     gdf = gpd.read_file(filepath, driver="LIBKML")
 
@@ -184,26 +343,63 @@ def load_polygon_from_kml(filepath):
     # Returns polygon
     return polygon
 
-def triangulate_polygon(polygon):
+def earcut_polygon(polygon):
+
+    """
+
+    A function to triangulate a polygon with constrained earcut, which follows its rings exactly.
+
+    Input: Shapely polygon or multipolygon object.
+
+    Output: Array of triangle corners with shape (n, 3, 2).
+
+    """
+
+    all_corners = []
+
+    # Triangulates each part of a multipolygon (e.g. coastal forces with islands) separately
+    for part in getattr(polygon, "geoms", [polygon]):
+
+        # Stacks the exterior and hole rings without their repeated closing points
+        rings = [shapely.get_coordinates(ring)[:-1] for ring in [part.exterior, *part.interiors]]
+        vertices = np.concatenate(rings)
+        ring_ends = np.cumsum([len(ring) for ring in rings]).astype(np.uint32)
+
+        # Earcut returns three vertex indices per triangle
+        indices = earcut.triangulate_float64(vertices, ring_ends)
+        all_corners.append(vertices[indices.reshape(-1, 3)])
+
+    # Returns all corners
+    return np.concatenate(all_corners) if all_corners else np.empty((0, 3, 2))
+
+
+def triangulate_polygon(polygon, method="earcut"):
 
     """
 
     A function to triangulate a polygon into smaller triangles.
 
-    Input: Shapely polygon object.
+    Input: Shapely polygon or multipolygon object. "earcut" (follows the boundary exactly)
+           or "delaunay" (Delaunay triangles whose centroid is inside the polygon).
 
     Output: List of Shapely triangle objects.
 
     """
 
+    # Triangulates along the polygon rings
+    if method == "earcut":
+        return list(shapely.polygons(earcut_polygon(polygon)))
+
     # Triangulates polygon
-    triangles = triangulate(polygon)
+    triangles = np.asarray(triangulate(polygon))
 
-    # Keeps only triangles fully inside the polygon
-    triangles = [t for t in triangles if polygon.contains(t.centroid)]
+    # Keeps only triangles whose centroid is inside the polygon, tested in one vectorised call
+    shapely.prepare(polygon)
+    centroids = shapely.get_coordinates(shapely.centroid(triangles))
+    inside = shapely.contains_xy(polygon, centroids[:, 0], centroids[:, 1])
 
     # Returns list of triangles
-    return triangles
+    return list(triangles[inside])
 
 def triangle_to_poly_string(triangle):
     
@@ -220,13 +416,181 @@ def triangle_to_poly_string(triangle):
     # Gets triangle coordinates
     coords = list(triangle.exterior.coords)[:-1]  # remove repeated closing point
 
-    # convert (lng, lat) → (lat, lng)
+    # convert (lng, lat) → (lat, lng), rounded to 6 decimal places (~0.1m) to keep the URL short
     return ":".join(
-        f"{coord[1]},{coord[0]}"
+        f"{coord[1]:.6f},{coord[0]:.6f}"
         for coord in coords
     )
 
 
+def split_triangle(triangle):
+
+    """
+
+    A function to split a triangle into four smaller triangles through its edge midpoints.
+
+    Input: Shapely triangle object.
+
+    Output: List of four Shapely triangle objects.
+
+    """
+
+    # Gets the corners and edge midpoints
+    a, b, c = [np.array(coord) for coord in list(triangle.exterior.coords)[:3]]
+    ab, bc, ca = (a + b) / 2, (b + c) / 2, (c + a) / 2
+
+    # Returns the three corner triangles and the middle one
+    return [Polygon([a, ab, ca]), Polygon([ab, b, bc]), Polygon([ca, bc, c]), Polygon([ab, bc, ca])]
+
+
+def _finalise_group(triangles):
+
+    """
+
+    Turns a list of connected triangles into query groups, halving it if the union is not one simple polygon.
+
+    Input: List of Shapely triangle objects (in growth order).
+
+    Output: List of (query polygon, triangles it covers) tuples.
+
+    """
+
+    # A single triangle is always a valid query
+    if len(triangles) == 1:
+        return [(triangles[0], triangles)]
+
+    # Merges the triangles and drops collinear vertices
+    merged = shapely.union_all(triangles).simplify(0)
+    if merged.geom_type == "Polygon" and len(merged.interiors) == 0:
+        return [(merged, triangles)]
+
+    # Otherwise splits the group in half and tries again
+    half = len(triangles) // 2
+    return _finalise_group(triangles[:half]) + _finalise_group(triangles[half:])
+
+
+def plan_query_groups(triangles, max_vertices=MAX_POLY_VERTICES):
+
+    """
+
+    A function to merge neighbouring triangles into as few query polygons as possible.
+
+    Input: List of Shapely triangle objects. Most vertices allowed in one query polygon.
+
+    Output: List of (query polygon, triangles it covers) tuples.
+
+    """
+
+    # Keys each corner by its rounded coordinates so shared corners match exactly
+    corners = [[tuple(np.round(coord, 9)) for coord in list(t.exterior.coords)[:3]] for t in triangles]
+    edges = [[frozenset((c[0], c[1])), frozenset((c[1], c[2])), frozenset((c[2], c[0]))] for c in corners]
+
+    # Maps every edge to the triangles that share it
+    edge_to_triangles = defaultdict(list)
+    for i, triangle_edges in enumerate(edges):
+        for edge in triangle_edges:
+            edge_to_triangles[edge].append(i)
+
+    # Tracks which triangles already belong to a group
+    assigned = [False] * len(triangles)
+    groups = []
+
+    for seed in range(len(triangles)):
+        if assigned[seed]:
+            continue
+
+        # Starts a new group from the seed triangle
+        assigned[seed] = True
+        members = [seed]
+        vertices = set(corners[seed])
+        queue = deque([seed])
+
+        # Grows the group across shared edges while it stays under the vertex limit
+        while queue:
+            i = queue.popleft()
+            for edge in edges[i]:
+                for j in edge_to_triangles[edge]:
+                    if assigned[j] or len(vertices | set(corners[j])) > max_vertices:
+                        continue
+                    assigned[j] = True
+                    members.append(j)
+                    vertices.update(corners[j])
+                    queue.append(j)
+
+        # Converts the group into query polygons
+        groups.extend(_finalise_group([triangles[i] for i in members]))
+
+    # Returns list of groups
+    return groups
+
+
+def get_street_level_crimes_adaptive(group, date=None, depth=0):
+
+    """
+
+    A function to get the crimes for a query group, splitting it whenever the API's crime cap is hit.
+    A polygon still over the cap after MAX_SPLIT_DEPTH splits is logged, counted in get_split_stats() and skipped,
+    so the rest of the group's crimes are still returned.
+
+    Input: (query polygon, triangles) tuple from plan_query_groups. Month (None for the latest month). Current split depth.
+
+    Output: List of street-level crime dataframes.
+
+    """
+
+    polygon, triangles = group
+
+    try:
+        # Queries the whole group in one request
+        return [get_street_level_crimes(triangle_to_poly_string(polygon), date)]
+
+    except TooManyCrimesError:
+
+        # Splits a merged group into smaller groups with half the vertices
+        if len(triangles) > 1:
+            subgroups = plan_query_groups(triangles, max_vertices=max(3, (len(polygon.exterior.coords) - 1) // 2))
+
+        # Subdivides a single overflowing triangle
+        elif depth < MAX_SPLIT_DEPTH:
+            subgroups = [(t, [t]) for t in split_triangle(triangles[0])]
+            depth += 1
+
+        # Stops splitting rather than recursing forever, keeping what the other polygons returned
+        else:
+            logger.warning("Polygon %s (month %s) is still over the crime cap after %d splits; its crimes are left out",
+                           triangle_to_poly_string(polygon), date or "latest", depth)
+            with _split_stats_lock:
+                _split_stats["unfetched_polygons"] += 1
+            return []
+
+    with _split_stats_lock:
+        _split_stats["splits"] += 1
+
+    # Fetches every subgroup, splitting further if needed
+    dfs = []
+    for subgroup in subgroups:
+        dfs.extend(get_street_level_crimes_adaptive(subgroup, date, depth))
+
+    # Returns list of dataframes
+    return dfs
+
+
+def get_split_stats():
+
+    """
+
+    A function to report how often query polygons were split, and how many could not be fetched at all.
+
+    Input: None.
+
+    Output: Dictionary with splits and unfetched_polygons.
+
+    """
+
+    with _split_stats_lock:
+        return dict(_split_stats)
+
+
 def simplify_polygon(polygon, tolerance=0.0005):
 
     """
@@ -243,44 +607,59 @@ def simplify_polygon(polygon, tolerance=0.0005):
     # Simplifies polygon
     return polygon.simplify(tolerance, preserve_topology=True)
 
-def process_kml_file_to_dataframe(police_force_id):
+def get_force_query_groups(police_force_id):
 
     """
 
-    A function to process a KML file and retrieve street-level crime data for the area.
+    A function to get the query polygons covering a police force's area.
 
-    Input: Filepath to the KML file.
+    Input: Police force ID.
 
-    Output: Street-level crime dataframe for the area.
+    Output: List of (query polygon, triangles) tuples from plan_query_groups.
 
     """
 
-    # Get KML filepath
-    kml_path = get_kml(police_force_id)
+    # Uses the precomputed triangles when the force is in the index
+    if has_force(police_force_id):
+        triangles = get_force_triangles(police_force_id)
 
-    # Loads polygon
-    polygon = load_polygon_from_kml(kml_path)
+    else:
+        # Get KML filepath
+        kml_path = get_kml(police_force_id)
 
-    # Simplifies polygon
-    polygon = simplify_polygon(polygon)
+        # Loads polygon
+        polygon = load_polygon_from_kml(kml_path)
 
-    # Triangulates polygon
-    triangles = triangulate_polygon(polygon)
+        # Simplifies polygon
+        polygon = simplify_polygon(polygon)
 
-    # Initialises a list to collect each triangle's dataframe
-    all_dfs = []
+        # Triangulates polygon
+        triangles = triangulate_polygon(polygon)
 
-    # Gets dataframa for each triangle
-    for tri in triangles:
-        
-        # Converts the triangles to lists of coordiante strings
-        poly_str = triangle_to_poly_string(tri)
+    # Merges sparse triangles into larger query polygons
+    return plan_query_groups(triangles)
 
-        # Calls the API and gets the dataframe
-        df = get_street_level_crimes(poly_str)
 
-        # Combine dataframes
-        all_dfs.append(df)
+def process_kml_file_to_dataframe(police_force_id, max_workers=DEFAULT_MAX_WORKERS):
+
+    """
+
+    A function to process a KML file and retrieve street-level crime data for the area.
+
+    Input: Police force ID. Maximum number of query polygons fetched at once.
+
+    Output: Street-level crime dataframe for the area.
+
+    """
+
+    # Plans the query polygons for the force
+    groups = get_force_query_groups(police_force_id)
+
+    # Calls the API for every group in parallel, splitting any group that hits the crime cap
+    results = fetch_concurrently(get_street_level_crimes_adaptive, groups, max_workers=max_workers)
+
+    # Flattens the results, keeping the group order
+    all_dfs = [df for dfs in results for df in dfs]
 
     # Checks that data has been collected, returns blank dataframe if no data is collected
     if len(all_dfs) == 0:
@@ -339,8 +718,8 @@ def get_specific_neighbourhood(police_force_id, neighbourhood_id):
     """
 
     # Defines the connection to the API
-    url = f"https://data.police.uk/api/{police_force_id}/{neighbourhood_id}"
-    response = requests.get(url)
+    url = f"{API_BASE_URL}/{police_force_id}/{neighbourhood_id}"
+    response = api_get(url, endpoint="neighbourhood")
     
     # Raises exception if connection fails
     if response.status_code != 200:
@@ -398,16 +777,17 @@ def fill_blank_outcome_status(df):
 
     """
 
-    A function to fill blank outcome status values with 'Unknown'.
+    A function to fill blank outcome category values with 'Unknown'.
 
-    Input: Crime dataframe.
+    Input: Crime dataframe with an outcome_category column.
 
-    Output: Crime dataframe with filled outcome status values.
+    Output: Crime dataframe with filled outcome category values.
 
     """
 
-    # Fills nulls in the outcome column with 'Unknown'
-    df["outcome_status"] = df["outcome_status"].fillna("Unknown")
+    # Fills nulls in the outcome column with 'Unknown', keeping it categorical
+    df["outcome_category"] = df["outcome_category"].astype(object).fillna("Unknown").astype("category")
+    df["outcome_month"] = df["outcome_month"].astype("category")
 
     # Returns dataframe
     return df
@@ -428,20 +808,26 @@ def extract_coordinates_and_street(df):
     """
 
     A function to extract latitude, longitude and street name from the location column.
+    Rows decoded by parse_street_crimes are already flat, so only their types are set.
 
     Input: Crime dataframe.
 
-    Output: Crime dataframe with new latitude, longitude and street name columns.
+    Output: Crime dataframe with float32 latitude and longitude and a categorical street name.
 
     """
 
     # Extracts coordinates and street name from location column
-    coords = pd.json_normalize(df["location"])
-    df["latitude"] = pd.to_numeric(coords["latitude"], errors="coerce")
-    df["longitude"] = pd.to_numeric(coords["longitude"], errors="coerce")
-    df["street_name"] = coords["street.name"]
-    df.drop(columns=["location"], inplace=True)
-    
+    if "location" in df.columns:
+        coords = flatten_locations(df["location"])
+        df = df.drop(columns=["location"])
+        for col in ["latitude", "longitude", "street_name"]:
+            df[col] = coords[col].to_numpy()
+
+    # Float32 coordinates and a dictionary-encoded street name
+    df["latitude"] = df["latitude"].astype("float32")
+    df["longitude"] = df["longitude"].astype("float32")
+    df["street_name"] = df["street_name"].astype("category")
+
     # Returns dataframe
     return df
 
@@ -523,6 +909,9 @@ def cleaning(df):
 
     """
 
+    # Splits any outcome dictionaries still left into outcome_category and outcome_month
+    df = add_outcome_columns(df)
+
     # Fills blank outcome status values
     df = fill_blank_outcome_status(df)
 
@@ -539,6 +928,40 @@ def cleaning(df):
     return df
 
 
+def get_clean_and_store_crimes(police_forces):
+
+    """
+
+    A function to fetch, clean and save the street-level crimes for a list of police forces.
+
+    Input: List of police force IDs.
+
+    Output: Cleaned crime dataframe (also written to the Parquet crime store).
+
+    """
+
+    # Gets crime frame for all regions
+    df_crimes = get_crime_for_all_regions(police_forces)
+
+    # Cleans the crime frame
+    df_crimes = cleaning(df_crimes)
+
+    # Saves the crimes to the store, replacing these forces' months
+    write_crimes(df_crimes)
+
+    # Adds the new months to the saved aggregate cubes and rebuilds the map tile pyramid
+    add_crimes_to_cubes(df_crimes)
+    rebuild_tiles()
+
+    # Makes the dashboard reload the crimes on next use
+    invalidate("crimes")
+    invalidate("cube")
+    invalidate("tiles")
+
+    # Returns cleaned dataframe
+    return df_crimes
+
+
 # == Testing area for backend functions ==
 if __name__ == "__main__":
     # Example: Get forces
@@ -546,17 +969,14 @@ if __name__ == "__main__":
     forces_df.to_csv("forces.csv")
     print("Police Forces:")
     print(forces_df.head())
-# Cleaned population csv
-df_population = clean_population_df(pd.read_csv("data/population_data.csv"))
-df_population.to_csv("cleaned_population.csv",index=False)
+    # Cleaned population csv
+    df_population = clean_population_df(pd.read_csv(DATA_DIR / "population_data.csv"))
+    df_population.to_csv(DATA_DIR / "cleaned_population.csv", index=False)
 # ## ==== Defining Police Forces List for Testing ====
 # police_forces = ["bedfordshire", "hertfordshire", "thames-valley"]
 
-# # == Get Crime frame for all regions ==
-# df_crimes = get_crime_for_all_regions(police_forces)
-# df_crimes = cleaning(df_crimes)
+# # == Get, clean and store crime frame for all regions ==
+# df_crimes = get_clean_and_store_crimes(police_forces)
 # print("Crime Dataframe:")
-# print(df_crimes.head())
-# # Save df_crimes to CSV
-# df_crimes.to_csv("test_crime_data.csv", index=False)    
+# print(df_crimes.head())    
 
@@ -0,0 +1,1181 @@
+## ==============================================================================================================
+## Backend Benchmarks
+"""
+Benchmarks for the backend modules, run against the local police.uk stub or synthetic crimes.
+
+Usage: python -m backend_files.benchmarks <name>
+"""
+## ==============================================================================================================
+
+import ast
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.ops import triangulate
+from backend_files import (aggregate_cube, backend_functions, crime_density, crime_over_time, crime_store, crime_types_force, datasets, geocoder,
+                           http_client, ingest_pipeline, lollipop_functions, monthly_sync, outcomes, prompt_digest, prompt_function,
+                           response_cache, summary_cache, tile_pyramid, triangle_index)
+from backend_files.api_stub import CATEGORIES, StubPoliceAPI, crime_to_record, make_synthetic_crimes
+from backend_files.fetch_engine import POLICE_API_LIMITER, fetch_concurrently
+
+
+def use_stub_environment():
+
+    """
+
+    Points the backend at a throwaway response cache and lifts the rate limit for the local stub.
+
+    """
+
+    # Keeps stub responses out of the real cache
+    response_cache._response_cache = response_cache.ResponseCache(Path(tempfile.mkdtemp()) / "responses.sqlite")
+
+    # The stub has no rate limit
+    POLICE_API_LIMITER.rate = POLICE_API_LIMITER.burst = 1e9
+
+
+def use_empty_summary_cache():
+
+    """
+
+    Points the LLM summaries at a throwaway summary cache, so every prompt needs a completion and the real cache is left alone.
+
+    Output: SummaryCache object.
+
+    """
+
+    summary_cache._summary_cache = summary_cache.SummaryCache(Path(tempfile.mkdtemp()) / "summaries.sqlite")
+    return summary_cache._summary_cache
+
+
+def benchmark_adaptive_split(police_forces=("city-of-london", "leicestershire", "metropolitan", "devon-and-cornwall"), crime_cap=2_000):
+
+    """
+
+    Compares the requests made by the fixed triangulation against adaptive query polygons.
+    The stub's crime cap is lowered so the synthetic data overflows like a dense real month would.
+
+    Input: List of police force IDs. Crimes allowed per response.
+
+    Output: Dataframe with one row per force.
+
+    """
+
+    rows = []
+    use_stub_environment()
+
+    with StubPoliceAPI(crime_cap=crime_cap) as stub:
+        backend_functions.API_BASE_URL = stub.url
+
+        for police_force_id in police_forces:
+
+            # Builds the fixed triangulation
+            polygon = backend_functions.simplify_polygon(backend_functions.load_polygon_from_kml(backend_functions.get_kml(police_force_id)))
+            triangles = backend_functions.triangulate_polygon(polygon)
+
+            # Fixed triangulation: one request per triangle, failing on any overflow
+            before = stub.request_count
+            fixed_ids, overflowed = set(), 0
+            for tri in triangles:
+                try:
+                    df = backend_functions.get_street_level_crimes(backend_functions.triangle_to_poly_string(tri), use_cache=False)
+                    fixed_ids.update(df.get("id", []))
+                except backend_functions.TooManyCrimesError:
+                    overflowed += 1
+            fixed_requests = stub.request_count - before
+
+            # Adaptive: merged query polygons, split only where the crime cap is hit
+            before = stub.request_count
+            adaptive_ids = set()
+            for group in backend_functions.plan_query_groups(triangles):
+                for df in backend_functions.get_street_level_crimes_adaptive(group):
+                    adaptive_ids.update(df.get("id", []))
+            adaptive_requests = stub.request_count - before
+
+            rows.append({
+                "police_force_id": police_force_id,
+                "fixed_requests": fixed_requests,
+                "fixed_overflowed": overflowed,
+                "fixed_crimes": len(fixed_ids),
+                "adaptive_requests": adaptive_requests,
+                "adaptive_crimes": len(adaptive_ids),
+            })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_triangulation():
+
+    """
+
+    Times the original centroid filter, the vectorised Delaunay filter and earcut over all 44 force KMLs.
+
+    Input: None.
+
+    Output: Dataframe with one row per method.
+
+    """
+
+    # Loads and simplifies every force boundary once
+    polygons = [backend_functions.simplify_polygon(backend_functions.load_polygon_from_kml(path))
+                for path in sorted(backend_functions.DATA_DIR.glob("*.kml"))]
+
+    methods = {
+        # The original list comprehension, kept here for comparison
+        "delaunay (python loop)": lambda polygon: [t for t in triangulate(polygon) if polygon.contains(t.centroid)],
+        "delaunay (contains_xy)": lambda polygon: backend_functions.triangulate_polygon(polygon, method="delaunay"),
+        "earcut": lambda polygon: backend_functions.triangulate_polygon(polygon, method="earcut"),
+    }
+
+    rows = []
+    for name, method in methods.items():
+
+        # Times the triangulation of every force
+        start = time.perf_counter()
+        results = [method(polygon) for polygon in polygons]
+        seconds = time.perf_counter() - start
+
+        # Measures how much of each boundary the triangles cover, and how much spills outside it
+        covered = sum(shapely.union_all(tris).intersection(polygon).area for tris, polygon in zip(results, polygons))
+        spilled = sum(shapely.union_all(tris).difference(polygon).area for tris, polygon in zip(results, polygons))
+        total = sum(polygon.area for polygon in polygons)
+
+        rows.append({
+            "method": name,
+            "seconds": round(seconds, 3),
+            "triangles": sum(len(tris) for tris in results),
+            "query_groups": sum(len(backend_functions.plan_query_groups(tris)) for tris in results),
+            "area_covered_%": round(100 * covered / total, 4),
+            "area_outside_%": round(100 * spilled / total, 4),
+        })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_location_flattening(sizes=(100_000, 1_000_000, 5_000_000), response_size=10_000):
+
+    """
+
+    Compares decoding and cleaning crimes-street responses with json_normalize against the flat decoder.
+    Each size is made of repeated responses of response_size crimes, like a real force fetch.
+
+    Input: List of total crime counts. Crimes per response.
+
+    Output: Dataframe with one row per size and path.
+
+    """
+
+    # Builds one response body of synthetic crimes
+    records = [crime_to_record(row) for row in make_synthetic_crimes(response_size).itertuples()]
+    payload = json.dumps(records).encode()
+
+    def json_normalize_path(n_responses):
+        # The original path: json.loads per response, then json_normalize over every row while cleaning
+        start = time.perf_counter()
+        frames = [pd.DataFrame(json.loads(payload)) for _ in range(n_responses)]
+        df = pd.concat(frames, ignore_index=True)
+        decoded = time.perf_counter()
+        coords = pd.json_normalize(df["location"])
+        df["latitude"] = pd.to_numeric(coords["latitude"], errors="coerce")
+        df["longitude"] = pd.to_numeric(coords["longitude"], errors="coerce")
+        df["street_name"] = coords["street.name"]
+        df.drop(columns=["location"], inplace=True)
+        return decoded - start, time.perf_counter() - decoded, df
+
+    def flat_path(n_responses):
+        # The flat decoder per response, then typing the combined columns while cleaning
+        start = time.perf_counter()
+        frames = [backend_functions.parse_street_crimes(payload) for _ in range(n_responses)]
+        df = pd.concat(frames, ignore_index=True)
+        decoded = time.perf_counter()
+        df = backend_functions.extract_coordinates_and_street(df)
+        return decoded - start, time.perf_counter() - decoded, df
+
+    rows = []
+    for size in sizes:
+        for name, path in [("json_normalize", json_normalize_path), ("flat decoder", flat_path)]:
+            decode_seconds, flatten_seconds, df = path(max(1, size // response_size))
+            rows.append({
+                "crimes": len(df),
+                "path": name,
+                "decode_s": round(decode_seconds, 2),
+                "flatten_s": round(flatten_seconds, 2),
+                "total_s": round(decode_seconds + flatten_seconds, 2),
+            })
+            del df
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def _ingest_worker(path_name, api_url, store_path, police_forces, results):
+
+    """
+
+    Runs one ingest path in a fresh process and reports its peak memory.
+
+    """
+
+    use_stub_environment()
+    backend_functions.API_BASE_URL = api_url
+    start = time.perf_counter()
+
+    if path_name == "concat then clean":
+        # The original path: every force in memory, one concat, then cleaning the whole frame
+        df = backend_functions.cleaning(backend_functions.get_crime_for_all_regions(police_forces))
+        crimes = crime_store.write_crimes(df, store_path)
+    else:
+        # The streaming pipeline
+        crimes = ingest_pipeline.run_pipeline(police_forces, path=store_path)["crimes_written"]
+
+    results.put({
+        "path": path_name,
+        "crimes_written": crimes,
+        "seconds": round(time.perf_counter() - start, 1),
+        "peak_rss_mb": round(ingest_pipeline.peak_rss_mb()),
+    })
+
+
+def benchmark_streaming_ingest(n_crimes=3_000_000):
+
+    """
+
+    Compares the peak memory of the concat-then-clean ingest against the streaming pipeline for all 44 forces.
+    Each path runs in its own spawned process so its peak RSS is measured on its own.
+
+    Input: Number of synthetic crimes served by the stub (spread over three months, the latest is fetched).
+
+    Output: Dataframe with one row per path.
+
+    """
+
+    police_forces = [path.stem for path in sorted(backend_functions.DATA_DIR.glob("*.kml"))]
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    rows = []
+
+    with StubPoliceAPI(crimes=make_synthetic_crimes(n_crimes)) as stub:
+        for path_name in ["concat then clean", "streaming pipeline"]:
+            process = context.Process(target=_ingest_worker, args=(path_name, stub.url, Path(tempfile.mkdtemp()), police_forces, results))
+            process.start()
+            rows.append(results.get())
+            process.join()
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_process_scaling(worker_counts=(1, 2, 4, 8), n_crimes=1_000_000, latency=0.02):
+
+    """
+
+    Times the process-pool ingest of all 44 forces with different numbers of processes.
+
+    Input: Process counts to try. Number of synthetic crimes served by the stub. Seconds of stub latency per request.
+
+    Output: Dataframe with one row per process count.
+
+    """
+
+    police_forces = [path.stem for path in sorted(backend_functions.DATA_DIR.glob("*.kml"))]
+    rows = []
+
+    with StubPoliceAPI(crimes=make_synthetic_crimes(n_crimes), latency=latency) as stub:
+        for workers in worker_counts:
+
+            # Starts each run from an empty store with no checkpoints
+            start = time.perf_counter()
+            results = ingest_pipeline.run_parallel_ingest(
+                police_forces, workers, path=Path(tempfile.mkdtemp()), checkpoint_dir=Path(tempfile.mkdtemp()),
+                api_url=stub.url, worker_setup=use_stub_environment, progress=None,
+            )
+            seconds = time.perf_counter() - start
+
+            rows.append({
+                "workers": workers,
+                "seconds": round(seconds, 1),
+                "forces_done": int((results["status"] == "done").sum()),
+                "crimes_written": int(results["crimes_written"].sum()),
+                "max_worker_rss_mb": round(results["peak_rss_mb"].max()),
+            })
+
+    # Adds the speed-up over one process
+    df = pd.DataFrame(rows)
+    df["speedup"] = (df["seconds"].iloc[0] / df["seconds"]).round(2)
+
+    # Returns the comparison table
+    return df
+
+
+def benchmark_incremental_sync(n_crimes=1_000_000):
+
+    """
+
+    Compares a full refresh with the incremental monthly sync after police.uk publishes a new month.
+    The store starts with August and September for all 44 forces, then October is published.
+
+    Input: Number of synthetic crimes served by the stub (spread over August to October).
+
+    Output: Dataframe with one row per refresh mode.
+
+    """
+
+    police_forces = [path.stem for path in sorted(backend_functions.DATA_DIR.glob("*.kml"))]
+    crimes = make_synthetic_crimes(n_crimes)
+    rows = []
+
+    with StubPoliceAPI(crimes=crimes[crimes["month"] <= "2025-09"]) as stub:
+        backend_functions.API_BASE_URL = stub.url
+
+        # Ingests the two published months into a store shared by both modes
+        use_stub_environment()
+        stores = {"full refresh": Path(tempfile.mkdtemp()), "incremental sync": Path(tempfile.mkdtemp())}
+        for month in ["2025-08", "2025-09"]:
+            for store in stores.values():
+                ingest_pipeline.run_pipeline(police_forces, month, store)
+
+        # Publishes October
+        stub.crimes, stub._by_month = crimes, None
+
+        for mode, store in stores.items():
+
+            # Starts each mode with an empty response cache and fresh counters
+            use_stub_environment()
+            http_client.reset_request_stats()
+            start = time.perf_counter()
+
+            if mode == "full refresh":
+                # Re-downloads every month the API has
+                crimes_written = sum(ingest_pipeline.run_pipeline(police_forces, month, store)["crimes_written"]
+                                     for month in backend_functions.get_available_months())
+            else:
+                # Fetches only the months each force is missing
+                results = monthly_sync.sync_forces(police_forces, store, Path(tempfile.mkdtemp()) / "sync_state.json", progress=None)
+                crimes_written = int(results["crimes_written"].sum())
+
+            seconds = time.perf_counter() - start
+            stats = http_client.get_request_stats()
+
+            rows.append({
+                "mode": mode,
+                "seconds": round(seconds, 1),
+                "requests": int(stats["requests"].sum()),
+                "mb_downloaded": round(stats["bytes"].sum() / 1e6, 1),
+                "crimes_written": crimes_written,
+                "crimes_in_store": len(crime_store.read_crimes(columns=["id"], path=store)),
+            })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_backfill(police_forces=("metropolitan", "west-midlands", "greater-manchester", "west-yorkshire", "kent", "thames-valley"),
+                       n_months=24, n_crimes=2_000_000, worker_counts=(1, 4), latency=0.02):
+
+    """
+
+    Times backfilling several years of months per force, then the Crime Over Time data from the raw rows vs the cube.
+
+    Input: List of police force IDs. Months of history. Number of synthetic crimes served by the stub (spread over the months).
+           Process counts to try. Seconds of stub latency per request.
+
+    Output: Dataframe with one row per backfill run and one per way of reading the chart data.
+
+    """
+
+    months = pd.period_range(end="2025-10", periods=n_months, freq="M").strftime("%Y-%m")
+    rows = []
+
+    with StubPoliceAPI(crimes=make_synthetic_crimes(n_crimes, months=tuple(months)), latency=latency) as stub:
+        for workers in worker_counts:
+
+            # Starts each run from an empty store with no checkpoints
+            store = Path(tempfile.mkdtemp())
+            start = time.perf_counter()
+            results = ingest_pipeline.run_parallel_ingest(
+                list(police_forces), workers, path=store, checkpoint_dir=Path(tempfile.mkdtemp()),
+                api_url=stub.url, worker_setup=use_stub_environment, progress=None, months_back=n_months,
+            )
+            rows.append({
+                "step": f"backfill, {workers} processes",
+                "seconds": round(time.perf_counter() - start, 2),
+                "rows": int(results["crimes_written"].sum()),
+            })
+
+    # Counts months straight from the stored crimes, as the chart would without the cube
+    start = time.perf_counter()
+    crimes = crime_store.read_crimes(columns=aggregate_cube.DIMENSIONS, path=store)
+    crimes.groupby(["year", "month", "category"], observed=True).size()
+    rows.append({"step": "chart data from raw rows", "seconds": round(time.perf_counter() - start, 3), "rows": len(crimes)})
+
+    # Builds the cube once, as the ingest does, then slices it as the chart does
+    cube = aggregate_cube.build_cube(crimes)
+    start = time.perf_counter()
+    aggregate_cube.slice_cube(cube, ["year", "month", "category"])
+    rows.append({"step": "chart data from the cube", "seconds": round(time.perf_counter() - start, 3), "rows": len(cube)})
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_parallel_summaries(n_charts=4, latency=1.0):
+
+    """
+
+    Compares streaming the Summary tab's chart summaries one after another with stream_chart_summaries, on the fake LLM.
+
+    Input: Number of charts. Seconds the fake LLM takes per summary.
+
+    Output: Dataframe with one row per path.
+
+    """
+
+    # Uses the local stand-in with a fixed latency
+    prompt_function.COMPLETION_BACKEND = "fake"
+    prompt_function.FAKE_LATENCY = latency
+
+    # A small summary table per chart
+    jobs = {
+        f"chart {i}": dict(data_fetcher=lambda id=None, csv_data=None, i=i: pd.DataFrame({"category": ["burglary", "robbery"], "crime_count": [100 + i, 40 + i]}))
+        for i in range(n_charts)
+    }
+    rows = []
+
+    for path_name in ["one after another", "concurrent"]:
+
+        # Starts each path with an empty summary cache so every chart needs a completion
+        use_empty_summary_cache()
+        start = time.perf_counter()
+
+        if path_name == "one after another":
+            streams = {}
+            for name, kwargs in jobs.items():
+                stats = {}
+                streams[name] = (list(prompt_function.stream_chart_analysis_summary(**kwargs, stats=stats)), stats)
+        else:
+            streams = prompt_function.stream_chart_summaries(jobs)
+
+        # Reads every summary to the end, as the Summary tab does
+        seconds = []
+        for stream, stats in streams.values():
+            "".join(stream)
+            seconds.append(stats["seconds"])
+
+        rows.append({
+            "path": path_name,
+            "charts": n_charts,
+            "total_seconds": round(time.perf_counter() - start, 2),
+            "sum_of_parts_seconds": round(sum(seconds), 2),
+        })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_streaming_summary(latency=3.0, ttft=0.4):
+
+    """
+
+    Compares when the first words of a summary appear with the blocking completion and with streaming, on the fake LLM.
+
+    Input: Seconds the fake LLM takes per summary. Seconds to its first token.
+
+    Output: Dataframe with one row per path.
+
+    """
+
+    # Uses the local stand-in with fixed timings
+    prompt_function.COMPLETION_BACKEND = "fake"
+    prompt_function.FAKE_LATENCY = latency
+    prompt_function.FAKE_TTFT = ttft
+    prompt = "Analyze the following summary data:\n category  crime_count\n burglary 120\n robbery 45\nLimit to 50 words."
+    rows = []
+
+    for path_name in ["blocking", "streaming"]:
+
+        # Starts each path with an empty summary cache
+        use_empty_summary_cache()
+        start = time.perf_counter()
+
+        if path_name == "blocking":
+            prompt_function.get_completion(prompt)
+            seconds = time.perf_counter() - start
+            stats = {"ttft": seconds, "seconds": seconds, "tokens_per_second": None}
+        else:
+            stats = {}
+            for _ in prompt_function.stream_completion(prompt, stats=stats):
+                pass
+
+        rows.append({
+            "path": path_name,
+            "first_words_seconds": round(stats["ttft"], 2),
+            "total_seconds": round(stats["seconds"], 2),
+            "tokens_per_second": None if stats["tokens_per_second"] is None else round(stats["tokens_per_second"]),
+        })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_prompt_digest(n_crimes=500_000, n_months=24, latency=1.0):
+
+    """
+
+    Compares the prompt tokens and fake LLM latency of each chart summary with the whole table against the digest.
+
+    Input: Number of synthetic crimes. Months of history. Seconds the fake LLM takes per summary, before reading the prompt.
+
+    Output: Dataframe with one row per chart.
+
+    """
+
+    # Uses the local stand-in, which also takes longer for longer prompts
+    prompt_function.COMPLETION_BACKEND = "fake"
+    prompt_function.FAKE_LATENCY = latency
+
+    # Synthetic crimes spread over the real forces
+    months = pd.period_range(end="2025-10", periods=n_months, freq="M").strftime("%Y-%m")
+    forces = datasets.load_forces()["police_force_id"].to_numpy()
+    raw = make_synthetic_crimes(n_crimes, months=tuple(months))
+    crimes = pd.DataFrame({
+        "police_force_id": pd.Categorical(forces[raw["id"] % len(forces)]),
+        "category": pd.Categorical(np.asarray(CATEGORIES)[raw["category"]]),
+        "year": raw["month"].str[:4].astype("int16"),
+        "month": raw["month"].str[5:].astype("int8"),
+        "latitude": raw["latitude"].astype("float32"),
+        "longitude": raw["longitude"].astype("float32"),
+    })
+    over_time = crime_over_time.get_crime_over_time(crimes)
+
+    # Names the hotspots from the crime data in a throwaway cache, so the benchmark never calls Nominatim
+    geocoder.GEOCODER = "offline"
+    geocoder._geocode_cache = geocoder.GeocodeCache(Path(tempfile.mkdtemp()) / "geocode.sqlite")
+
+    # The summary table each chart sends to the LLM
+    frames = {
+        "Crime Over Time": over_time.assign(change_pct=(over_time["crime_count"].pct_change() * 100).round(1)),
+        "Crime Rate By Region": lollipop_functions.get_columns_for_crime_rate_by_region(crimes),
+        "Population": pd.read_csv(datasets.DATA_DIR / "cleaned_population.csv"),
+        "Crime Types and Force Heatmap": crime_types_force.get_columns_for_heatmap_table(crimes),
+        "Crime Hotspots Map": crime_density.crime_density_heatmap_info(crimes),
+    }
+    rows = []
+
+    for chart_name, frame in frames.items():
+        row = {"chart": chart_name, "rows": len(frame)}
+
+        for path_name, token_budget in [("table", None), ("digest", prompt_digest.DIGEST_TOKEN_BUDGET)]:
+
+            # Starts with an empty summary cache so every prompt needs a completion
+            use_empty_summary_cache()
+            start = time.perf_counter()
+            prompt = prompt_function.build_chart_analysis_prompt(lambda id=None, csv_data=None: frame, token_budget=token_budget)
+            prompt_function.get_completion(prompt)
+
+            row[f"{path_name}_tokens"] = prompt_digest.count_tokens(prompt)
+            row[f"{path_name}_seconds"] = round(time.perf_counter() - start, 2)
+
+        rows.append(row)
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_map_payload(sizes=(100_000, 1_000_000)):
+
+    """
+
+    Compares the hotspot map figure built from every crime location against crime counts binned for the zoom level.
+    The figure is serialised the way Streamlit does before sending it to the browser.
+
+    Input: List of crime counts.
+
+    Output: Dataframe with one row per size and mode.
+
+    """
+
+    # Imported here so the other benchmarks run without Streamlit
+    from frontend_files.chart_renders import make_crime_density_figure
+
+    rows = []
+
+    for n_crimes in sizes:
+        raw = make_synthetic_crimes(n_crimes)
+        df = pd.DataFrame({
+            "latitude": raw["latitude"].astype("float32"),
+            "longitude": raw["longitude"].astype("float32"),
+            "category": pd.Categorical(np.asarray(CATEGORIES)[raw["category"]]),
+        })
+
+        for mode in ["raw", "binned"]:
+            # Builds the figure, then turns it into the JSON sent to the browser
+            start = time.perf_counter()
+            fig = make_crime_density_figure(df, mode)
+            built = time.perf_counter()
+            payload = fig.to_json()
+
+            rows.append({
+                "crimes": n_crimes,
+                "mode": mode,
+                "points": sum(len(trace.lat) for trace in fig.data),
+                "json_mb": round(len(payload) / 1e6, 1),
+                "build_ms": round((built - start) * 1000),
+                "to_json_ms": round((time.perf_counter() - built) * 1000),
+            })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_hotspots(sizes=(1_000_000, 4_000_000), grid_sizes=(0.005, 0.01, 0.05), top_n=10):
+
+    """
+
+    Compares finding the busiest grid cells with a groupby and full sort per size against find_hotspots,
+    which computes integer cells once and reuses them for every size.
+
+    Input: List of crime counts. Grid cell sizes in degrees. Cells kept per size.
+
+    Output: Dataframe with one row per crime count and path.
+
+    """
+
+    rows = []
+
+    for n_crimes in sizes:
+        raw = make_synthetic_crimes(n_crimes)
+        df = pd.DataFrame({"latitude": raw["latitude"].astype("float32"), "longitude": raw["longitude"].astype("float32")})
+        del raw
+
+        def groupby_path():
+            # The previous approach: float bins written onto a copy, then a groupby sorted in full, once per size
+            for grid_size in grid_sizes:
+                binned = df.copy()
+                binned["lat_bin"] = (binned["latitude"] // grid_size) * grid_size
+                binned["lon_bin"] = (binned["longitude"] // grid_size) * grid_size
+                binned.groupby(["lat_bin", "lon_bin"]).size().reset_index(name="count").sort_values("count", ascending=False).head(top_n)
+
+        for name, path in [("groupby + sort", groupby_path), ("bincount + argpartition", lambda: crime_density.find_hotspots(df, list(grid_sizes), top_n=top_n))]:
+            start = time.perf_counter()
+            path()
+            rows.append({"crimes": n_crimes, "grid_sizes": len(grid_sizes), "path": name, "seconds": round(time.perf_counter() - start, 2)})
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_fetch_concurrency(police_force_id="leicestershire", triangle_count=150, latency=0.25):
+
+    """
+
+    Compares fetching a force's query triangles one after another with fetch_concurrently, under the police.uk rate limit.
+
+    Input: Police force ID. Most triangles fetched. Seconds of stub latency per request, like a police.uk round trip.
+
+    Output: Dataframe with one row per path.
+
+    """
+
+    # Builds the query triangles for the force
+    polygon = backend_functions.simplify_polygon(backend_functions.load_polygon_from_kml(backend_functions.get_kml(police_force_id)))
+    poly_strs = [backend_functions.triangle_to_poly_string(t) for t in backend_functions.triangulate_polygon(polygon)][:triangle_count]
+    fetch = lambda poly_str: backend_functions.get_street_level_crimes(poly_str, use_cache=False)
+
+    rows, results = [], {}
+
+    with StubPoliceAPI(latency=latency) as stub:
+        backend_functions.API_BASE_URL = stub.url
+
+        # The serial loop process_kml_file_to_dataframe used to run, then the concurrent fetch
+        for path_name, path in [("serial", lambda: [fetch(p) for p in poly_strs]), ("concurrent", lambda: fetch_concurrently(fetch, poly_strs))]:
+            start = time.perf_counter()
+            results[path_name] = path()
+            rows.append({"path": path_name, "triangles": len(poly_strs), "seconds": round(time.perf_counter() - start, 2)})
+
+    # Checks both paths return identical data in the same order
+    pd.testing.assert_frame_equal(pd.concat(results["serial"], ignore_index=True), pd.concat(results["concurrent"], ignore_index=True))
+
+    # Adds the speed-up over the serial loop
+    df = pd.DataFrame(rows)
+    df["speedup"] = (df["seconds"].iloc[0] / df["seconds"]).round(1)
+
+    # Returns the comparison table
+    return df
+
+
+def benchmark_request_stats(latency=0.05):
+
+    """
+
+    Calls every police.uk fetcher against the stub through the pooled session and reports the per-endpoint statistics.
+
+    Input: Seconds of stub latency per request.
+
+    Output: Dataframe with one row per endpoint.
+
+    """
+
+    use_stub_environment()
+    http_client.reset_request_stats()
+
+    with StubPoliceAPI(latency=latency) as stub:
+        backend_functions.API_BASE_URL = stub.url
+        forces = backend_functions.get_forces()
+        neighbourhoods = backend_functions.get_all_neighbourhoods(forces["police_force_id"].head(5))
+        backend_functions.get_specific_neighnourhoods_from_police_force("leicestershire", neighbourhoods.assign(police_force_id="leicestershire"))
+        backend_functions.get_street_level_crimes("52.6,-1.2:52.7,-1.2:52.7,-1.0")
+
+    # Returns the statistics
+    return http_client.get_request_stats()
+
+
+def benchmark_response_cache(police_forces=("city-of-london", "leicestershire"), latency=0.1):
+
+    """
+
+    Compares a cold fetch of some forces with a warm one answered from the response cache.
+
+    Input: List of police force IDs. Seconds of stub latency per request.
+
+    Output: Dataframe with one row per run.
+
+    """
+
+    # Starts from an empty response cache
+    use_stub_environment()
+    rows = []
+
+    with StubPoliceAPI(latency=latency) as stub:
+        backend_functions.API_BASE_URL = stub.url
+
+        for run in ["cold", "warm"]:
+            requests_before = stub.request_count
+            start = time.perf_counter()
+            df = backend_functions.get_crime_for_all_regions(list(police_forces))
+            rows.append({
+                "run": run,
+                "seconds": round(time.perf_counter() - start, 2),
+                "requests": stub.request_count - requests_before,
+                "crimes": len(df),
+                **response_cache.get_response_cache().get_stats(),
+            })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_triangle_index():
+
+    """
+
+    Compares parsing and triangulating every force KML with building the triangulation index once and loading it.
+    The index is built in a throwaway folder, so the one in backend_files/cache is left alone.
+
+    Input: None.
+
+    Output: Dataframe with one row per step.
+
+    """
+
+    kml_paths = sorted(triangle_index.DATA_DIR.glob("*.kml"))
+    index_path = Path(tempfile.mkdtemp()) / "force_index.npz"
+    rows = []
+
+    def parse_kmls():
+        for kml_path in kml_paths:
+            backend_functions.triangulate_polygon(backend_functions.simplify_polygon(backend_functions.load_polygon_from_kml(kml_path)))
+
+    def load_index():
+        # Loads the index afresh and materialises every force's triangles
+        triangle_index._index = None
+        triangle_index.load_index(index_path)
+        for kml_path in kml_paths:
+            triangle_index.get_force_triangles(kml_path.stem)
+
+    for step, fn in [("parse KMLs", parse_kmls), ("build index", lambda: triangle_index.build_index(index_path)), ("load index", load_index)]:
+        start = time.perf_counter()
+        fn()
+        rows.append({"step": step, "forces": len(kml_paths), "seconds": round(time.perf_counter() - start, 3)})
+
+    # Adds the size of the index file
+    df = pd.DataFrame(rows)
+    df["index_kb"] = round(index_path.stat().st_size / 1024)
+
+    # Returns the comparison table
+    return df
+
+
+def benchmark_crime_store(csv_path=crime_store.CRIME_CSV.parent / "leicestershire_street.csv"):
+
+    """
+
+    Compares reading a cleaned crime CSV with reading one column of it back from a throwaway Parquet store.
+
+    Input: Path of a cleaned crime CSV (the Leicestershire sample by default).
+
+    Output: Dataframe with one row per read.
+
+    """
+
+    # Writes the CSV into a throwaway store
+    store_path = Path(tempfile.mkdtemp())
+    df = pd.read_csv(csv_path)
+    if "police_force_id" not in df.columns:
+        df["police_force_id"] = Path(csv_path).stem.replace("_street", "")
+    crime_store.write_crimes(df, store_path)
+
+    reads = {
+        "CSV (all columns)": lambda: pd.read_csv(csv_path),
+        "store (category only)": lambda: crime_store.read_crimes(columns=["category"], path=store_path),
+    }
+    rows = []
+
+    for read, fn in reads.items():
+        start = time.perf_counter()
+        fn()
+        rows.append({"read": read, "crimes": len(df), "ms": round((time.perf_counter() - start) * 1000, 1)})
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def _cleaned_synthetic_crimes(n_crimes, months=("2025-07", "2025-08", "2025-09", "2025-10")):
+
+    """
+
+    Builds a cleaned-looking crime table from the synthetic crimes, spread over four forces.
+
+    """
+
+    raw = make_synthetic_crimes(n_crimes, months=months)
+    return pd.DataFrame({
+        "id": raw["id"],
+        "police_force_id": pd.Categorical(np.array(["metropolitan", "west-midlands", "greater-manchester", "west-yorkshire"])[raw["id"] % 4]),
+        "category": pd.Categorical(np.asarray(CATEGORIES)[raw["category"]]),
+        "year": raw["month"].str[:4].astype("int16"),
+        "month": raw["month"].str[5:].astype("int8"),
+        "latitude": raw["latitude"].astype("float32"),
+        "longitude": raw["longitude"].astype("float32"),
+    })
+
+
+def benchmark_aggregate_cube(n_crimes=2_000_000):
+
+    """
+
+    Compares each summary's groupby over the raw crimes with a slice of the aggregate cube, then adding a new month
+    to the cube with rebuilding it.
+
+    Input: Number of synthetic crimes (spread over four forces and four months).
+
+    Output: Dataframe with one row per summary or step.
+
+    """
+
+    df = _cleaned_synthetic_crimes(n_crimes)
+    grid_size = aggregate_cube.GRID_SIZE
+
+    def timed(fn):
+        start = time.perf_counter()
+        result = fn()
+        return result, round((time.perf_counter() - start) * 1000, 1)
+
+    # Builds the cubes once
+    cube, build_ms = timed(lambda: aggregate_cube.build_cube(df))
+    grid_cube, grid_build_ms = timed(lambda: aggregate_cube.build_cube(df, grid_size))
+    rows = [
+        {"step": "build cube", "cube_rows": len(cube), "raw_ms": None, "cube_ms": build_ms},
+        {"step": "build grid cube", "cube_rows": len(grid_cube), "raw_ms": None, "cube_ms": grid_build_ms},
+    ]
+
+    # Compares every summary against the same groupby on the raw rows
+    summaries = {
+        "by force": ["police_force_id"],
+        "by force × category": ["police_force_id", "category"],
+        "by category": ["category"],
+        "by month": ["year", "month"],
+    }
+    for name, by in summaries.items():
+        _, raw_ms = timed(lambda: df.groupby(by, observed=True).size())
+        _, slice_ms = timed(lambda: aggregate_cube.slice_cube(cube, by))
+        rows.append({"step": name, "cube_rows": len(cube), "raw_ms": raw_ms, "cube_ms": slice_ms})
+
+    _, raw_ms = timed(lambda: df.assign(lat_bin=df["latitude"] // grid_size, lon_bin=df["longitude"] // grid_size).groupby(["lat_bin", "lon_bin"]).size())
+    _, slice_ms = timed(lambda: aggregate_cube.slice_cube(grid_cube, aggregate_cube.CELL_DIMENSIONS))
+    rows.append({"step": "by grid cell", "cube_rows": len(grid_cube), "raw_ms": raw_ms, "cube_ms": slice_ms})
+
+    # Adds a new month incrementally vs rebuilding from every row
+    new_month = df[df["month"] == 10].assign(month=np.int8(11))
+    _, rebuild_ms = timed(lambda: aggregate_cube.build_cube(pd.concat([df, new_month], ignore_index=True)))
+    _, update_ms = timed(lambda: aggregate_cube.update_cube(cube, new_month))
+    rows.append({"step": "add a month (raw = rebuild)", "cube_rows": len(cube), "raw_ms": rebuild_ms, "cube_ms": update_ms})
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_cube_updates(n_crimes=2_000_000, batch_size=5_000):
+
+    """
+
+    Compares updating the saved cubes after every batch with updating them once per run, when a new month is written
+    to the default store in batches the size of police.uk responses.
+    The default store and the saved cubes are pointed at throwaway files for the run.
+
+    Input: Number of synthetic crimes (spread over four forces and four months, the last is the new month).
+           Crimes per batch.
+
+    Output: Dataframe with one row per update strategy.
+
+    """
+
+    df = _cleaned_synthetic_crimes(n_crimes)
+    old_months, new_month = df[df["month"] < 10], df[df["month"] == 10]
+    batches = [("synthetic", new_month.iloc[start:start + batch_size], 0) for start in range(0, len(new_month), batch_size)]
+
+    # Points the default store and the saved cubes at throwaway files
+    cache_dir = Path(tempfile.mkdtemp())
+    ingest_pipeline.STORE_PATH = store = cache_dir / "crime_store"
+    aggregate_cube.CUBE_PATH, aggregate_cube.GRID_CUBE_PATH = cache_dir / "crime_cube.parquet", cache_dir / "crime_grid_cube.parquet"
+    crime_store.write_crimes(old_months, store)
+
+    def per_batch():
+        # The old path: every batch reads and rewrites both saved cubes
+        written = set()
+        for _, batch, _ in batches:
+            partitions = pd.MultiIndex.from_frame(batch[["police_force_id", "year", "month"]])
+            first_write = ~partitions.isin(list(written))
+            written.update(partitions[first_write].unique())
+            for mode, rows in [("overwrite", batch[first_write]), ("append", batch[~first_write])]:
+                crime_store.write_crimes(rows, store, mode=mode)
+                aggregate_cube.add_crimes_to_cubes(rows, mode=mode)
+
+    rows = []
+    for strategy, run in [("per batch", per_batch), ("once per run", lambda: ingest_pipeline.write_batches(batches, store))]:
+
+        # Starts each strategy from the cubes saved before the new month
+        aggregate_cube.save_cube(aggregate_cube.build_cube(old_months), aggregate_cube.CUBE_PATH)
+        aggregate_cube.save_cube(aggregate_cube.build_cube(old_months, aggregate_cube.GRID_SIZE), aggregate_cube.GRID_CUBE_PATH)
+
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+
+        # Checks the saved cube against one rebuilt from the store
+        saved = pd.read_parquet(aggregate_cube.GRID_CUBE_PATH)
+        rebuilt = aggregate_cube.build_cube(crime_store.read_crimes(path=store), aggregate_cube.GRID_SIZE)
+        rows.append({
+            "strategy": strategy,
+            "batches": len(batches),
+            "seconds": round(seconds, 1),
+            "grid_cube_rows": len(saved),
+            "matches_store": int(saved["crime_count"].sum()) == int(rebuilt["crime_count"].sum()) and len(saved) == len(rebuilt),
+        })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_outcome_split(copies=100, csv_path=crime_store.CRIME_CSV.parent / "leicestershire_street.csv"):
+
+    """
+
+    Compares parsing the outcome_status strings of older CSVs with literal_eval per row against split_outcome_status.
+
+    Input: Times the CSV's statuses are repeated. Path of a cleaned crime CSV with an outcome_status column.
+
+    Output: Dataframe with one row per path.
+
+    """
+
+    statuses = pd.concat([pd.read_csv(csv_path, usecols=["outcome_status"])["outcome_status"]] * copies, ignore_index=True)
+
+    paths = {
+        "literal_eval": lambda: statuses.map(lambda s: ast.literal_eval(s) if isinstance(s, str) and s.startswith("{") else None),
+        "vectorised split": lambda: outcomes.split_outcome_status(statuses),
+    }
+    rows = []
+
+    for path_name, path in paths.items():
+        start = time.perf_counter()
+        path()
+        rows.append({"path": path_name, "statuses": len(statuses), "seconds": round(time.perf_counter() - start, 2)})
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_tile_pyramid(sizes=(250_000, 1_000_000, 4_000_000), zoom=10):
+
+    """
+
+    Compares binning the raw crimes in a city-sized view with reading the same view from the tile pyramid, as the data grows.
+
+    Input: List of crime counts. Map zoom level of the view.
+
+    Output: Dataframe with one row per crime count.
+
+    """
+
+    # A view centred on London
+    bbox = tile_pyramid.view_bbox(51.5, -0.12, zoom)
+    rows = []
+
+    for n_crimes in sizes:
+        raw = make_synthetic_crimes(n_crimes)
+        df = pd.DataFrame({
+            "latitude": raw["latitude"].astype("float32"),
+            "longitude": raw["longitude"].astype("float32"),
+            "category": pd.Categorical(np.asarray(CATEGORIES)[raw["category"]]),
+        })
+        del raw
+
+        start = time.perf_counter()
+        tiles = tile_pyramid.build_tiles(df)
+        build_s = time.perf_counter() - start
+
+        # Filters the raw points to the view and bins them
+        start = time.perf_counter()
+        in_view = df[df["longitude"].between(bbox[0], bbox[2]) & df["latitude"].between(bbox[1], bbox[3])]
+        crime_density.bin_crime_locations(in_view, crime_density.bin_size_for_zoom(zoom))
+        raw_ms = (time.perf_counter() - start) * 1000
+
+        # Reads the tiles in view
+        start = time.perf_counter()
+        cells = tile_pyramid.query_tiles(tiles, bbox, zoom)
+        tile_ms = (time.perf_counter() - start) * 1000
+
+        rows.append({
+            "crimes": n_crimes,
+            "pyramid_rows": len(tiles),
+            "build_s": round(build_s, 1),
+            "view_cells": len(cells),
+            "raw_view_ms": round(raw_ms, 1),
+            "tile_view_ms": round(tile_ms, 1),
+        })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_geocoder(n_hotspots=10):
+
+    """
+
+    Compares naming the hotspots for a first summary with a repeated one, using a stand-in for Nominatim that keeps
+    its one request per second limit and answers from the crime data. Names are cached in a throwaway database.
+
+    Input: Number of hotspots.
+
+    Output: Dataframe with one row per run.
+
+    """
+
+    calls = []
+
+    def stand_in(lat, lon):
+        geocoder.NOMINATIM_LIMITER.acquire()
+        calls.append((lat, lon))
+        return f"Near {geocoder.nearest_street(lat, lon)}"
+
+    cache = geocoder.GeocodeCache(Path(tempfile.mkdtemp()) / "geocode.sqlite")
+    rng = np.random.default_rng(0)
+    hotspots = list(zip(rng.uniform(51.3, 51.7, n_hotspots), rng.uniform(-0.5, 0.2, n_hotspots)))
+    rows = []
+
+    for run in ["first summary", "repeat summary"]:
+        calls_before = len(calls)
+        start = time.perf_counter()
+        names = geocoder.reverse_geocode(hotspots, stand_in, cache)
+        rows.append({
+            "run": run,
+            "seconds": round(time.perf_counter() - start, 2),
+            "geocoder_calls": len(calls) - calls_before,
+            "example": names[0],
+        })
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+def benchmark_summary_cache(latency=1.0, n_identical=8):
+
+    """
+
+    Compares a first summary with a repeated one answered from the summary cache, then times identical requests for
+    a new prompt made at the same time, which share one completion. Runs on the fake LLM with an empty cache.
+
+    Input: Seconds the fake LLM takes per summary. Identical requests made at once.
+
+    Output: Dataframe with one row per run.
+
+    """
+
+    # Uses the local stand-in with a fixed latency
+    prompt_function.COMPLETION_BACKEND = "fake"
+    prompt_function.FAKE_LATENCY = latency
+    cache = use_empty_summary_cache()
+    prompt = "Analyze the following summary data:\\n category  crime_count\\n burglary 120\\n robbery 45\\nLimit to 50 words."
+
+    def identical_at_once():
+        # Several clicks on a new prompt at once
+        with ThreadPoolExecutor(max_workers=n_identical) as pool:
+            list(pool.map(lambda _: prompt_function.get_completion(prompt + " Be brief."), range(n_identical)))
+
+    runs = {
+        "first summary": lambda: prompt_function.get_completion(prompt),
+        "repeat summary": lambda: prompt_function.get_completion(prompt),
+        f"{n_identical} identical at once": identical_at_once,
+    }
+    rows = []
+
+    for run, fn in runs.items():
+        start = time.perf_counter()
+        fn()
+        rows.append({"run": run, "seconds": round(time.perf_counter() - start, 3), **cache.get_stats()})
+
+    # Returns the comparison table
+    return pd.DataFrame(rows)
+
+
+BENCHMARKS = {
+    "adaptive_split": benchmark_adaptive_split,
+    "triangulation": benchmark_triangulation,
+    "location_flattening": benchmark_location_flattening,
+    "streaming_ingest": benchmark_streaming_ingest,
+    "process_scaling": benchmark_process_scaling,
+    "incremental_sync": benchmark_incremental_sync,
+    "backfill": benchmark_backfill,
+    "parallel_summaries": benchmark_parallel_summaries,
+    "streaming_summary": benchmark_streaming_summary,
+    "prompt_digest": benchmark_prompt_digest,
+    "map_payload": benchmark_map_payload,
+    "hotspots": benchmark_hotspots,
+    "fetch_concurrency": benchmark_fetch_concurrency,
+    "request_stats": benchmark_request_stats,
+    "response_cache": benchmark_response_cache,
+    "triangle_index": benchmark_triangle_index,
+    "crime_store": benchmark_crime_store,
+    "aggregate_cube": benchmark_aggregate_cube,
+    "cube_updates": benchmark_cube_updates,
+    "outcome_split": benchmark_outcome_split,
+    "tile_pyramid": benchmark_tile_pyramid,
+    "geocoder": benchmark_geocoder,
+    "summary_cache": benchmark_summary_cache,
+}
+
+if __name__ == "__main__":
+    # Runs the named benchmarks (all of them by default)
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"== {name} ==")
+        print(BENCHMARKS[name]().to_string(index=False))
@@ -2,8 +2,25 @@
 ## Crime rates for Lollipop chart
 ## ===================================================================================
 
+import numpy as np
 import pandas as pd
-from geopy.geocoders import Nominatim
+from backend_files.aggregate_cube import CELL_DIMENSIONS, GRID_SIZE, slice_cube
+from backend_files.datasets import load_cube
+from backend_files.geocoder import reverse_geocode
+
+# Zoom level and centre (England and Wales) the hotspot map opens at
+DEFAULT_MAP_ZOOM = 5
+DEFAULT_MAP_CENTRE = (52.8, -1.6)
+
+# Width of a density bin on screen, in pixels (about half the heatmap radius)
+BIN_PIXELS = 8
+
+# Largest dense count array the hotspot search allocates before counting distinct cells instead
+MAX_DENSE_CELLS = 16_000_000
+
+# Grid size and number of hotspots the summary names
+HOTSPOT_GRID_SIZE = 0.01
+HOTSPOT_COUNT = 10
 
 def get_columns_for_crime_density_heatmap(df, theme = ["whitegrid", "viridis"]):
 
@@ -23,90 +40,224 @@ def get_columns_for_crime_density_heatmap(df, theme = ["whitegrid", "viridis"]):
     # Returns dataframe
     return df_locations
 
-def crime_density_heatmap_info(df):
+def bin_size_for_zoom(zoom, bin_pixels=BIN_PIXELS):
+
+    """
+
+    A function to get the bin size that covers a given number of pixels at a map zoom level.
+
+    Input: Map zoom level. Pixels per bin.
+
+    Output: Bin size in degrees.
+
+    """
+
+    # A 256 pixel web map tile spans 360 / 2^zoom degrees of longitude
+    return 360 / (256 * 2 ** zoom) * bin_pixels
+
+
+def bin_crime_locations(df, bin_size, lat_col="latitude", lon_col="longitude", category_col="category"):
+
+    """
+
+    A function to count crimes in square bins, separately for each category.
+
+    Input: Dataframe with latitude, longitude and category columns (left unchanged). Bin size in degrees.
+
+    Output: Dataframe with category, the latitude and longitude of each bin's centre, and crime_count. Empty bins are left out.
+
+    """
+
+    lat = df[lat_col].to_numpy(dtype="float64")
+    lon = df[lon_col].to_numpy(dtype="float64")
+    category = df[category_col].astype("category")
+
+    # Drops crimes with no location or category
+    codes = category.cat.codes.to_numpy().astype(np.int64)
+    valid = np.isfinite(lat) & np.isfinite(lon) & (codes >= 0)
+    codes = codes[valid]
+    lat_cell = np.floor(lat[valid] / bin_size).astype(np.int64)
+    lon_cell = np.floor(lon[valid] / bin_size).astype(np.int64)
+
+    if not len(codes):
+        return pd.DataFrame({category_col: pd.Categorical([], categories=category.cat.categories),
+                             "latitude": [], "longitude": [], "crime_count": []})
+
+    # Packs category and cell into one integer key per crime
+    lat_min, lon_min = lat_cell.min(), lon_cell.min()
+    n_lat, n_lon = lat_cell.max() - lat_min + 1, lon_cell.max() - lon_min + 1
+    keys = (codes * n_lat + (lat_cell - lat_min)) * n_lon + (lon_cell - lon_min)
+
+    # Counts each key, then unpacks the keys again
+    keys, counts = np.unique(keys, return_counts=True)
+    codes, cells = np.divmod(keys, n_lat * n_lon)
+    lat_cell, lon_cell = np.divmod(cells, n_lon)
+
+    # Returns one row per non-empty bin
+    return pd.DataFrame({
+        category_col: pd.Categorical.from_codes(codes, categories=category.cat.categories),
+        "latitude": ((lat_cell + lat_min + 0.5) * bin_size).astype("float32"),
+        "longitude": ((lon_cell + lon_min + 0.5) * bin_size).astype("float32"),
+        "crime_count": counts,
+    })
+
 
-    """ 
+def top_cells(lat_cell, lon_cell, top_n=10, weights=None):
 
-    A function to display information about crime density heatmap for the LLM.
+    """
+
+    A function to find the grid cells with the most crimes without sorting every cell.
+
+    Input: Arrays of integer cell numbers (one pair per crime, or per cell when weights are given). Number of cells to return.
+           Array of crimes per row (None to count each row once).
+
+    Output: (lat_cell, lon_cell, count) arrays for the top cells, most crimes first (empty when top_n is 0 or less,
+            and never more than the cells holding any crimes).
+
+    """
+
+    empty = np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    if not len(lat_cell) or top_n <= 0:
+        return empty
+
+    # Packs each cell into one integer id
+    lat_min, lon_min = lat_cell.min(), lon_cell.min()
+    n_lon = lon_cell.max() - lon_min + 1
+    n_cells = (lat_cell.max() - lat_min + 1) * n_lon
+    ids = (lat_cell - lat_min) * n_lon + (lon_cell - lon_min)
+
+    # Counts with one pass over a dense array, or over the distinct ids when the area is too fine for that
+    if n_cells <= MAX_DENSE_CELLS:
+        cell_ids = np.arange(n_cells)
+        counts = np.bincount(ids, weights=weights, minlength=n_cells)
+    else:
+        cell_ids, inverse = np.unique(ids, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights, minlength=len(cell_ids))
+
+    # Keeps the cells with crimes, asking for no more of them than there are
+    occupied = np.flatnonzero(counts > 0)
+    k = min(top_n, len(occupied))
+    if k == 0:
+        return empty
+
+    # Picks the top cells in linear time, then orders just those
+    top = occupied[np.argpartition(counts[occupied], len(occupied) - k)[len(occupied) - k:]]
+    top = top[np.lexsort((cell_ids[top], -counts[top]))]
+
+    # Returns the cells and their counts
+    lat_top, lon_top = np.divmod(cell_ids[top], n_lon)
+    return lat_top + lat_min, lon_top + lon_min, counts[top].astype(np.int64)
+
+
+def find_hotspots(df=None, grid_sizes=(GRID_SIZE,), top_n=10, lat_col="latitude", lon_col="longitude"):
 
-    Input: Dataframe with crime location data.
+    """
+
+    A function to find the top crime hotspots at one or more grid sizes.
+    Coordinates are turned into integer cells once, at the smallest size; larger sizes that are whole multiples of it
+    reuse those cells. The input dataframe is never changed.
 
-    Output: String containing information about crime density heatmap.
+    Input: Dataframe with latitude and longitude columns (None to use the grid cube, whose cells every size must be a
+           multiple of). Grid sizes in degrees. Number of hotspots per size. Latitude and longitude column names.
+
+    Output: Dataframe with grid_size, lat_bin, lon_bin (south-west corner of the cell) and count, most crimes first per size.
 
     """
 
-    # Gets descriptive statistics
-    info = df.describe()
+    grid_sizes = list(grid_sizes)
+
+    if df is None:
+        # Starts from the grid cube's cells, each weighted by its crimes
+        cells = slice_cube(load_cube(grid=True), CELL_DIMENSIONS)
+        base_size = GRID_SIZE
+        lat_base = cells["lat_cell"].to_numpy(dtype=np.int64)
+        lon_base = cells["lon_cell"].to_numpy(dtype=np.int64)
+        weights = cells["crime_count"].to_numpy(dtype="float64")
+    else:
+        # Validate input
+        if lat_col not in df.columns or lon_col not in df.columns:
+            raise ValueError("DataFrame must include latitude and longitude columns")
+
+        # Turns the coordinates into integer cells at the smallest size
+        lat = df[lat_col].to_numpy(dtype="float64")
+        lon = df[lon_col].to_numpy(dtype="float64")
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        lat, lon = lat[valid], lon[valid]
+        base_size = min(grid_sizes)
+        lat_base = np.floor(lat / base_size).astype(np.int64)
+        lon_base = np.floor(lon / base_size).astype(np.int64)
+        weights = None
+
+    frames = []
+    for grid_size in grid_sizes:
+
+        # Merges the base cells when the size is a whole multiple of the base size
+        factor = round(grid_size / base_size)
+        if factor >= 1 and np.isclose(factor * base_size, grid_size):
+            lat_cell, lon_cell = lat_base // factor, lon_base // factor
+        elif df is not None:
+            lat_cell = np.floor(lat / grid_size).astype(np.int64)
+            lon_cell = np.floor(lon / grid_size).astype(np.int64)
+        else:
+            raise ValueError(f"grid_size must be a whole multiple of {GRID_SIZE}")
+
+        lat_cell, lon_cell, counts = top_cells(lat_cell, lon_cell, top_n, weights)
+        frames.append(pd.DataFrame({
+            "grid_size": grid_size,
+            "lat_bin": lat_cell * grid_size,
+            "lon_bin": lon_cell * grid_size,
+            "count": counts,
+        }))
 
-    # Returns information string
-    return info
+    # Returns dataframe
+    return pd.concat(frames, ignore_index=True)
 
-def crime_density_heatmap_info(df, lat_col="latitude", lon_col="longitude", 
-                               grid_size=0.01, top_n=10):
+
+def crime_density_heatmap_info(df=None, lat_col="latitude", lon_col="longitude", 
+                               grid_size=HOTSPOT_GRID_SIZE, top_n=HOTSPOT_COUNT, id=None, csv_data=None):
     """
     Returns a table of top crime hotspots with reverse geocoded area names.
 
     Input:
-        df: DataFrame with crime location data (must include lat & lon).
+        df: DataFrame with crime location data (must include lat & lon), or None to use the grid cube. Left unchanged.
         lat_col: name of latitude column.
         lon_col: name of longitude column.
-        grid_size: size/degrees of grid cell for density aggregation.
+        grid_size: size/degrees of grid cell for density aggregation (a multiple of the cube's cells when df is None).
         top_n: number of hotspots to return.
+        id, csv_data: passed by the summary tab like every summary function; unused.
 
     Output:
         DataFrame with: lat_bin, lon_bin, count, area_name.
     """
 
-    # Validate input
-    if lat_col not in df.columns or lon_col not in df.columns:
-        raise ValueError("DataFrame must include latitude and longitude columns")
+    # Select top hotspots
+    top_hotspots = find_hotspots(df, [grid_size], top_n, lat_col, lon_col).drop(columns="grid_size")
+
+    # Add area names from the geocode cache, looking up any new ones in one rate-limited batch
+    top_hotspots["area_name"] = reverse_geocode(list(zip(top_hotspots["lat_bin"], top_hotspots["lon_bin"])))
 
-    # Create grid cell identifiers
-    df["lat_bin"] = (df[lat_col] // grid_size) * grid_size
-    df["lon_bin"] = (df[lon_col] // grid_size) * grid_size
+    return top_hotspots
 
-    # Count crimes per grid cell
-    hotspot_counts = (
-        df.groupby(["lat_bin", "lon_bin"])
-        .size()
-        .reset_index(name="count")
-        .sort_values("count", ascending=False)
-    )
 
-    # Select top hotspots
-    top_hotspots = hotspot_counts.head(top_n).copy()
-    
-    # Initialize geocoder
-    geolocator = Nominatim(user_agent="crime_hotspot_app")
-
-    # Add area names via reverse geocoding
-    area_names = []
-    for _, row in top_hotspots.iterrows():
-        coord = f"{row['lat_bin']}, {row['lon_bin']}"
-        try:
-            location = geolocator.reverse(coord, exactly_one=True)
-            if location and location.address:
-                area_names.append(location.address)
-            else:
-                area_names.append("Unknown")
-        except Exception as e:
-            area_names.append("Error")
-        # Optional sleep to respect rate limits
-        # time.sleep(1)
-
-    top_hotspots["area_name"] = area_names
+def prefetch_hotspot_names(df=None, grid_sizes=(HOTSPOT_GRID_SIZE,), top_n=HOTSPOT_COUNT):
 
-    return top_hotspots
+    """
 
-if __name__ == "__main__":
+    A function to look up the area names of the current hotspots ahead of time, so the summary finds them in the cache.
+    Called after an ingest rebuilds the grid cube.
 
-    print("Converting Crime data")
-    df_crimes = pd.read_csv("street_data/test_crime_data.csv")
+    Input: Dataframe with latitude and longitude columns (None to use the grid cube). Grid sizes in degrees.
+           Number of hotspots per size.
+
+    Output: Number of hotspots named.
+
+    """
 
-    # Get top hotspots with area names
-    result = crime_density_heatmap_info(df_crimes, grid_size=0.005, top_n=5)
+    # Finds the hotspots the summary will ask about
+    hotspots = find_hotspots(df, grid_sizes, top_n)
 
-    # Print results
-    print("\nTop 5 Crime Hotspots with Area Names:\n")
-    print(result)
+    # Names any new ones in one rate-limited batch
+    reverse_geocode(list(zip(hotspots["lat_bin"], hotspots["lon_bin"])))
 
+    # Returns the count
+    return len(hotspots)
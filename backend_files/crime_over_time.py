@@ -0,0 +1,63 @@
+## ===================================================================================
+## Crime over time for the line chart
+"""
+Monthly crime counts read from the force × category × month aggregate cube, so the chart never touches the
+raw crime rows however many months have been backfilled.
+"""
+## ===================================================================================
+
+import pandas as pd
+from backend_files.aggregate_cube import build_cube, slice_cube
+from backend_files.datasets import load_cube
+
+
+def get_crime_over_time(df_crimes=None, police_forces=None, by_category=False):
+
+    """
+
+    A function to get the number of crimes in each month.
+
+    Input: Crime dataframe (None to read the shared aggregate cube). Police force IDs to keep (None for all).
+           True to split each month by crime category.
+
+    Output: Dataframe with date (first of the month), crime_count and, if split, category columns, in date order.
+
+    """
+
+    # Uses the shared cube unless crimes were passed in
+    cube = load_cube() if df_crimes is None else build_cube(df_crimes)
+
+    # Sums the cube down to one row per month (and category)
+    by = ["year", "month"] + (["category"] if by_category else [])
+    df = slice_cube(cube, by, police_forces=police_forces)
+
+    # Turns year and month into a date for the x axis
+    df["date"] = pd.to_datetime(pd.DataFrame({"year": df["year"], "month": df["month"], "day": 1}))
+
+    # Returns dataframe
+    return df[["date"] + by[2:] + ["crime_count"]].sort_values(["date"] + by[2:]).reset_index(drop=True)
+
+
+def crime_over_time_info(id=None, csv_data=None):
+
+    """
+
+    A function to display information about crimes over time for the LLM.
+
+    Input: None.
+
+    Output: Dataframe with crimes per month and the change from the month before.
+
+    """
+
+    df = get_crime_over_time()
+
+    # Adds the month-on-month change
+    df["change_pct"] = (df["crime_count"].pct_change() * 100).round(1)
+
+    # Returns dataframe
+    return df
+
+
+if __name__ == "__main__":
+    print(crime_over_time_info().to_string(index=False))
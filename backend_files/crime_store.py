@@ -0,0 +1,230 @@
+## ==============================================================================================================
+## Columnar Crime Store
+"""
+A Parquet dataset of cleaned street-level crimes, partitioned by police force, year and month.
+Readers only load the columns and partitions they ask for.
+"""
+## ==============================================================================================================
+
+import os
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from backend_files.outcomes import add_outcome_columns
+
+# Default store location (CRIME_STORE_PATH moves it, as CRIME_CACHE_DIR moves the caches)
+STORE_PATH = Path(os.getenv("CRIME_STORE_PATH", Path(__file__).parent / "crime_store"))
+
+# CSV the dashboard read before the store existed, used when the store is empty
+CRIME_CSV = Path(__file__).parent / "street_data" / "test_crime_data.csv"
+
+# Columns the store is partitioned by
+PARTITION_COLUMNS = ["police_force_id", "year", "month"]
+
+# Low-cardinality text columns stored as dictionary-encoded categoricals
+CATEGORICAL_COLUMNS = ["category", "location_type", "location_subtype", "street_name", "outcome_category", "outcome_month"]
+
+# Free-text columns stored as plain strings
+STRING_COLUMNS = ["context", "persistent_id"]
+
+# Columns older CSVs hold as outcome_status dictionaries
+OUTCOME_COLUMNS = ["outcome_category", "outcome_month"]
+
+# Hive-style partitioning shared by the writer and readers
+PARTITIONING = ds.partitioning(
+    pa.schema([("police_force_id", pa.string()), ("year", pa.int16()), ("month", pa.int8())]),
+    flavor="hive",
+)
+
+
+def prepare_for_store(df):
+
+    """
+
+    A function to give a cleaned crime dataframe compact, consistent column types.
+
+    Input: Cleaned crime dataframe.
+
+    Output: Dataframe with categorical, float32 and integer columns.
+
+    """
+
+    df = df.copy()
+
+    # Dictionary-encodes repeated text
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(object).fillna("").astype(str).astype("category")
+
+    # Stores free text as strings
+    for col in STRING_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna("").astype(str)
+
+    # Float32 keeps coordinates to about a metre, which matches the API's precision
+    for col in ["latitude", "longitude"]:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+
+    # Integer identifiers and partition keys
+    if "id" in df.columns:
+        df["id"] = df["id"].astype("int64")
+    df["year"] = df["year"].astype("int16")
+    df["month"] = df["month"].astype("int8")
+
+    # Returns dataframe
+    return df
+
+
+def write_crimes(df, path=STORE_PATH, mode="overwrite"):
+
+    """
+
+    A function to write cleaned crimes to the store.
+
+    Input: Cleaned crime dataframe (must include police_force_id, year and month). Store path.
+           "overwrite" replaces the force/month partitions being written, "append" adds to them.
+
+    Output: Number of rows written.
+
+    """
+
+    # Nothing to write
+    if len(df) == 0:
+        return 0
+
+    # Converts to an Arrow table
+    table = pa.Table.from_pandas(prepare_for_store(df), preserve_index=False)
+
+    # Writes one set of files per force/year/month partition
+    ds.write_dataset(
+        table,
+        path,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if mode == "overwrite" else "overwrite_or_ignore",
+    )
+
+    # Returns the row count
+    return len(df)
+
+
+def store_exists(path=STORE_PATH):
+
+    """
+
+    A function to check whether the store has any data.
+
+    Input: Store path.
+
+    Output: True if at least one Parquet file exists.
+
+    """
+
+    return any(Path(path).rglob("*.parquet"))
+
+
+def list_partitions(path=STORE_PATH):
+
+    """
+
+    A function to list the force/month partitions held in the store, without reading any data.
+
+    Input: Store path.
+
+    Output: Dataframe with police_force_id, year and month columns, one row per partition.
+
+    """
+
+    # Reads the partition values from the folder names
+    rows = []
+    for folder in Path(path).glob("police_force_id=*/year=*/month=*"):
+        if any(folder.glob("*.parquet")):
+            force, year, month = (part.split("=", 1)[1] for part in folder.parts[-3:])
+            rows.append({"police_force_id": force, "year": int(year), "month": int(month)})
+
+    # Returns dataframe
+    return pd.DataFrame(rows, columns=["police_force_id", "year", "month"])
+
+
+def _partition_filter(police_forces=None, years=None, months=None):
+
+    """
+
+    Builds a dataset filter expression from the requested partitions.
+
+    """
+
+    expression = None
+
+    for column, values in [("police_force_id", police_forces), ("year", years), ("month", months)]:
+        if values is None:
+            continue
+        condition = ds.field(column).isin(list(values))
+        expression = condition if expression is None else expression & condition
+
+    return expression
+
+
+def read_crimes(columns=None, police_forces=None, years=None, months=None, path=STORE_PATH):
+
+    """
+
+    A function to read crimes from the store, loading only the requested columns and partitions.
+
+    Input: List of columns (None for all). Police force IDs, years and months to keep (None for all). Store path.
+
+    Output: Crime dataframe.
+
+    """
+
+    # Falls back to the CSV the dashboard used before the store existed
+    if not store_exists(path):
+        return read_crimes_csv(columns, police_forces, years, months)
+
+    # Opens the dataset without reading any data yet
+    dataset = ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+
+    # Reads only the requested columns from the matching partitions
+    table = dataset.to_table(columns=columns, filter=_partition_filter(police_forces, years, months))
+
+    # Returns dataframe
+    return table.to_pandas()
+
+
+def read_crimes_csv(columns=None, police_forces=None, years=None, months=None, csv_path=CRIME_CSV):
+
+    """
+
+    A function to read crimes from the legacy CSV with the same interface as read_crimes.
+
+    Input: List of columns (None for all). Police force IDs, years and months to keep (None for all). CSV path.
+
+    Output: Crime dataframe.
+
+    """
+
+    # Reads the requested columns plus any needed for filtering
+    filters = {"police_force_id": police_forces, "year": years, "month": months}
+    usecols = None if columns is None else list(dict.fromkeys(columns + [c for c, v in filters.items() if v is not None]))
+
+    # Older CSVs hold the outcome columns as one outcome_status column
+    legacy = usecols is not None and any(col in usecols for col in OUTCOME_COLUMNS) and "outcome_category" not in pd.read_csv(csv_path, nrows=0).columns
+    if legacy:
+        usecols = [col for col in usecols if col not in OUTCOME_COLUMNS] + ["outcome_status"]
+    df = pd.read_csv(csv_path, usecols=usecols)
+
+    # Splits the outcome dictionaries into their own columns
+    df = add_outcome_columns(df)
+
+    # Applies the partition filters
+    for column, values in filters.items():
+        if values is not None:
+            df = df[df[column].isin(list(values))]
+
+    # Returns dataframe
+    return df if columns is None else df[columns].reset_index(drop=True)
@@ -2,6 +2,8 @@
 ## Crime rates for Lollipop chart
 ## ===================================================================================
 import pandas as pd
+from backend_files.aggregate_cube import build_cube, slice_cube
+from backend_files.datasets import load_crimes, load_cube, load_population, load_forces
 
 def add_crime_rate_column(df):
 
@@ -24,23 +26,31 @@ def add_crime_rate_column(df):
     return df
 
 
-def get_columns_for_heatmap_table(df_crimes = pd.read_csv("backend_files/street_data/test_crime_data.csv"),
-                                          df_population = pd.read_csv("backend_files/data/cleaned_population.csv") ,
-                                            df_forces = pd.read_csv("backend_files/data/forces.csv")):
+def get_columns_for_heatmap_table(df_crimes = None, df_population = None, df_forces = None):
 
     """
 
     A function to get the necessary columns for creating a heatmap.
 
-    Input: Crime dataframe. Population dataframe. Police forces dataframe.
+    Input: Crime dataframe. Population dataframe. Police forces dataframe. Any left as None are taken from the shared datasets
+           (crimes from the aggregate cube).
 
     Output: Dataframe with necessary columns for creating a heatmap.
 
     """
+
+    # Uses the shared cube unless crimes were passed in
+    cube = load_cube() if df_crimes is None else build_cube(df_crimes)
+
+    # Loads any tables that were not passed in
+    if df_population is None:
+        df_population = load_population()
+    if df_forces is None:
+        df_forces = load_forces()
     
 
-    # Groups crimes by police force and category and counts number of crimes
-    df_crime_counts = df_crimes.groupby(["police_force_id", "category"]).size().reset_index(name="crime_count")
+    # Counts number of crimes by police force and category
+    df_crime_counts = slice_cube(cube, ["police_force_id", "category"])
 
     # Merges crime counts with population data
     df_merged_1 = pd.merge(df_crime_counts, df_population, on="police_force_id", how="left")
@@ -87,15 +97,15 @@ def type_against_region_heatmap_info(id = None, csv_data = None):
 
 if __name__ == "__main__":
     print("Converting Crime data")
-    df_crimes = pd.read_csv("street_data/test_crime_data.csv")
+    df_crimes = load_crimes()
 
     print("Converting population data")
-    df_population = pd.read_csv("data/cleaned_population.csv")
+    df_population = load_population()
     print(df_population.dtypes)
     print(df_population.head())
 
     print("Getting forces")
-    df_forces = pd.read_csv("data/forces.csv")
+    df_forces = load_forces()
 
     df_heatmap = get_columns_for_heatmap_table(df_crimes, df_population, df_forces)
     print(type_against_region_heatmap_info(df_heatmap))
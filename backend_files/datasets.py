@@ -0,0 +1,195 @@
+## ==============================================================================================================
+## Shared Dataset Provider
+"""
+Loads the crime, population and police force tables, the aggregate crime cubes and the map tile pyramid, on first use and shares them across the app.
+Nothing is read at import time; call invalidate() after new data is written, and refresh() to pick up data another
+process (e.g. the ingest or monthly sync CLI) wrote.
+"""
+## ==============================================================================================================
+
+import threading
+from pathlib import Path
+
+import pandas as pd
+from backend_files import aggregate_cube, tile_pyramid
+from backend_files.crime_store import STORE_PATH, read_crimes
+
+# Folder holding the reference CSVs
+DATA_DIR = Path(__file__).parent / "data"
+
+# Loaded tables keyed by (dataset name, arguments)
+_datasets = {}
+_lock = threading.Lock()
+
+# Bumped on every invalidation so callers can tell when data changed
+_version = 0
+
+# Modification times of the files on disk when refresh() last looked, None before the first look
+_disk_signature = None
+
+
+def _load(key, loader):
+
+    """
+
+    Returns a loaded table, calling the loader only the first time the key is requested.
+
+    """
+
+    with _lock:
+        if key not in _datasets:
+            _datasets[key] = loader()
+        return _datasets[key]
+
+
+def load_crimes(columns=None):
+
+    """
+
+    A function to get the cleaned crimes from the crime store.
+
+    Input: List of columns to load (None for all).
+
+    Output: Crime dataframe (shared, so treat it as read-only).
+
+    """
+
+    key = ("crimes", None if columns is None else tuple(columns))
+    return _load(key, lambda: read_crimes(columns=None if columns is None else list(columns)))
+
+
+def load_cube(grid=False):
+
+    """
+
+    A function to get the crime counts by force, category, year and month.
+
+    Input: True for the cube that is also split into grid cells.
+
+    Output: Cube dataframe (shared, so treat it as read-only).
+
+    """
+
+    return _load(("cube", grid), lambda: aggregate_cube.load_cube(grid))
+
+
+def load_tiles():
+
+    """
+
+    A function to get the crime counts per category in the map tiles of every zoom level.
+
+    Input: None.
+
+    Output: Pyramid dataframe (shared, so treat it as read-only).
+
+    """
+
+    return _load(("tiles",), tile_pyramid.load_tiles)
+
+
+def load_population():
+
+    """
+
+    A function to get the cleaned population served by each police force.
+
+    Input: None.
+
+    Output: Population dataframe (shared, so treat it as read-only).
+
+    """
+
+    return _load(("population",), lambda: pd.read_csv(DATA_DIR / "cleaned_population.csv"))
+
+
+def load_forces():
+
+    """
+
+    A function to get the police force ID to name lookup.
+
+    Input: None.
+
+    Output: Police forces dataframe (shared, so treat it as read-only).
+
+    """
+
+    return _load(("forces",), lambda: pd.read_csv(DATA_DIR / "forces.csv"))
+
+
+def invalidate(name=None):
+
+    """
+
+    A function to drop loaded tables so the next call reloads them.
+
+    Input: Dataset name ("crimes", "cube", "tiles", "population" or "forces"), or None for all of them.
+
+    Output: None.
+
+    """
+
+    global _version
+
+    with _lock:
+        for key in [k for k in _datasets if name is None or k[0] == name]:
+            del _datasets[key]
+        _version += 1
+
+
+def disk_signature(store_path=STORE_PATH):
+
+    """
+
+    A function to fingerprint the crime data on disk without reading it.
+
+    Input: Store path.
+
+    Output: Tuple of the store's partition folders with their modification times, and those of the saved cubes and tiles
+            (a partition folder's time changes whenever files are written to or deleted from it).
+
+    """
+
+    paths = sorted(Path(store_path).glob("police_force_id=*/year=*/month=*"))
+    paths += [aggregate_cube.CUBE_PATH, aggregate_cube.GRID_CUBE_PATH, tile_pyramid.TILES_PATH]
+    return tuple((str(path), path.stat().st_mtime_ns) for path in paths if path.exists())
+
+
+def refresh(force=False, store_path=STORE_PATH):
+
+    """
+
+    A function to reload the tables if the crime store, cubes or tiles changed on disk since the last call.
+    The app calls this on every run, so an ingest in another process shows up without restarting it.
+
+    Input: True to reload whether or not anything changed. Store path.
+
+    Output: True if the tables were dropped and will be reloaded.
+
+    """
+
+    global _disk_signature
+
+    signature = disk_signature(store_path)
+    changed = force or (_disk_signature is not None and signature != _disk_signature)
+    _disk_signature = signature
+
+    if changed:
+        invalidate()
+    return changed
+
+
+def dataset_version():
+
+    """
+
+    A function to get a number that changes whenever the data is invalidated.
+
+    Input: None.
+
+    Output: Integer version.
+
+    """
+
+    return _version
@@ -0,0 +1,119 @@
+## ==============================================================================================================
+## Concurrent Fetch Engine
+"""
+Runs many police.uk requests in parallel on a bounded thread pool while respecting the API rate limit.
+"""
+## ==============================================================================================================
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# police.uk allows 15 requests per second on average with bursts of up to 30
+POLICE_API_RATE = 15
+POLICE_API_BURST = 30
+
+# Default number of requests in flight at once
+DEFAULT_MAX_WORKERS = 8
+
+
+class RateLimiter:
+
+    """
+
+    A thread-safe token bucket that limits how many requests can start per second.
+
+    Input: Average requests per second. Maximum burst size.
+
+    """
+
+    def __init__(self, rate=POLICE_API_RATE, burst=POLICE_API_BURST):
+
+        # Stores the refill rate and bucket size
+        self.rate = rate
+        self.burst = burst
+
+        # Starts with a full bucket
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+
+        """
+
+        Blocks until a request is allowed to start.
+
+        Input: None.
+
+        Output: None.
+
+        """
+
+        while True:
+            with self._lock:
+
+                # Refills the bucket for the time passed since the last call
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                # Takes a token if one is available
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                # Works out how long until the next token is available
+                wait = (1 - self._tokens) / self.rate
+
+            # Sleeps outside the lock so other threads can refill
+            time.sleep(wait)
+
+
+# Shared limiter so every concurrent fetch in the process counts against the same police.uk budget
+POLICE_API_LIMITER = RateLimiter()
+
+
+def _rate_limited_call(fetch, item, rate_limiter):
+
+    """
+
+    Waits for the rate limiter and then calls the fetch function.
+
+    Input: Fetch function. Item to fetch. Rate limiter (or None).
+
+    Output: Result of the fetch function.
+
+    """
+
+    # Waits for permission to send the request
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+
+    # Calls the fetch function
+    return fetch(item)
+
+
+def fetch_concurrently(fetch, items, max_workers=DEFAULT_MAX_WORKERS, rate_limiter=None):
+
+    """
+
+    A function to call a fetch function for every item in parallel.
+
+    Input: Fetch function taking one item. List of items. Maximum number of calls in flight.
+           Rate limiter applied per call (police.uk requests are already limited inside http_client.api_get).
+
+    Output: List of results in the same order as the items.
+
+    """
+
+    # Runs serially when only one worker is requested
+    if max_workers <= 1:
+        return [_rate_limited_call(fetch, item, rate_limiter) for item in items]
+
+    # Submits every item to a bounded thread pool
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_rate_limited_call, fetch, item, rate_limiter) for item in items]
+
+        # Collects the results in submission order so the output is deterministic
+        return [future.result() for future in futures]
@@ -0,0 +1,326 @@
+## ==============================================================================================================
+## Cached Reverse Geocoder
+"""
+Turns hotspot coordinates into area names. Names are cached in SQLite by rounded latitude/longitude, missing ones are
+looked up in one rate-limited batch (Nominatim allows one request per second), and when Nominatim is unreachable
+the nearest street name in our own crime data is used instead.
+"""
+## ==============================================================================================================
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from backend_files.fetch_engine import RateLimiter
+
+# Default cache location
+GEOCODE_CACHE_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "geocode.sqlite"
+
+# Decimal places coordinates are rounded to before lookup (3 ≈ 100m)
+GEOCODE_PRECISION = 3
+
+# Names taken from the crime data are only trusted for a day, so Nominatim is tried again later
+OFFLINE_TTL = 24 * 60 * 60
+
+# Nominatim's usage policy allows one request per second
+NOMINATIM_LIMITER = RateLimiter(rate=1, burst=1)
+NOMINATIM_USER_AGENT = "crime_hotspot_app"
+NOMINATIM_TIMEOUT = 10
+
+# Where names come from: "nominatim" (falling back to the crime data) or "offline" (crime data only)
+GEOCODER = "nominatim"
+
+
+def geocode_key(lat, lon, precision=GEOCODE_PRECISION):
+
+    """
+
+    A function to get the cache key of a coordinate.
+
+    Input: Latitude. Longitude. Decimal places to round to.
+
+    Output: Key string, e.g. "52.634,-1.132".
+
+    """
+
+    return f"{round(float(lat), precision):.{precision}f},{round(float(lon), precision):.{precision}f}"
+
+
+class GeocodeCache:
+
+    """
+
+    Area names stored in SQLite by rounded coordinate.
+
+    Input: Path to the database file. Seconds a name taken from the crime data stays valid.
+
+    """
+
+    def __init__(self, path=GEOCODE_CACHE_PATH, offline_ttl=OFFLINE_TTL):
+
+        # Stores the settings
+        self.path = Path(path)
+        self.offline_ttl = offline_ttl
+
+        # Hit/miss counters
+        self.hits = 0
+        self.misses = 0
+
+        # Opens the database (shared between threads behind a lock)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS places (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                source TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, keys):
+
+        """
+
+        A function to look up several coordinates at once.
+
+        Input: List of keys from geocode_key.
+
+        Output: Dictionary of key → name for the keys that are cached and still valid.
+
+        """
+
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, name, source, created FROM places WHERE key IN ({','.join('?' * len(keys))})", keys
+            ).fetchall()
+
+        # Drops crime-data names that are past their TTL
+        now = time.time()
+        found = {key: name for key, name, source, created in rows if source != "offline" or now - created <= self.offline_ttl}
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, names, source):
+
+        """
+
+        A function to store several names.
+
+        Input: Dictionary of key → name. Where the names came from ("nominatim" or "offline").
+
+        Output: None.
+
+        """
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?)",
+                                   [(key, name, source, now) for key, name in names.items()])
+            self._conn.commit()
+
+    def clear(self):
+
+        """
+
+        A function to empty the cache.
+
+        """
+
+        with self._lock:
+            self._conn.execute("DELETE FROM places")
+            self._conn.commit()
+
+
+# Cache shared by the backend, opened on first use
+_geocode_cache = None
+_geocode_cache_lock = threading.Lock()
+
+# Counts of names looked up from each source
+_geocode_stats = {"nominatim_calls": 0, "nominatim_errors": 0, "offline_lookups": 0}
+_geocode_stats_lock = threading.Lock()
+
+
+def get_geocode_cache():
+
+    """
+
+    A function to get the shared geocode cache, creating it on first use.
+
+    Input: None.
+
+    Output: GeocodeCache object.
+
+    """
+
+    global _geocode_cache
+
+    with _geocode_cache_lock:
+        if _geocode_cache is None:
+            _geocode_cache = GeocodeCache()
+
+    return _geocode_cache
+
+
+def get_geocode_stats():
+
+    """
+
+    A function to report how names were found.
+
+    Input: None.
+
+    Output: Dictionary with cache hits and misses, Nominatim calls and errors, and crime data lookups.
+
+    """
+
+    cache = get_geocode_cache()
+    with _geocode_stats_lock:
+        return {"cache_hits": cache.hits, "cache_misses": cache.misses, **_geocode_stats}
+
+
+def nominatim_reverse(lat, lon):
+
+    """
+
+    A function to look up one coordinate on Nominatim, waiting for the rate limiter first.
+
+    Input: Latitude. Longitude.
+
+    Output: Address string (None if Nominatim has no address there).
+
+    """
+
+    # Imported here so geopy is only loaded when a lookup is needed
+    from geopy.geocoders import Nominatim
+
+    NOMINATIM_LIMITER.acquire()
+    with _geocode_stats_lock:
+        _geocode_stats["nominatim_calls"] += 1
+    location = Nominatim(user_agent=NOMINATIM_USER_AGENT).reverse((lat, lon), exactly_one=True, timeout=NOMINATIM_TIMEOUT)
+
+    # Returns the address
+    return location.address if location and location.address else None
+
+
+# Crime locations used for offline names, with the dataset version they were loaded at
+_street_points = (None, None)
+
+
+def _load_street_points():
+
+    """
+
+    Returns the distinct crime locations with a street name as (latitudes, longitudes, names) arrays.
+
+    """
+
+    global _street_points
+
+    # Imported here so the store is only read when an offline name is needed
+    from backend_files.datasets import dataset_version, load_crimes
+
+    # Reloads after new crimes are written
+    version = dataset_version()
+    if _street_points[0] != version:
+        df = load_crimes(columns=["latitude", "longitude", "street_name"]).dropna().drop_duplicates()
+        _street_points = (version, (df["latitude"].to_numpy(dtype="float64"), df["longitude"].to_numpy(dtype="float64"),
+                                    df["street_name"].astype(str).to_numpy()))
+
+    return _street_points[1]
+
+
+def nearest_street(lat, lon):
+
+    """
+
+    A function to find the street of the nearest recorded crime.
+
+    Input: Latitude. Longitude.
+
+    Output: Street name with "On or near" removed ("Unknown" when there is no crime data).
+
+    """
+
+    try:
+        lats, lons, names = _load_street_points()
+    except Exception:
+        return "Unknown"
+
+    if not len(lats):
+        return "Unknown"
+
+    # Squared distance with longitude scaled for the latitude
+    with _geocode_stats_lock:
+        _geocode_stats["offline_lookups"] += 1
+    distance = (lats - lat) ** 2 + ((lons - lon) * np.cos(np.radians(lat))) ** 2
+
+    # Returns the closest street
+    return names[np.argmin(distance)].removeprefix("On or near ").strip() or "Unknown"
+
+
+def reverse_geocode(points, geocoder=None, cache=None):
+
+    """
+
+    A function to get an area name for each coordinate.
+    Cached names are returned straight away; the rest are looked up in one rate-limited batch and cached.
+
+    Input: List of (latitude, longitude) tuples. Function taking (lat, lon) and returning an address
+           (None for Nominatim, or the crime data only when GEOCODER is "offline"). GeocodeCache (None for the shared one).
+
+    Output: List of names in the same order as the points.
+
+    """
+
+    cache = cache or get_geocode_cache()
+    if geocoder is None and GEOCODER == "nominatim":
+        geocoder = nominatim_reverse
+
+    # Looks every point up in the cache at once
+    keys = [geocode_key(lat, lon) for lat, lon in points]
+    names = cache.get_many(keys)
+
+    # Fetches each missing coordinate once, even if several points share it
+    missing = {key: point for key, point in zip(keys, points) if key not in names}
+    found, offline = {}, {}
+
+    for key, (lat, lon) in missing.items():
+        name = None
+        if geocoder is not None:
+            try:
+                name = geocoder(lat, lon)
+            except Exception:
+                # Nominatim is down or refused the request, so the rest of the batch goes straight to the crime data
+                with _geocode_stats_lock:
+                    _geocode_stats["nominatim_errors"] += 1
+                geocoder = None
+
+        if name:
+            found[key] = name
+        else:
+            offline[key] = nearest_street(lat, lon)
+
+    # Stores the new names
+    cache.put_many(found, "nominatim")
+    cache.put_many(offline, "offline")
+    names.update(found)
+    names.update(offline)
+
+    # Returns the names in order
+    return [names[key] for key in keys]
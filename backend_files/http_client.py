@@ -0,0 +1,204 @@
+## ==============================================================================================================
+## Shared HTTP Client for police.uk
+"""
+One pooled requests session used by every police.uk call, with keep-alive, gzip, timeouts,
+retries with exponential backoff and per-endpoint latency/retry statistics.
+"""
+## ==============================================================================================================
+
+import threading
+import time
+from collections import defaultdict
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from backend_files.fetch_engine import POLICE_API_LIMITER
+
+# Status codes worth retrying (rate limited or temporary server errors)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 60)
+
+# Retry settings
+MAX_RETRIES = 4
+BACKOFF_FACTOR = 0.5
+MAX_BACKOFF = 30
+
+# Number of keep-alive connections held open to each host
+POOL_SIZE = 32
+
+# Session shared by every thread in the process
+_session = None
+_session_lock = threading.Lock()
+
+# Per-endpoint statistics
+_stats = defaultdict(lambda: {"requests": 0, "retries": 0, "errors": 0, "bytes": 0, "total_latency": 0.0, "max_latency": 0.0})
+_stats_lock = threading.Lock()
+
+
+def get_session():
+
+    """
+
+    A function to get the shared pooled session, creating it on first use.
+
+    Input: None.
+
+    Output: requests Session object.
+
+    """
+
+    global _session
+
+    with _session_lock:
+        if _session is None:
+
+            # Pools keep-alive connections so repeat requests skip the TCP and TLS handshake
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=0)
+
+            # Builds the session
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+                "User-Agent": "crime-data-dashboard",
+            })
+            _session = session
+
+    return _session
+
+
+def _backoff_delay(attempt, response=None):
+
+    """
+
+    Works out how long to wait before the next attempt.
+
+    Input: Attempt number (from 0). Response that triggered the retry (optional).
+
+    Output: Seconds to sleep.
+
+    """
+
+    # Honours the server's Retry-After header when it gives one in seconds
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(int(retry_after), MAX_BACKOFF)
+
+    # Otherwise doubles the wait on every attempt
+    return min(BACKOFF_FACTOR * (2 ** attempt), MAX_BACKOFF)
+
+
+def _record(endpoint, latency, retries, size, error=False):
+
+    """
+
+    Adds one finished request to the endpoint statistics.
+
+    """
+
+    with _stats_lock:
+        stats = _stats[endpoint]
+        stats["requests"] += 1
+        stats["retries"] += retries
+        stats["errors"] += int(error)
+        stats["bytes"] += size
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+
+
+def api_get(url, endpoint, params=None, timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, retry_statuses=RETRY_STATUSES,
+            rate_limiter=POLICE_API_LIMITER):
+
+    """
+
+    A function to send a GET request through the shared session, retrying on failure.
+
+    Input: URL. Endpoint name used for statistics. Query parameters. Timeout. Maximum retries.
+           Status codes to retry on. Rate limiter every attempt waits on (None for no limit).
+
+    Output: requests Response object (the last one received if every retry failed).
+
+    """
+
+    # Gets the pooled session
+    session = get_session()
+
+    # Times the request including any retries
+    start = time.perf_counter()
+
+    for attempt in range(max_retries + 1):
+
+        # Waits for the shared police.uk rate limit
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+
+        # Retries dropped connections and timeouts
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == max_retries:
+                _record(endpoint, time.perf_counter() - start, attempt, 0, error=True)
+                raise
+            time.sleep(_backoff_delay(attempt))
+            continue
+
+        # Retries rate limiting and temporary server errors
+        if response.status_code in retry_statuses and attempt < max_retries:
+            time.sleep(_backoff_delay(attempt, response))
+            continue
+
+        break
+
+    # Records the request using the bytes sent over the wire
+    size = int(response.headers.get("Content-Length", len(response.content)))
+    _record(endpoint, time.perf_counter() - start, attempt, size, error=response.status_code != 200)
+
+    # Returns the response
+    return response
+
+
+def get_request_stats():
+
+    """
+
+    A function to report latency and retry counts for every endpoint called so far.
+
+    Input: None.
+
+    Output: Dataframe with one row per endpoint.
+
+    """
+
+    # Copies the counters
+    with _stats_lock:
+        rows = [{"endpoint": endpoint, **stats} for endpoint, stats in _stats.items()]
+
+    # Returns an empty table if nothing has been called yet
+    if not rows:
+        return pd.DataFrame(columns=["endpoint", "requests", "retries", "errors", "bytes", "mean_latency", "max_latency"])
+
+    # Adds the mean latency
+    df = pd.DataFrame(rows)
+    df["mean_latency"] = df["total_latency"] / df["requests"]
+
+    # Returns dataframe
+    return df[["endpoint", "requests", "retries", "errors", "bytes", "mean_latency", "max_latency"]]
+
+
+def reset_request_stats():
+
+    """
+
+    A function to clear the endpoint statistics.
+
+    """
+
+    with _stats_lock:
+        _stats.clear()
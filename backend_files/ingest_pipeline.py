@@ -0,0 +1,529 @@
+## ==============================================================================================================
+## Streaming Ingest Pipeline
+"""
+Fetches, cleans, de-duplicates and writes crimes one batch of query polygons at a time, so memory stays bounded
+by the batch size instead of growing with the number of forces. Forces and months can be spread across a process pool.
+
+Usage: python -m backend_files.ingest_pipeline [police force IDs] [--workers N] [--month YYYY-MM] [--months N] [--restart]
+"""
+## ==============================================================================================================
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from backend_files import backend_functions
+from backend_files.aggregate_cube import CubeDelta, clear_cubes, load_cube
+from backend_files.backend_functions import cleaning, get_available_months, get_force_query_groups, get_split_stats, get_street_level_crimes_adaptive
+from backend_files.crime_density import prefetch_hotspot_names
+from backend_files.crime_store import STORE_PATH, read_crimes, store_exists, write_crimes
+from backend_files.datasets import invalidate
+from backend_files.fetch_engine import DEFAULT_MAX_WORKERS, POLICE_API_LIMITER, fetch_concurrently
+from backend_files.tile_pyramid import rebuild_tiles
+from backend_files.triangle_index import load_index
+
+# Query polygons fetched, cleaned and written together (one per fetch worker)
+GROUPS_PER_BATCH = DEFAULT_MAX_WORKERS
+
+# Where finished forces are recorded so an interrupted run can pick up where it stopped
+CHECKPOINT_DIR = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "ingest_checkpoints"
+
+
+class CrimeIdSet:
+
+    """
+
+    A compact set of crime IDs held in sorted NumPy arrays (8 bytes per ID).
+    New IDs go into a small array which is merged into larger ones as it grows, so lookups stay logarithmic.
+
+    """
+
+    def __init__(self):
+
+        # Sorted ID arrays, largest first
+        self.levels = []
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels)
+
+    def add_new(self, ids):
+
+        """
+
+        A function to add IDs to the set, reporting which of them were not already in it.
+
+        Input: Array of crime IDs.
+
+        Output: Boolean mask, True for the first occurrence of each ID not seen before.
+
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+
+        # Keeps the first occurrence of each ID in the batch
+        mask = np.zeros(len(ids), dtype=bool)
+        mask[np.unique(ids, return_index=True)[1]] = True
+
+        # Drops IDs found in any earlier batch
+        for level in self.levels:
+            positions = np.minimum(np.searchsorted(level, ids), len(level) - 1)
+            mask &= level[positions] != ids
+
+        # Adds the new IDs, merging arrays of similar size
+        if mask.any():
+            self.levels.append(np.sort(ids[mask]))
+        while len(self.levels) > 1 and len(self.levels[-2]) <= 2 * len(self.levels[-1]):
+            newest = self.levels.pop()
+            self.levels[-1] = np.sort(np.concatenate([self.levels[-1], newest]))
+
+        # Returns the mask
+        return mask
+
+
+def iter_crime_batches(police_forces, date=None, batch_size=GROUPS_PER_BATCH, max_workers=DEFAULT_MAX_WORKERS):
+
+    """
+
+    A generator of raw crimes, one batch of query polygons at a time.
+
+    Input: List of police force IDs. Month as "YYYY-MM" (None for the latest month). Query polygons per batch.
+           Maximum number of polygons fetched at once.
+
+    Output: Yields (police force ID, raw crime dataframe) tuples. Batches with no crimes are skipped.
+
+    """
+
+    fetch = functools.partial(get_street_level_crimes_adaptive, date=date)
+
+    for police_force_id in police_forces:
+
+        # Plans the force's query polygons
+        groups = get_force_query_groups(police_force_id)
+
+        for start in range(0, len(groups), batch_size):
+
+            # Fetches one batch in parallel, splitting any polygon that hits the crime cap
+            results = fetch_concurrently(fetch, groups[start:start + batch_size], max_workers=max_workers)
+            frames = [df for dfs in results for df in dfs if len(df)]
+
+            if frames:
+                df = pd.concat(frames, ignore_index=True)
+                df["police_force_id"] = police_force_id
+                yield police_force_id, df
+
+
+def iter_clean_batches(batches, seen_ids=None):
+
+    """
+
+    A generator that cleans each batch and drops crimes already seen in an earlier one.
+
+    Input: Iterable of (police force ID, raw crime dataframe) tuples. CrimeIdSet shared across the run (None for a new one).
+
+    Output: Yields (police force ID, cleaned crime dataframe, duplicates dropped) tuples.
+
+    """
+
+    seen_ids = CrimeIdSet() if seen_ids is None else seen_ids
+
+    for police_force_id, df in batches:
+
+        # Cleans the batch on its own
+        df = cleaning(df)
+
+        # Drops crimes fetched in an earlier batch (neighbouring polygons and forces share boundary crimes)
+        new = seen_ids.add_new(df["id"].to_numpy())
+        yield police_force_id, df[new].reset_index(drop=True), int((~new).sum())
+
+
+def write_batches(batches, path=STORE_PATH, update_cubes=True, cube_delta=None):
+
+    """
+
+    A function to write cleaned batches to the crime store as they arrive.
+    Each force/month is replaced the first time the run writes to it and appended to after that.
+    The saved cubes are updated once at the end, not once per batch.
+
+    Input: Iterable of (police force ID, cleaned crime dataframe, duplicates dropped) tuples. Store path.
+           Whether to update the saved aggregate cubes (only done for the default store).
+           CubeDelta to count into instead, for callers that apply it themselves after several runs.
+
+    Output: Dictionary with batches, crimes written and duplicates dropped.
+
+    """
+
+    written_partitions = set()
+    stats = {"batches": 0, "crimes_written": 0, "duplicates_dropped": 0}
+    delta = CubeDelta() if cube_delta is None else cube_delta
+
+    try:
+        for police_force_id, df, duplicates in batches:
+            stats["batches"] += 1
+            stats["duplicates_dropped"] += duplicates
+
+            # Splits the batch into partitions this run has and has not written yet
+            partitions = pd.MultiIndex.from_frame(df[["police_force_id", "year", "month"]])
+            first_write = ~partitions.isin(list(written_partitions))
+            written_partitions.update(partitions[first_write].unique())
+
+            # Replaces stale partitions from earlier runs, then appends to ones written in this run
+            for mode, rows in [("overwrite", df[first_write]), ("append", df[~first_write])]:
+                stats["crimes_written"] += write_crimes(rows, path, mode=mode)
+                if update_cubes and path == STORE_PATH:
+                    delta.add(rows)
+
+    finally:
+        # Every force/month counted was written in full by this run, so its counts replace the cube's old ones
+        # (also runs if a batch fails, so the cubes match what reached the store)
+        if cube_delta is None:
+            delta.apply("overwrite")
+
+    # Returns the counts
+    return stats
+
+
+def peak_rss_mb():
+
+    """
+
+    A function to get the most memory this process has used so far.
+
+    Input: None.
+
+    Output: Peak resident set size in MB (None where the platform does not report it).
+
+    """
+
+    # Linux keeps the high-water mark in /proc (ru_maxrss also counts the parent's memory before a spawn)
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # Kilobytes everywhere except macOS, which reports bytes
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def run_pipeline(police_forces, date=None, path=STORE_PATH, batch_size=GROUPS_PER_BATCH, max_workers=DEFAULT_MAX_WORKERS):
+
+    """
+
+    A function to fetch, clean and store the crimes for a list of forces with bounded memory.
+
+    Input: List of police force IDs. Month as "YYYY-MM" (None for the latest month). Store path.
+           Query polygons per batch. Maximum number of polygons fetched at once.
+
+    Output: Dictionary with batches, crimes written, duplicates dropped, polygons left out over the crime cap,
+            seconds and peak RSS in MB.
+
+    """
+
+    start = time.perf_counter()
+    unfetched = get_split_stats()["unfetched_polygons"]
+
+    # Chains the generators so only one batch is in memory at a time
+    raw = iter_crime_batches(police_forces, date, batch_size, max_workers)
+    stats = write_batches(iter_clean_batches(raw), path)
+    stats["unfetched_polygons"] = get_split_stats()["unfetched_polygons"] - unfetched
+
+    # Rebuilds the map tile pyramid from the updated store
+    if path == STORE_PATH:
+        rebuild_tiles()
+
+    # Makes the dashboard reload the crimes on next use
+    invalidate("crimes")
+    invalidate("cube")
+    invalidate("tiles")
+
+    # Names the new hotspots now so the first summary does not wait on the geocoder
+    if path == STORE_PATH:
+        prefetch_hotspot_names()
+
+    # Returns the run summary
+    stats["seconds"] = round(time.perf_counter() - start, 1)
+    stats["peak_rss_mb"] = peak_rss_mb()
+    return stats
+
+
+## ==============================================================================================================
+## Process Pool Ingestion
+## ==============================================================================================================
+
+def _init_worker(api_url, workers, worker_setup):
+
+    """
+
+    Prepares a pool process: points it at the API and gives it an equal share of the rate limit.
+
+    """
+
+    if api_url is not None:
+        backend_functions.API_BASE_URL = api_url
+
+    # Every process has its own limiter, so together they stay under the API's limit
+    POLICE_API_LIMITER.rate /= workers
+    POLICE_API_LIMITER.burst = max(1, POLICE_API_LIMITER.burst / workers)
+
+    # Extra setup, e.g. the benchmarks' stub environment
+    if worker_setup is not None:
+        worker_setup()
+
+
+def ingest_force(police_force_id, date, path=STORE_PATH):
+
+    """
+
+    A function to fetch, clean and store one force inside a pool process, catching any failure.
+
+    Input: Police force ID. Month as "YYYY-MM". Store path.
+
+    Output: Dictionary with the force, status ("done" or "failed"), counts or error, polygons left out over the crime cap,
+            seconds and peak RSS in MB.
+
+    """
+
+    start = time.perf_counter()
+    unfetched = get_split_stats()["unfetched_polygons"]
+
+    try:
+        # The parent rebuilds the cubes once every force is written
+        raw = iter_crime_batches([police_force_id], date)
+        result = write_batches(iter_clean_batches(raw), path, update_cubes=False)
+        result["status"] = "done"
+
+    except Exception as error:
+        # One bad KML or API failure only fails this force
+        result = {"status": "failed", "error": f"{type(error).__name__}: {error}"}
+
+    # Returns the force's summary
+    result["unfetched_polygons"] = get_split_stats()["unfetched_polygons"] - unfetched
+    result.update(police_force_id=police_force_id, seconds=round(time.perf_counter() - start, 1), peak_rss_mb=peak_rss_mb())
+    return result
+
+
+def drop_cross_force_duplicates(police_forces, dates, path=STORE_PATH):
+
+    """
+
+    A function to drop crimes stored under more than one force, keeping the copy from the first force in the list.
+    Each pool task only de-duplicates its own force, so a crime returned for two neighbouring forces is written twice.
+
+    Input: List of police force IDs, in the order the serial pipeline would fetch them. Months as "YYYY-MM". Store path.
+
+    Output: Dictionary of crimes dropped keyed by (police force ID, month), for force/months that lost any.
+
+    """
+
+    dropped = {}
+    rank = {police_force_id: i for i, police_force_id in enumerate(police_forces)}
+
+    # Nothing was written (every force failed)
+    if not store_exists(path):
+        return dropped
+
+    for date in dates:
+        year, month = int(date[:4]), int(date[5:7])
+
+        # Reads just the IDs of every force's crimes for the month
+        df = read_crimes(["id", "police_force_id"], police_forces, [year], [month], path)
+        if len(df) == 0:
+            continue
+
+        # Marks every copy after the one from the earliest force
+        df["police_force_id"] = df["police_force_id"].astype(str)
+        df = df.assign(rank=df["police_force_id"].map(rank)).sort_values("rank", kind="stable")
+        duplicates = df[df["id"].duplicated()]
+
+        for police_force_id, ids in duplicates.groupby("police_force_id")["id"]:
+
+            # Rewrites the force/month without the duplicates
+            crimes = read_crimes(None, [police_force_id], [year], [month], path)
+            crimes["police_force_id"] = police_force_id
+            keep = ~crimes["id"].isin(ids)
+            if keep.any():
+                write_crimes(crimes[keep], path, mode="overwrite")
+            else:
+                shutil.rmtree(Path(path) / f"police_force_id={police_force_id}" / f"year={year}" / f"month={month}")
+
+            dropped[(police_force_id, date)] = int((~keep).sum())
+
+    # Returns the counts
+    return dropped
+
+
+def _checkpoint_path(checkpoint_dir, date, police_force_id):
+
+    """
+
+    Returns the file marking a force as finished for a month.
+
+    """
+
+    return Path(checkpoint_dir) / date / f"{police_force_id}.json"
+
+
+def backfill_months(date=None, months_back=1):
+
+    """
+
+    A function to list the months a backfill covers.
+
+    Input: Newest month as "YYYY-MM" (None for the latest police.uk has). Number of months to go back, including the newest.
+
+    Output: List of months as "YYYY-MM", newest first.
+
+    """
+
+    # A single named month needs no lookup
+    if date is not None and months_back == 1:
+        return [date]
+
+    # Takes the published months at or before the newest one
+    available = get_available_months()
+    date = date or available[0]
+    return [month for month in available if month <= date][:months_back] or [date]
+
+
+def run_parallel_ingest(police_forces, workers=None, date=None, path=STORE_PATH, checkpoint_dir=CHECKPOINT_DIR,
+                        resume=True, api_url=None, worker_setup=None, progress=print, months_back=1):
+
+    """
+
+    A function to ingest forces across a process pool, one force/month per task.
+    Finished force/months are checkpointed, so re-running after a failure or interruption only fetches the rest.
+    With months_back above 1 this backfills history: every force's months are fetched concurrently.
+
+    Input: List of police force IDs. Number of processes (None for one per CPU). Newest month as "YYYY-MM" (None for the latest).
+           Store path. Checkpoint folder. Whether to skip force/months already checkpointed.
+           API base URL for the workers (None for the real API). Function each worker calls on start.
+           Function called with a progress line after each task (None for silence). Number of months to fetch per force.
+
+    Output: Dataframe with one row per force/month attempted.
+
+    """
+
+    workers = workers or os.cpu_count()
+
+    # Pins the months so every worker fetches the same ones and checkpoints name them
+    if api_url is not None:
+        backend_functions.API_BASE_URL = api_url
+    dates = backfill_months(date, months_back)
+
+    # Builds the triangle index once so the workers only read it
+    load_index()
+
+    # Skips force/months finished by an earlier run
+    tasks = [(force, month) for month in dates for force in police_forces]
+    pending = [(force, month) for force, month in tasks if not (resume and _checkpoint_path(checkpoint_dir, month, force).exists())]
+    if progress and len(pending) < len(tasks):
+        progress(f"Resuming {', '.join(dates)}: {len(tasks) - len(pending)} force/months already done")
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(api_url, workers, worker_setup)) as pool:
+        futures = {pool.submit(ingest_force, force, month, path): (force, month) for force, month in pending}
+
+        for done, future in enumerate(as_completed(futures), 1):
+            police_force_id, month = futures[future]
+
+            try:
+                result = future.result()
+            except Exception as error:
+                # The worker process itself died
+                result = {"police_force_id": police_force_id, "status": "failed", "error": f"{type(error).__name__}: {error}"}
+            result["date"] = month
+
+            # Records the finished force/month
+            if result["status"] == "done":
+                checkpoint = _checkpoint_path(checkpoint_dir, month, police_force_id)
+                checkpoint.parent.mkdir(parents=True, exist_ok=True)
+                checkpoint.write_text(json.dumps(result))
+
+            if progress:
+                detail = f"{result.get('crimes_written', 0):,} crimes in {result.get('seconds', 0)}s" if result["status"] == "done" else result["error"]
+                progress(f"[{done}/{len(pending)}] {police_force_id} {month}: {result['status']}, {detail}")
+
+            results.append(result)
+
+    # Drops crimes stored under two forces before anything is built from the store
+    dropped = drop_cross_force_duplicates(police_forces, dates, path)
+    for result in results:
+        duplicates = dropped.get((result["police_force_id"], result["date"]), 0)
+        if duplicates and result["status"] == "done":
+            result["crimes_written"] -= duplicates
+            result["duplicates_dropped"] += duplicates
+    if progress and dropped:
+        progress(f"Dropped {sum(dropped.values()):,} crimes stored under more than one force")
+
+    # The workers skipped the saved cubes, so the force × category × month cube is rebuilt from the store now
+    # (one read of four columns) and the charts never have to count the raw rows, then the map tile pyramid
+    if path == STORE_PATH:
+        clear_cubes()
+        load_cube()
+        rebuild_tiles()
+    invalidate("crimes")
+    invalidate("cube")
+    invalidate("tiles")
+
+    # Names the new hotspots now so the first summary does not wait on the geocoder
+    if path == STORE_PATH:
+        prefetch_hotspot_names()
+
+    # Returns one row per force/month
+    return pd.DataFrame(results, columns=["police_force_id", "date", "status", "batches", "crimes_written", "duplicates_dropped", "unfetched_polygons", "seconds", "peak_rss_mb", "error"])
+
+
+def main(argv=None):
+
+    """
+
+    Command line entry point for ingesting forces across a process pool.
+
+    """
+
+    parser = argparse.ArgumentParser(description="Fetch, clean and store street-level crimes for police forces.")
+    parser.add_argument("forces", nargs="*", help="Police force IDs (default: every force with a KML boundary)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: one per CPU)")
+    parser.add_argument("--month", default=None, help="Month as YYYY-MM (default: the latest month police.uk has)")
+    parser.add_argument("--months", type=int, default=1, help="Number of months to backfill, counting back from --month")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints and fetch every force/month again")
+    parser.add_argument("--checkpoint-dir", type=Path, default=CHECKPOINT_DIR, help="Folder for checkpoint files")
+    parser.add_argument("--api-url", default=None, help="API base URL, e.g. a local stub")
+    args = parser.parse_args(argv)
+
+    # Defaults to every force with a boundary
+    police_forces = args.forces or [kml.stem for kml in sorted(backend_functions.DATA_DIR.glob("*.kml"))]
+
+    # Clears old checkpoints when restarting
+    if args.restart:
+        shutil.rmtree(args.checkpoint_dir, ignore_errors=True)
+
+    results = run_parallel_ingest(police_forces, args.workers, args.month, checkpoint_dir=args.checkpoint_dir, api_url=args.api_url,
+                                  months_back=args.months)
+
+    # Prints the summary and fails if any force failed
+    failed = results[results["status"] == "failed"]
+    print(f"{len(results) - len(failed)} force/months done, {len(failed)} failed, {int(results['crimes_written'].fillna(0).sum()):,} crimes written, "
+          f"{int(results['unfetched_polygons'].fillna(0).sum())} polygons over the crime cap left out")
+    return 1 if len(failed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
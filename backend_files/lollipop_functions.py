@@ -1,8 +1,10 @@
 import pandas as pd
+from backend_files.aggregate_cube import build_cube, slice_cube
+from backend_files.datasets import load_crimes, load_cube, load_population, load_forces
 ## ===================================================================================
 ## Crime rates for Lollipop chart
 ## ===================================================================================
-print("Imports done")
+
 def add_crime_rate_column(df):
 
     """
@@ -18,29 +20,34 @@ def add_crime_rate_column(df):
     df["crime_rate_per_1000"] = (df["crime_count"] / df["population"]) * 1000
 
     # Returns dataframe
-    print("Done")
-
     return df
 
 
 
-def get_columns_for_crime_rate_by_region(df_crimes = pd.read_csv("backend_files/street_data/test_crime_data.csv"),
-                                          df_population = pd.read_csv("backend_files/data/cleaned_population.csv") ,
-                                            df_forces = pd.read_csv("backend_files/data/forces.csv")):
+def get_columns_for_crime_rate_by_region(df_crimes = None, df_population = None, df_forces = None):
 
     """
 
     A function to get the necessary columns for calculating crime rate by region.
 
-    Input: Crime dataframe. Population dataframe. Police forces dataframe.
+    Input: Crime dataframe. Population dataframe. Police forces dataframe. Any left as None are taken from the shared datasets
+           (crimes from the aggregate cube).
 
     Output: Dataframe with necessary columns for calculating crime rate by region.
 
     """
-    print("get_columns_for_crime_rate_by_region")
 
-    # Groups crimes by region and counts number of crimes
-    df_crime_counts = df_crimes.groupby("police_force_id").size().reset_index(name="crime_count")
+    # Uses the shared cube unless crimes were passed in
+    cube = load_cube() if df_crimes is None else build_cube(df_crimes)
+
+    # Loads any tables that were not passed in
+    if df_population is None:
+        df_population = load_population()
+    if df_forces is None:
+        df_forces = load_forces()
+
+    # Counts number of crimes by region
+    df_crime_counts = slice_cube(cube, ["police_force_id"])
 
     # Merges crime counts with population data
     df_merged_1 = pd.merge(df_crime_counts, df_population, on="police_force_id", how="left")
@@ -55,7 +62,6 @@ def get_columns_for_crime_rate_by_region(df_crimes = pd.read_csv("backend_files/
     df_result = add_crime_rate_column(df_result)
 
     # Returns dataframe
-    print("Done")
     return df_result
 
 def crime_rate_by_region_info(id = None, csv_data = None):
@@ -76,17 +82,6 @@ def crime_rate_by_region_info(id = None, csv_data = None):
     return df_crime_rate
 
 if __name__ == "__main__":
-    print("Converting Crime data")
-    df_crimes = pd.read_csv("street_data/test_crime_data.csv")
-
-    print("Converting population data")
-    df_population = pd.read_csv("data/cleaned_population.csv")
-    print(df_population.dtypes)
-    print(df_population.head())
-
-    print("Getting forces")
-    df_forces = pd.read_csv("data/forces.csv")
-
-    df_crime_rate = get_columns_for_crime_rate_by_region(df_crimes, df_population, df_forces)
-    print(crime_rate_by_region_info(df_crime_rate))
-    print(f"Columns: {df_crime_rate.dtypes}")
\ No newline at end of file
+    # Prints the crime rate table from the shared datasets
+    df_crime_rate = get_columns_for_crime_rate_by_region(load_crimes(), load_population(), load_forces())
+    print(df_crime_rate.to_string(index=False))
@@ -0,0 +1,169 @@
+## ==============================================================================================================
+## Incremental Monthly Sync
+"""
+Brings the crime store up to date by fetching only the months police.uk has published since each force was last
+ingested, instead of re-downloading everything.
+
+Usage: python -m backend_files.monthly_sync [police force IDs]
+"""
+## ==============================================================================================================
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from backend_files import backend_functions
+from backend_files.aggregate_cube import CubeDelta
+from backend_files.backend_functions import get_available_months, get_split_stats
+from backend_files.crime_density import prefetch_hotspot_names
+from backend_files.crime_store import STORE_PATH, list_partitions
+from backend_files.datasets import invalidate
+from backend_files.ingest_pipeline import CrimeIdSet, iter_clean_batches, iter_crime_batches, write_batches
+from backend_files.tile_pyramid import rebuild_tiles
+
+# Last month ingested for each force
+SYNC_STATE_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "sync_state.json"
+
+
+def load_sync_state(state_path=SYNC_STATE_PATH, store_path=STORE_PATH):
+
+    """
+
+    A function to get the last month ingested for each force.
+    Forces missing from the state file are looked up from the partitions already in the store.
+
+    Input: State file path. Store path.
+
+    Output: Dictionary of police force ID → "YYYY-MM".
+
+    """
+
+    # Starts from the newest partition of every force in the store
+    partitions = list_partitions(store_path)
+    partitions["date"] = partitions["year"].astype(str) + "-" + partitions["month"].astype(str).str.zfill(2)
+    state = partitions.groupby("police_force_id")["date"].max().to_dict()
+
+    # The state file also covers months that had no crimes to store
+    state_path = Path(state_path)
+    if state_path.exists():
+        for police_force_id, date in json.loads(state_path.read_text()).items():
+            state[police_force_id] = max(date, state.get(police_force_id, date))
+
+    # Returns the state
+    return state
+
+
+def save_sync_state(state, state_path=SYNC_STATE_PATH):
+
+    """
+
+    A function to save the last month ingested for each force.
+
+    Input: Dictionary of police force ID → "YYYY-MM". State file path.
+
+    Output: None.
+
+    """
+
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(state, indent=2, sort_keys=True))
+
+
+def months_to_fetch(last_month, available_months):
+
+    """
+
+    A function to work out which months a force is missing.
+
+    Input: Last month ingested (None if the force has never been ingested). Months police.uk has, as "YYYY-MM".
+
+    Output: List of months to fetch, oldest first. Only the latest month for a force that has never been ingested.
+
+    """
+
+    if last_month is None:
+        return [max(available_months)]
+
+    return sorted(month for month in available_months if month > last_month)
+
+
+def sync_forces(police_forces, store_path=STORE_PATH, state_path=SYNC_STATE_PATH, progress=print):
+
+    """
+
+    A function to fetch and store only the new months for each force.
+    The new rows are appended to the store and added to the saved aggregate cubes in place, once at the end of the sync.
+
+    Input: List of police force IDs. Store path. State file path. Function called with a progress line (None for silence).
+
+    Output: Dataframe with one row per force: months fetched, crimes written, polygons left out over the crime cap, status and seconds.
+
+    """
+
+    # Checks which months police.uk has published
+    available_months = get_available_months()
+    state = load_sync_state(state_path, store_path)
+
+    seen_ids = CrimeIdSet()
+    cube_delta = CubeDelta()
+    rows = []
+
+    try:
+        for police_force_id in police_forces:
+            start = time.perf_counter()
+            unfetched = get_split_stats()["unfetched_polygons"]
+            months = months_to_fetch(state.get(police_force_id), available_months)
+            row = {"police_force_id": police_force_id, "months": ",".join(months), "crimes_written": 0, "status": "up to date"}
+
+            try:
+                for month in months:
+
+                    # Fetches, cleans and writes the month, counting it towards the cube update
+                    raw = iter_crime_batches([police_force_id], month)
+                    row["crimes_written"] += write_batches(iter_clean_batches(raw, seen_ids), store_path, cube_delta=cube_delta)["crimes_written"]
+
+                    # Records the month straight away so an interrupted sync resumes after it
+                    state[police_force_id] = month
+                    save_sync_state(state, state_path)
+                    row["status"] = "synced"
+
+            except Exception as error:
+                # One failing force does not stop the others
+                row["status"] = f"failed: {type(error).__name__}: {error}"
+
+            row["unfetched_polygons"] = get_split_stats()["unfetched_polygons"] - unfetched
+            row["seconds"] = round(time.perf_counter() - start, 1)
+            rows.append(row)
+
+            if progress:
+                progress(f"{police_force_id}: {row['status']}, {row['months'] or 'no new months'}, {row['crimes_written']:,} crimes")
+
+    finally:
+        # Updates the saved cubes once for every force/month written (also when the sync is interrupted)
+        cube_delta.apply("overwrite")
+
+    # Rebuilds the map tile pyramid if anything new was stored
+    if store_path == STORE_PATH and any(row["crimes_written"] for row in rows):
+        rebuild_tiles()
+
+    # Makes the dashboard reload the crimes on next use
+    invalidate("crimes")
+    invalidate("cube")
+    invalidate("tiles")
+
+    # Names the new hotspots now so the first summary does not wait on the geocoder
+    if store_path == STORE_PATH and any(row["crimes_written"] for row in rows):
+        prefetch_hotspot_names()
+
+    # Returns one row per force
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # Syncs the forces named on the command line (every force with a boundary by default)
+    police_forces = sys.argv[1:] or [kml.stem for kml in sorted(backend_functions.DATA_DIR.glob("*.kml"))]
+    print(sync_forces(police_forces).to_string(index=False))
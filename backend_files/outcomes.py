@@ -0,0 +1,111 @@
+## ==============================================================================================================
+## Crime Outcomes
+"""
+Splits the police.uk outcome_status dictionaries into categorical outcome_category and outcome_month columns,
+and aggregates outcome rates from them.
+"""
+## ==============================================================================================================
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Outcome recorded when the police closed a case without finding a suspect
+NO_SUSPECT = "Investigation complete; no suspect identified"
+
+# Shape of the outcome_status field in crimes-street responses
+OUTCOME_TYPE = pa.struct([("category", pa.string()), ("date", pa.string())])
+
+# Matches the Python repr strings older CSVs stored, e.g. "{'category': '...', 'date': '2025-10'}"
+OUTCOME_PATTERN = r"""'category': (?P<quote>['"])(?P<category>.*?)(?P=quote), 'date': '(?P<date>\d{4}-\d{2})'"""
+
+
+def split_outcome_status(outcome_status):
+
+    """
+
+    A function to split outcome statuses into a category and a month without evaluating each row.
+
+    Input: Series of outcome dictionaries (from the API) or their repr strings (from older CSVs). None or NaN for no outcome.
+           Strings that are not dictionaries, such as "Unknown", are kept as the category.
+
+    Output: Dataframe with categorical outcome_category and outcome_month ("YYYY-MM") columns, null where there is no outcome.
+
+    """
+
+    outcome_status = pd.Series(outcome_status).reset_index(drop=True)
+
+    if pd.api.types.infer_dtype(outcome_status, skipna=True) in ["string", "empty"]:
+        # Pulls both fields out of the repr strings with one regular expression
+        parts = outcome_status.astype(object).str.extract(OUTCOME_PATTERN)
+        month = parts["date"]
+
+        # Keeps plain values such as the "Unknown" filled in by older cleaning runs
+        category = parts["category"].fillna(outcome_status)
+    else:
+        # Converts the dictionaries into one Arrow struct array and pulls out each field
+        struct = pa.array(outcome_status.astype(object).where(outcome_status.notna(), None).tolist(), type=OUTCOME_TYPE)
+        category = pc.struct_field(struct, "category").to_pandas()
+        month = pc.struct_field(struct, "date").to_pandas()
+
+    # Returns dictionary-encoded columns
+    return pd.DataFrame({
+        "outcome_category": category.astype("category"),
+        "outcome_month": month.astype("category"),
+    })
+
+
+def add_outcome_columns(df):
+
+    """
+
+    A function to replace the outcome_status column with outcome_category and outcome_month.
+
+    Input: Crime dataframe.
+
+    Output: Crime dataframe with the outcome columns (unchanged if there is no outcome_status column).
+
+    """
+
+    if "outcome_status" not in df.columns:
+        return df
+
+    # Splits the statuses and swaps them in
+    outcomes = split_outcome_status(df["outcome_status"])
+    df = df.drop(columns=["outcome_status"])
+    for col in outcomes.columns:
+        df[col] = outcomes[col].to_numpy()
+
+    # Returns dataframe
+    return df
+
+
+def get_outcome_rates(df_crimes=None, outcome=NO_SUSPECT, by=("police_force_id", "category")):
+
+    """
+
+    A function to get the share of crimes that ended in a given outcome.
+
+    Input: Crime dataframe with outcome_category (None to read the shared crimes). Outcome to count. Columns to group by.
+
+    Output: Dataframe with crime_count, outcome_count and outcome_rate for each group.
+
+    """
+
+    by = list(by)
+
+    # Imported here so the store can use this module without a cycle
+    if df_crimes is None:
+        from backend_files.datasets import load_crimes
+        df_crimes = load_crimes(columns=by + ["outcome_category"])
+
+    # Flags the matching outcome in one vectorised comparison
+    matched = (df_crimes["outcome_category"] == outcome).rename("outcome_count")
+
+    # Counts crimes and matches per group
+    rates = matched.groupby([df_crimes[col] for col in by], observed=True).agg(["size", "sum"])
+    rates.columns = ["crime_count", "outcome_count"]
+    rates["outcome_rate"] = rates["outcome_count"] / rates["crime_count"]
+
+    # Returns dataframe
+    return rates.reset_index()
@@ -1,4 +1,6 @@
 import pandas as pd
+from backend_files.aggregate_cube import slice_cube
+from backend_files.datasets import load_cube
 ## ===================================================================================
 ## Pie chart of top 3 crime types
 ## ===================================================================================
@@ -14,17 +16,19 @@ def get_crime_types_summary(id = None, csv_data = None):
     """
 
     if id is None: # Means that we are working with csv data instead of API
-        df = pd.read_csv(csv_data)
-
-        # Group by count of category
-        df_grouped = df['category'].value_counts().reset_index()
+        # Group by count of category, from the aggregate cube unless a CSV is given
+        if csv_data is None:
+            df_grouped = slice_cube(load_cube(), ['category'])
+            df_grouped['category'] = df_grouped['category'].astype(str)
+        else:
+            df_grouped = pd.read_csv(csv_data, usecols=["category"])['category'].value_counts().reset_index()
         df_grouped.columns = ['category', 'count']
 
         # Getting top 3 crimes
         top_3 = df_grouped.nlargest(3, 'count')
 
-        # Calculating 'Other' category
-        others = df_grouped.iloc[3:]
+        # Calculating 'Other' category (everything outside the top 3, whatever order the rows came in)
+        others = df_grouped.drop(top_3.index)
         others_count = others['count'].sum()
 
         # Create new row for 'Other'
@@ -43,5 +47,5 @@ def get_crime_types_summary(id = None, csv_data = None):
 
 if __name__ == "__main__":
     # Test data table for pie chart
-    df_summary = get_crime_types_summary(csv_data='backend_files/street_data/test_crime_data.csv')
+    df_summary = get_crime_types_summary()
     print(df_summary)
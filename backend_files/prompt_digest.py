@@ -0,0 +1,282 @@
+## ==============================================================================================================
+## Prompt Digests
+"""
+Turns a chart's summary dataframe into a compact text digest that fits a token budget, so the LLM prompt does not
+carry a padded table of every force × category row. Digests are tried from the most to the least detailed:
+the whole (rounded) table, pivots of the largest rows and columns, then the top rows, keeping fewer each time.
+"""
+## ==============================================================================================================
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Most tokens a digest may use
+DIGEST_TOKEN_BUDGET = 300
+
+# Rows (and pivot columns) kept by the first top-k digest
+DIGEST_TOP_K = 10
+
+# Significant figures numbers are rounded to
+DIGEST_SIGNIFICANT_FIGURES = 3
+
+# Decimal places coordinates are rounded to instead (4 is about 10 m, finer than the hotspot grid)
+COORDINATE_DECIMALS = 4
+
+# Encoding used by the gpt-4o family, for when tiktoken is installed
+TOKEN_ENCODING = "o200k_base"
+
+# Pieces of text that roughly become one token each without tiktoken: short words, numbers and punctuation
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]{1,4}|\d{1,3}|[^\sA-Za-z\d]")
+
+# tiktoken encoder, loaded on first use (False when tiktoken is not installed)
+_encoder = None
+
+
+def count_tokens(text):
+
+    """
+
+    A function to count the tokens in a piece of text.
+
+    Input: Text.
+
+    Output: Number of tokens (exact with tiktoken installed, otherwise an estimate that tends to run slightly high).
+
+    """
+
+    global _encoder
+
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(TOKEN_ENCODING)
+        except ImportError:
+            _encoder = False
+
+    if _encoder:
+        return len(_encoder.encode(text))
+
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _round_significant(values, figures=DIGEST_SIGNIFICANT_FIGURES):
+
+    """
+
+    Rounds an array of numbers to a number of significant figures, leaving whole numbers whole.
+
+    """
+
+    values = np.asarray(values, dtype="float64")
+    magnitude = np.floor(np.log10(np.abs(np.where(values == 0, 1, values))))
+    decimals = np.clip(figures - 1 - magnitude, 0, None)
+    scale = 10 ** decimals
+    return np.round(values * scale) / scale
+
+
+def _number(value):
+
+    """
+
+    Writes a number rounded to significant figures, without exponents for large whole numbers.
+
+    """
+
+    value = _round_significant([value])[0]
+    return f"{int(value)}" if value == int(value) else f"{value:g}"
+
+
+def is_coordinate(column):
+
+    """
+
+    Returns True for latitude/longitude columns, including binned ones such as lat_bin and lon_bin.
+
+    """
+
+    name = str(column).lower()
+    return name in ("lat", "lon", "lng", "latitude", "longitude") or name.startswith(("lat_", "lon_")) or name.endswith("_bin")
+
+
+def tidy_frame(df):
+
+    """
+
+    A function to make a summary dataframe compact before it is written out.
+
+    Input: Summary dataframe (left unchanged).
+
+    Output: Dataframe with a named index turned into a column, numbers rounded (coordinates to fixed decimal places,
+            so nearby hotspots stay apart), dates as "YYYY-MM" and columns holding the same value in every row dropped.
+
+    """
+
+    # Keeps index labels such as the rows of describe(), but not row numbers left over from filtering
+    if df.index.name is not None or not pd.api.types.is_integer_dtype(df.index):
+        df = df.reset_index()
+    df = df.copy()
+
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime("%Y-%m")
+        elif pd.api.types.is_float_dtype(df[column]) and is_coordinate(column):
+            df[column] = df[column].astype("float64").round(COORDINATE_DECIMALS)
+        elif pd.api.types.is_float_dtype(df[column]):
+            df[column] = _round_significant(df[column])
+            # Whole-number floats are written without ".0"
+            if df[column].dropna().mod(1).eq(0).all() and df[column].notna().all():
+                df[column] = df[column].astype("int64")
+
+    # Drops columns that say nothing row by row
+    if len(df) > 1:
+        df = df.loc[:, df.nunique(dropna=False) > 1]
+
+    # Returns dataframe
+    return df.reset_index(drop=True)
+
+
+def _dimensions_and_measures(df):
+
+    """
+
+    Splits columns into labels (text, categories, coordinates) and numbers.
+
+    """
+
+    measures = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column]) and not is_coordinate(column)]
+    dimensions = [column for column in df.columns if column not in measures]
+    return dimensions, measures
+
+
+def _is_time_series(df):
+
+    """
+
+    Returns True for frames with one row per month.
+
+    """
+
+    return "date" in df.columns or {"year", "month"} <= set(df.columns)
+
+
+def _table(df):
+
+    """
+
+    Writes a dataframe as CSV, which has no padding unlike to_string().
+
+    """
+
+    return df.to_csv(index=False, float_format="%.15g").strip()
+
+
+def pivot_digest(df, top_k=DIGEST_TOP_K):
+
+    """
+
+    A function to pivot a two-label table (e.g. force × category) on its first number, keeping the largest rows and columns.
+
+    Input: Tidied dataframe with two label columns and at least one number column. Rows and columns to keep.
+
+    Output: Digest text, or None if the frame does not have that shape.
+
+    """
+
+    dimensions, measures = _dimensions_and_measures(df)
+    if len(dimensions) != 2 or not measures:
+        return None
+
+    row_dim, col_dim = sorted(dimensions, key=lambda column: -df[column].nunique())
+    measure = measures[0]
+    pivot = df.pivot_table(index=row_dim, columns=col_dim, values=measure, aggfunc="sum", fill_value=0, observed=True)
+
+    # Keeps the largest rows and columns and folds the rest into "other"
+    top_rows = pivot.sum(axis=1).nlargest(top_k).index
+    top_cols = pivot.sum(axis=0).nlargest(top_k).index
+    table = pivot.loc[top_rows, top_cols]
+    if len(top_cols) < pivot.shape[1]:
+        table = table.assign(other=pivot.loc[top_rows].drop(columns=top_cols).sum(axis=1))
+
+    lines = [
+        f"{measure} by {row_dim} (rows, top {len(top_rows)} of {pivot.shape[0]}) and {col_dim} (columns, top {len(top_cols)} of {pivot.shape[1]}):",
+        _table(table.reset_index()),
+        f"total {measure}: {_number(pivot.to_numpy().sum())}",
+    ]
+
+    # Returns the digest
+    return "\n".join(lines)
+
+
+def top_k_digest(df, top_k=DIGEST_TOP_K):
+
+    """
+
+    A function to keep the most important rows of a table: the latest months of a time series (with month-on-month
+    change), otherwise the rows with the largest first number.
+
+    Input: Tidied dataframe. Rows to keep.
+
+    Output: Digest text.
+
+    """
+
+    dimensions, measures = _dimensions_and_measures(df)
+
+    if _is_time_series(df) and measures:
+        # Adds the change from the month before and keeps the latest months
+        measure = measures[0]
+        if "change_pct" not in df.columns:
+            df = df.assign(change_pct=_round_significant(df[measure].pct_change() * 100))
+        rows = df.tail(top_k)
+        heading = f"latest {len(rows)} of {len(df)} months"
+    elif measures:
+        # Keeps the rows with the largest first number
+        measure = measures[0]
+        rows = df.nlargest(top_k, measure)
+        heading = f"top {len(rows)} of {len(df)} rows by {measure}"
+    else:
+        rows = df.head(top_k)
+        heading = f"first {len(rows)} of {len(df)} rows"
+
+    lines = [f"{heading}:", _table(rows)]
+
+    # Sums up the rows left out
+    if len(rows) < len(df) and measures and not _is_time_series(df):
+        rest = df.drop(index=rows.index)
+        lines.append(f"other {len(rest)} rows: {measure} total {_number(rest[measure].sum())}")
+
+    # Returns the digest
+    return "\n".join(lines)
+
+
+def build_digest(df, token_budget=DIGEST_TOKEN_BUDGET, top_k=DIGEST_TOP_K):
+
+    """
+
+    A function to turn a summary dataframe into the most detailed digest that fits the token budget.
+
+    Input: Summary dataframe (left unchanged). Most tokens the digest may use. Rows kept by the first top-k digest.
+
+    Output: Digest text.
+
+    """
+
+    df = tidy_frame(df)
+
+    # Halves the rows kept each time: top_k, top_k / 2, ... 1
+    sizes = [top_k >> shift for shift in range(top_k.bit_length())]
+
+    # The whole table, then pivots (which keep the shape of both labels), then the top rows
+    candidates = [_table(df)]
+    if not _is_time_series(df):
+        candidates += [pivot_digest(df, k) for k in sizes]
+    candidates += [top_k_digest(df, k) for k in sizes]
+
+    # Returns the first digest within budget (the smallest one if none fits)
+    candidates = [text for text in candidates if text]
+    for text in candidates:
+        if count_tokens(text) <= token_budget:
+            return text
+    return candidates[-1]
@@ -1,6 +1,12 @@
-from openai import OpenAI
 from dotenv import load_dotenv
+import hashlib
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend_files.summary_cache import get_summary_cache
+from backend_files.prompt_digest import DIGEST_TOKEN_BUDGET, build_digest, count_tokens
 
 ## ====================================================================
 ## Function to get completion from LLM
@@ -8,50 +14,204 @@ import os
 ## Set your OpenAI API key here
 load_dotenv(dotenv_path=".env")
 
-api_key = os.getenv("OPENAI_API_KEY")
-if api_key is None:
-    raise ValueError("OPENAI_API_KEY not set in .env")
-
 #TODO: Need to set api key in environment variable OPENAI_API_KEY  -- > setx OPENAI_API_KEY "sk-xxxxxxxxxxxxxxxx"
 # Do this in your terminal or command prompt
 
+# Where completions come from: "openai", or "fake" for a local stand-in that needs no API key
+COMPLETION_BACKEND = os.getenv("COMPLETION_BACKEND", "openai")
+
+# Seconds the fake backend takes to answer, and to send its first token when streaming
+FAKE_LATENCY = 1.0
+FAKE_TTFT = 0.3
+
+# Prompt tokens the fake backend reads per second before answering, so longer prompts are slower as with a real model
+FAKE_PREFILL_TOKENS_PER_SECOND = 5000
+
+# Most chart summaries requested from the LLM at once
+SUMMARY_MAX_WORKERS = 4
+
+# Client shared by every request, created on first use
+_client = None
+_client_lock = threading.Lock()
+
 ## ====================================================================
 
-def get_completion(prompt,model="gpt-4o-mini", temperature=0):
+def get_client():
+    """
+    Returns the shared OpenAI client, creating it on first use.
+    Returns:
+    client (OpenAI): Client using OPENAI_API_KEY
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            # API key setup
+            api_key = os.getenv("OPENAI_API_KEY")
+            if api_key is None:
+                raise ValueError("OPENAI_API_KEY not set in .env")
+
+            # Client initialization (openai is imported here so it only loads when a summary is requested)
+            from openai import OpenAI
+            _client = OpenAI(api_key=api_key)
+
+    return _client
+
+def _fake_tokens(prompt, model):
+    """
+    Returns the fake backend's reply as a list of word tokens (about 50, like a real summary).
+    """
+    digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+    header = f"[{model}] Summary of a {len(prompt.split())}-word prompt ({digest})."
+    return [f"{word} " for word in header.split() + "Crime counts vary by category and force.".split() * 6]
+
+def _fake_prefill(prompt):
+    """
+    Returns the seconds the fake backend spends reading a prompt.
+    """
+    return count_tokens(prompt) / FAKE_PREFILL_TOKENS_PER_SECOND
+
+def fake_completion(prompt, model="gpt-4o-mini", temperature=0):
+    """
+    Local stand-in for the LLM: waits FAKE_LATENCY seconds (plus the time to read the prompt) and returns a deterministic reply.
+    Parameters:
+    prompt (str): The prompt that would be sent to the LLM
+    Returns:
+    response (str): Placeholder summary naming the prompt
+    """
+    time.sleep(FAKE_LATENCY + _fake_prefill(prompt))
+    return "".join(_fake_tokens(prompt, model)).strip()
+
+def fake_stream(prompt, model="gpt-4o-mini", temperature=0):
+    """
+    Streaming version of fake_completion: the first token after FAKE_TTFT seconds, the rest spread over FAKE_LATENCY.
+    Parameters:
+    prompt (str): The prompt that would be sent to the LLM
+    Returns:
+    tokens (generator): Word tokens of the reply
+    """
+    tokens = _fake_tokens(prompt, model)
+    time.sleep(FAKE_TTFT + _fake_prefill(prompt))
+    for token in tokens:
+        yield token
+        time.sleep((FAKE_LATENCY - FAKE_TTFT) / len(tokens))
+
+def get_completion(prompt,model="gpt-4o-mini", temperature=0, use_cache=True):
     """
     This function takes a prompt as input and returns the response from the LLM.
+    Identical prompts are answered from the summary cache, and identical requests in flight share one completion.
     Parameters:
     prompt (str): The prompt to send to the LLM
+    use_cache (bool): Look the prompt up in the summary cache first
     Returns:
     response (str): The response from the LLM
     """
-    # API key setup
-    load_dotenv(dotenv_path=".env")
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    if api_key is None:
-        raise ValueError("OPENAI_API_KEY not set in .env")
+    def create():
+        # Only runs when the cache has no answer
+        if COMPLETION_BACKEND == "fake":
+            return fake_completion(prompt, model, temperature)
+
+        messages = [{"role": "user", "content": prompt}]
+        response = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature = temperature
+        )
+        return response.choices[0].message.content
+
+    if not use_cache:
+        return create()
+
+    return get_summary_cache().get_or_create(prompt, model, temperature, create)
+
+def stream_completion(prompt, model="gpt-4o-mini", temperature=0, use_cache=True, stats=None):
+    """
+    Streaming version of get_completion: yields the response as it is generated, e.g. into st.write_stream.
+    A cached response is yielded in one piece. The finished response is added to the summary cache.
+    Like get_completion, identical requests share one completion: while a prompt is streaming, the same prompt
+    waits for it to finish and yields its text in one piece (so identical streams must be read on different threads,
+    as stream_chart_summaries does).
+    Parameters:
+    prompt (str): The prompt to send to the LLM
+    use_cache (bool): Look the prompt up in the summary cache first
+    stats (dict): Filled in with ttft (seconds to the first token), seconds, tokens, tokens_per_second, cached and coalesced
+    Returns:
+    chunks (generator): Pieces of the response text
+    """
+    stats = {} if stats is None else stats
+    start = time.perf_counter()
 
-    # Client initialization
-    client = OpenAI(api_key=api_key)
+    # Answers from the cache when it can, or registers this stream as the one completing the prompt
+    cache = get_summary_cache() if use_cache else None
+    cached, entry, owner = cache.claim(prompt, model, temperature) if use_cache else (None, None, True)
 
-    messages = [{"role": "user", "content": prompt}]
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature = temperature
+    parts = []
+    error = None
+    try:
+        # Opens the stream inside the try, so a failed setup (no API key, a network error) is handed to any waiters too
+        if cached is not None:
+            chunks = iter([cached])
+        elif not owner:
+            # The same prompt is already streaming, so its finished text is replayed
+            chunks = iter([cache.wait(entry)])
+        elif COMPLETION_BACKEND == "fake":
+            chunks = fake_stream(prompt, model, temperature)
+        else:
+            messages = [{"role": "user", "content": prompt}]
+            response = get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature = temperature,
+                stream=True
+            )
+            # Each streamed chunk carries about one token
+            chunks = (chunk.choices[0].delta.content for chunk in response if chunk.choices)
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if not parts:
+                stats["ttft"] = time.perf_counter() - start
+            parts.append(chunk)
+            yield chunk
+
+    except Exception as exc:
+        error = exc
+        raise
+
+    except GeneratorExit:
+        # The reader stopped early, so there is no full response to share
+        error = RuntimeError("The streamed completion was closed before it finished")
+        raise
+
+    finally:
+        # Stores the finished response and hands it, or the failure, to any identical requests waiting on it
+        if owner and entry is not None:
+            cache.finish(prompt, model, temperature, entry, text="".join(parts) or None, error=error)
+
+    # Records the timings
+    seconds = time.perf_counter() - start
+    generating = seconds - stats.get("ttft", seconds)
+    stats.update(
+        seconds=seconds,
+        tokens=len(parts),
+        tokens_per_second=len(parts) / generating if owner and generating > 0 else None,
+        cached=not owner,
+        coalesced=entry is not None and not owner,
     )
-    return response.choices[0].message.content
 
-def generate_chart_analysis_summary(data_fetcher, id=None, csv_data='backend_files/street_data/leicestershire_street.csv',word_limit=50,prompt_template=None):
+def build_chart_analysis_prompt(data_fetcher, id=None, csv_data='backend_files/street_data/leicestershire_street.csv',word_limit=50,prompt_template=None, token_budget=DIGEST_TOKEN_BUDGET):
     """
-    Generates a prompt for the LLM to analyze a specific chart type based on provided data summary.
+    Builds the prompt asking the LLM to analyze a specific chart type based on provided data summary.
+    The data goes in as a digest (see prompt_digest) that fits the token budget.
     Parameters:
     data_fetcher (function): Function gives summary data based on the csv. Returns a DataFrame.
     id (str): Optional identifier for specific data fetching
     csv_data (str): Path to the CSV data file
+    token_budget (int): Most tokens the data may use, or None for the whole table
     Returns:
-    summary (str): Generated summary from the LLM
+    prompt (str): Prompt for the LLM
     """
     # Fetch data summary
     df_summary = data_fetcher(id=id, csv_data=csv_data)
@@ -64,13 +224,80 @@ def generate_chart_analysis_summary(data_fetcher, id=None, csv_data='backend_fil
         )
 
     # Generate prompt by inserting the dataframe
-    prompt = prompt_template.format(data=df_summary.to_string(index=False))
+    if token_budget is None:
+        return prompt_template.format(data=df_summary.to_string(index=False))
+    return prompt_template.format(data=build_digest(df_summary, token_budget))
+
+def generate_chart_analysis_summary(data_fetcher, id=None, csv_data='backend_files/street_data/leicestershire_street.csv',word_limit=50,prompt_template=None):
+    """
+    Generates a prompt for the LLM to analyze a specific chart type based on provided data summary.
+    Parameters:
+    data_fetcher (function): Function gives summary data based on the csv. Returns a DataFrame.
+    id (str): Optional identifier for specific data fetching
+    csv_data (str): Path to the CSV data file
+    Returns:
+    summary (str): Generated summary from the LLM
+    """
+    prompt = build_chart_analysis_prompt(data_fetcher, id, csv_data, word_limit, prompt_template)
 
     # Call LLM to get analysis
     summary = get_completion(prompt)
 
     return summary
 
+def stream_chart_analysis_summary(data_fetcher, id=None, csv_data='backend_files/street_data/leicestershire_street.csv',word_limit=50,prompt_template=None, stats=None):
+    """
+    Streaming version of generate_chart_analysis_summary. The data is only fetched once the stream is read.
+    Parameters:
+    data_fetcher (function): Function gives summary data based on the csv. Returns a DataFrame.
+    stats (dict): Filled in by stream_completion
+    Returns:
+    chunks (generator): Pieces of the summary text
+    """
+    prompt = build_chart_analysis_prompt(data_fetcher, id, csv_data, word_limit, prompt_template)
+    yield from stream_completion(prompt, stats=stats)
+
+def _queue_stream(stream, out):
+    """
+    Reads a stream on a pool thread, passing each chunk on through a queue and None at the end.
+    """
+    try:
+        for chunk in stream:
+            out.put(chunk)
+    except Exception as error:
+        out.put(f"Summary unavailable ({type(error).__name__}: {error})")
+    finally:
+        out.put(None)
+
+def _read_queue(out):
+    """
+    Yields the chunks put on a queue by _queue_stream until it finishes.
+    """
+    while (chunk := out.get()) is not None:
+        yield chunk
+
+def stream_chart_summaries(jobs, max_workers=SUMMARY_MAX_WORKERS):
+    """
+    Starts every chart summary streaming at once on a thread pool.
+    Each stream is buffered, so a chart read later shows what was generated meanwhile and then carries on live.
+    Parameters:
+    jobs (dict): Chart name -> keyword arguments for stream_chart_analysis_summary
+    max_workers (int): Most summaries requested from the LLM at once
+    Returns:
+    streams (dict): Chart name -> (generator of text chunks for st.write_stream, stats dict filled in when it finishes)
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    streams = {}
+
+    for name, kwargs in jobs.items():
+        stats, out = {}, queue.Queue()
+        pool.submit(_queue_stream, stream_chart_analysis_summary(**kwargs, stats=stats), out)
+        streams[name] = (_read_queue(out), stats)
+
+    # Lets the submitted summaries finish without blocking here
+    pool.shutdown(wait=False)
+    return streams
+
 if __name__ == "__main__":
     # prompt = "Explain the theory of relativity in simple terms. 10 words."
     # response = get_completion(prompt)
@@ -0,0 +1,230 @@
+## ==============================================================================================================
+## Persistent Response Cache
+"""
+A SQLite cache of police.uk responses keyed on endpoint + polygon + month, so repeat runs of the
+street crime fetch read from disk instead of the network.
+"""
+## ==============================================================================================================
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+# Default cache location
+CACHE_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "responses.sqlite"
+
+# Responses without an explicit month follow the API's latest month, so they are only trusted for a day
+LATEST_TTL = 24 * 60 * 60
+
+# Total compressed size kept on disk before the least recently used entries are evicted
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+
+class ResponseCache:
+
+    """
+
+    A content-addressed response cache stored in SQLite.
+
+    Input: Path to the database file. Size cap in bytes. Seconds a latest-month response stays valid.
+
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_CACHE_BYTES, latest_ttl=LATEST_TTL):
+
+        # Stores the settings
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.latest_ttl = latest_ttl
+
+        # Hit/miss counters
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+        # Opens the database (shared between threads behind a lock)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                month TEXT,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL,
+                body BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint, poly_str, date=None):
+
+        """
+
+        Builds the cache key for a request.
+
+        Input: Endpoint name. Polygon string. Month as "YYYY-MM" (None for the latest month).
+
+        Output: Hex digest identifying the request.
+
+        """
+
+        return hashlib.sha256(f"{endpoint}|{poly_str}|{date or 'latest'}".encode()).hexdigest()
+
+    def get(self, endpoint, poly_str, date=None):
+
+        """
+
+        A function to look up a cached response.
+
+        Input: Endpoint name. Polygon string. Month (None for the latest month).
+
+        Output: Response body as bytes, or None on a miss.
+
+        """
+
+        key = self.make_key(endpoint, poly_str, date)
+
+        with self._lock:
+            row = self._conn.execute("SELECT created, month, body FROM responses WHERE key = ?", (key,)).fetchone()
+
+            # Counts a miss when the key is not stored
+            if row is None:
+                self.misses += 1
+                return None
+
+            # Latest-month entries go stale once the TTL passes; explicit months never change
+            created, month, body = row
+            if month is None and time.time() - created > self.latest_ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            # Marks the entry as recently used
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+
+        # Returns the decompressed body
+        return zlib.decompress(body)
+
+    def put(self, endpoint, poly_str, date, body):
+
+        """
+
+        A function to store a response, evicting old entries if the cache is over its size cap.
+
+        Input: Endpoint name. Polygon string. Month (None for the latest month). Response body as bytes.
+
+        Output: None.
+
+        """
+
+        # Compresses the body
+        key = self.make_key(endpoint, poly_str, date)
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, date, now, now, len(compressed), compressed),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+
+        """
+
+        Deletes least recently used entries until the cache fits under its size cap (lock must be held).
+
+        """
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Walks entries from least to most recently used
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+
+        """
+
+        A function to empty the cache.
+
+        """
+
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def get_stats(self):
+
+        """
+
+        A function to report the cache counters.
+
+        Input: None.
+
+        Output: Dictionary with hits, misses, expired, evictions, entries and bytes.
+
+        """
+
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+# Cache shared by the backend, opened on first use
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+
+    """
+
+    A function to get the shared response cache, creating it on first use.
+
+    Input: None.
+
+    Output: ResponseCache object.
+
+    """
+
+    global _response_cache
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+
+    return _response_cache
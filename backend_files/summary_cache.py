@@ -0,0 +1,310 @@
+## ==============================================================================================================
+## LLM Summary Cache
+"""
+A SQLite cache of LLM completions keyed on a hash of the prompt, model and temperature, so asking for the same chart
+summary again returns the stored text instead of paying for another completion. Concurrent identical requests
+share one completion.
+"""
+## ==============================================================================================================
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Default cache location
+SUMMARY_CACHE_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "summaries.sqlite"
+
+# Seconds a summary stays valid (the data behind a chart changes at most monthly)
+SUMMARY_TTL = 7 * 24 * 60 * 60
+
+# Most summaries kept before the least recently used ones are evicted
+MAX_SUMMARIES = 1000
+
+
+class SummaryCache:
+
+    """
+
+    Completions stored in SQLite by prompt hash, with a TTL, an entry cap and request coalescing.
+
+    Input: Path to the database file. Seconds a summary stays valid. Most summaries kept.
+
+    """
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, ttl=SUMMARY_TTL, max_entries=MAX_SUMMARIES):
+
+        # Stores the settings
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # Hit/miss counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+
+        # Completions in progress, keyed like the cache, so identical requests wait for the first one
+        self._in_flight = {}
+
+        # Opens the database (shared between threads behind a lock)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL,
+                text TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_last_access ON summaries (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt, model, temperature):
+
+        """
+
+        Builds the cache key for a completion.
+
+        Input: Prompt text. Model name. Temperature.
+
+        Output: Hex digest identifying the request.
+
+        """
+
+        return hashlib.sha256(f"{model}|{float(temperature)}|{prompt}".encode()).hexdigest()
+
+    def get(self, key):
+
+        """
+
+        A function to look up a stored summary (lock must be held).
+
+        Input: Cache key.
+
+        Output: Summary text, or None on a miss.
+
+        """
+
+        row = self._conn.execute("SELECT created, text FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        # Drops summaries past their TTL
+        created, text = row
+        if time.time() - created > self.ttl:
+            self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+            self._conn.commit()
+            self.expired += 1
+            return None
+
+        # Marks the entry as recently used
+        self._conn.execute("UPDATE summaries SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return text
+
+    def put(self, key, model, text):
+
+        """
+
+        A function to store a summary, evicting the least recently used ones over the cap (lock must be held).
+
+        Input: Cache key. Model name. Summary text.
+
+        Output: None.
+
+        """
+
+        now = time.time()
+        self._conn.execute("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)", (key, model, now, now, text))
+
+        # Evicts the oldest entries over the cap
+        excess = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute("DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY last_access LIMIT ?)", (excess,))
+            self.evictions += excess
+        self._conn.commit()
+
+    def claim(self, prompt, model, temperature):
+
+        """
+
+        A function to look up the stored summary for a prompt, or else join or start the completion for it.
+        get_or_create is built on this; a streamed completion uses it directly so identical streams share one completion.
+
+        Input: Prompt text. Model name. Temperature.
+
+        Output: (text, entry, owner) tuple: the stored text (None on a miss), the in-flight entry to wait on or finish,
+                and whether this caller must create the summary (and then call finish).
+
+        """
+
+        key = self.make_key(prompt, model, temperature)
+
+        with self._lock:
+            # Returns a stored summary
+            text = self.get(key)
+            if text is not None:
+                self.hits += 1
+                return text, None, False
+
+            # Joins a completion already in progress
+            entry = self._in_flight.get(key)
+            if entry is not None:
+                self.coalesced += 1
+                return None, entry, False
+
+            # Starts a new one
+            entry = self._in_flight[key] = {"done": threading.Event(), "text": None, "error": None}
+            self.misses += 1
+            return None, entry, True
+
+    def finish(self, prompt, model, temperature, entry, text=None, error=None):
+
+        """
+
+        A function to end a claimed completion: stores the text and hands it, or the failure, to everyone waiting.
+
+        Input: Prompt text. Model name. Temperature. Entry returned by claim. Summary text (None to store nothing).
+               Exception the completion failed with (None if it succeeded).
+
+        Output: None.
+
+        """
+
+        key = self.make_key(prompt, model, temperature)
+        entry["text"], entry["error"] = text, error
+
+        try:
+            with self._lock:
+                del self._in_flight[key]
+                if error is None and text is not None:
+                    self.put(key, model, text)
+
+        finally:
+            # Wakes the waiting requests even if storing failed
+            entry["done"].set()
+
+    @staticmethod
+    def wait(entry):
+
+        """
+
+        A function to wait for a completion another request claimed.
+
+        Input: Entry returned by claim.
+
+        Output: Summary text (raises the completion's error if it failed).
+
+        """
+
+        entry["done"].wait()
+        if entry["error"] is not None:
+            raise entry["error"]
+        return entry["text"]
+
+    def get_or_create(self, prompt, model, temperature, create):
+
+        """
+
+        A function to return the stored summary for a prompt, calling create only if there is none.
+        If the same prompt is already being completed on another thread, this waits for that result instead.
+
+        Input: Prompt text. Model name. Temperature. Function taking no arguments that returns the summary text.
+
+        Output: Summary text.
+
+        """
+
+        text, entry, owner = self.claim(prompt, model, temperature)
+
+        # Returns a stored summary, or the one another request is completing
+        if text is not None:
+            return text
+        if not owner:
+            return self.wait(entry)
+
+        try:
+            # Only the first request pays for the completion
+            text = create()
+
+        except Exception as error:
+            # Waiting requests see the same failure
+            self.finish(prompt, model, temperature, entry, error=error)
+            raise
+
+        self.finish(prompt, model, temperature, entry, text=text)
+        return text
+
+    def clear(self):
+
+        """
+
+        A function to empty the cache.
+
+        """
+
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries")
+            self._conn.commit()
+
+    def get_stats(self):
+
+        """
+
+        A function to report the cache counters.
+
+        Input: None.
+
+        Output: Dictionary with hits, misses, coalesced, expired, evictions and entries.
+
+        """
+
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+
+# Cache shared by the app, opened on first use
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+
+def get_summary_cache():
+
+    """
+
+    A function to get the shared summary cache, creating it on first use.
+
+    Input: None.
+
+    Output: SummaryCache object.
+
+    """
+
+    global _summary_cache
+
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            _summary_cache = SummaryCache()
+
+    return _summary_cache
@@ -0,0 +1,297 @@
+## ==============================================================================================================
+## Crime Tile Pyramid
+"""
+Crime counts per category in web map tiles at every zoom level, so the hotspot map only reads the tiles in view.
+Each tile is split into square cells, and every cell is stored under its quadkey (the interleaved bits of its x and
+y). The cells of one tile then sit next to each other in quadkey order, so a tile is a single range lookup.
+"""
+## ==============================================================================================================
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from backend_files.crime_store import STORE_PATH, read_crimes, store_exists
+
+# Zoom levels kept in the pyramid (lower zooms use MIN_ZOOM's cells, higher zooms use MAX_ZOOM's)
+MIN_ZOOM = 4
+MAX_ZOOM = 12
+
+# Each tile is split into 2^CELL_BITS × 2^CELL_BITS cells (32 × 32, 8 pixels each on a 256 pixel tile)
+CELL_BITS = 5
+
+# Size of the map the view is assumed to fill, in pixels
+VIEW_SIZE = (800, 500)
+
+# Where the pyramid is kept between runs
+TILES_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "crime_tiles.parquet"
+
+
+def _spread_bits(values):
+
+    """
+
+    Moves each bit of a 32-bit number to every other position (0b111 → 0b10101).
+
+    """
+
+    v = np.asarray(values).astype(np.uint64)
+    for shift, mask in [(16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+                        (2, 0x3333333333333333), (1, 0x5555555555555555)]:
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def _compact_bits(values):
+
+    """
+
+    Undoes _spread_bits, keeping every other bit.
+
+    """
+
+    v = np.asarray(values).astype(np.uint64) & np.uint64(0x5555555555555555)
+    for shift, mask in [(1, 0x3333333333333333), (2, 0x0F0F0F0F0F0F0F0F), (4, 0x00FF00FF00FF00FF),
+                        (8, 0x0000FFFF0000FFFF), (16, 0x00000000FFFFFFFF)]:
+        v = (v | (v >> np.uint64(shift))) & np.uint64(mask)
+    return v.astype(np.int64)
+
+
+def to_quadkey(x, y):
+
+    """
+
+    A function to turn tile or cell coordinates into quadkeys.
+
+    Input: Arrays of x (west → east) and y (north → south) numbers at one zoom level.
+
+    Output: Array of int64 quadkeys.
+
+    """
+
+    return (_spread_bits(x) | (_spread_bits(y) << np.uint64(1))).astype(np.int64)
+
+
+def from_quadkey(quadkey):
+
+    """
+
+    A function to turn quadkeys back into x and y numbers.
+
+    Input: Array of quadkeys.
+
+    Output: (x array, y array) tuple.
+
+    """
+
+    quadkey = np.asarray(quadkey).astype(np.uint64)
+    return _compact_bits(quadkey), _compact_bits(quadkey >> np.uint64(1))
+
+
+def lonlat_to_xy(lon, lat, depth):
+
+    """
+
+    A function to find the web map (Web Mercator) square holding each point.
+
+    Input: Arrays of longitude and latitude. Depth of the squares (the zoom level for tiles).
+
+    Output: (x array, y array) tuple of int64 square numbers.
+
+    """
+
+    n = 2 ** depth
+    lat = np.radians(np.clip(np.asarray(lat, dtype="float64"), -85.0511, 85.0511))
+
+    # Projects to the 0-1 square and scales to the grid
+    x = (np.asarray(lon, dtype="float64") + 180) / 360 * n
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2 * n
+
+    # Returns the square numbers, kept inside the grid
+    return np.clip(np.floor(x), 0, n - 1).astype(np.int64), np.clip(np.floor(y), 0, n - 1).astype(np.int64)
+
+
+def xy_to_lonlat(x, y, depth):
+
+    """
+
+    A function to find the longitude and latitude of a point in the web map grid.
+
+    Input: Arrays of x and y (add 0.5 for the centre of a square). Depth of the grid.
+
+    Output: (longitude array, latitude array) tuple.
+
+    """
+
+    n = 2 ** depth
+    lon = np.asarray(x, dtype="float64") / n * 360 - 180
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y, dtype="float64") / n))))
+    return lon, lat
+
+
+def build_tiles(df, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM):
+
+    """
+
+    A function to count crimes per category in the cells of every zoom level.
+    The crimes are counted once at the finest level; each coarser level merges four cells into one.
+
+    Input: Dataframe with latitude, longitude and category columns. Lowest and highest zoom levels.
+
+    Output: Pyramid dataframe with zoom, quadkey, category and crime_count columns, sorted by zoom and quadkey.
+
+    """
+
+    lat = df["latitude"].to_numpy(dtype="float64")
+    lon = df["longitude"].to_numpy(dtype="float64")
+    category = df["category"].astype("category")
+    categories = category.cat.categories
+
+    # Drops crimes with no location or category
+    codes = category.cat.codes.to_numpy().astype(np.int64)
+    valid = np.isfinite(lat) & np.isfinite(lon) & (codes >= 0)
+
+    # Packs category and finest cell into one key (quadkeys use 2 bits per level)
+    depth = max_zoom + CELL_BITS
+    key_bits = 2 * depth
+    x, y = lonlat_to_xy(lon[valid], lat[valid], depth)
+    keys, counts = np.unique((codes[valid] << key_bits) | to_quadkey(x, y), return_counts=True)
+
+    levels = []
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+
+        # Stores this level's cells
+        levels.append(pd.DataFrame({
+            "zoom": np.full(len(keys), zoom, dtype=np.int8),
+            "quadkey": keys & ((1 << key_bits) - 1),
+            "category": pd.Categorical.from_codes(keys >> key_bits, categories=categories),
+            "crime_count": counts,
+        }))
+
+        # Merges each block of four cells into its parent for the next level up
+        parent = ((keys >> key_bits) << (key_bits - 2)) | ((keys & ((1 << key_bits) - 1)) >> 2)
+        keys, index = np.unique(parent, return_inverse=True)
+        counts = np.bincount(index, weights=counts, minlength=len(keys)).astype(np.int64)
+        key_bits -= 2
+
+    # Returns every level in lookup order
+    tiles = pd.concat(levels[::-1], ignore_index=True)
+    return tiles.sort_values(["zoom", "quadkey"], kind="stable").reset_index(drop=True)
+
+
+def view_bbox(lat, lon, zoom, view_size=VIEW_SIZE):
+
+    """
+
+    A function to get the area a map shows around its centre.
+
+    Input: Centre latitude and longitude. Zoom level. Map width and height in pixels.
+
+    Output: (min longitude, min latitude, max longitude, max latitude) tuple.
+
+    """
+
+    # Centre in pixels (each tile is 256 pixels) at this zoom
+    depth = zoom + 8
+    x, y = lonlat_to_xy([lon], [lat], depth)
+    width, height = view_size
+
+    # Corners of the view
+    min_lon, max_lat = xy_to_lonlat(x - width / 2, y - height / 2, depth)
+    max_lon, min_lat = xy_to_lonlat(x + width / 2, y + height / 2, depth)
+    return float(min_lon[0]), float(min_lat[0]), float(max_lon[0]), float(max_lat[0])
+
+
+def query_tiles(tiles, bbox, zoom, categories=None):
+
+    """
+
+    A function to get the cells of every tile in view.
+
+    Input: Pyramid dataframe. (min longitude, min latitude, max longitude, max latitude) of the view.
+           Map zoom level (clamped to the pyramid's levels). Categories to keep (None for all).
+
+    Output: Dataframe with category, latitude, longitude (cell centres) and crime_count.
+
+    """
+
+    zoom = int(np.clip(round(zoom), MIN_ZOOM, MAX_ZOOM))
+
+    # Finds this zoom level's rows
+    start, end = np.searchsorted(tiles["zoom"].to_numpy(), [zoom, zoom + 1])
+    quadkeys = tiles["quadkey"].to_numpy()[start:end]
+
+    # Lists the tiles the view covers
+    min_lon, min_lat, max_lon, max_lat = bbox
+    (x0, x1), (y1, y0) = lonlat_to_xy([min_lon, max_lon], [min_lat, max_lat], zoom)
+    tile_x, tile_y = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1))
+    tile_keys = to_quadkey(tile_x.ravel(), tile_y.ravel())
+
+    # Each tile's cells are one quadkey range
+    shift = 2 * CELL_BITS
+    starts = np.searchsorted(quadkeys, tile_keys << shift)
+    ends = np.searchsorted(quadkeys, (tile_keys + 1) << shift)
+
+    # Expands the ranges into row numbers
+    lengths = ends - starts
+    rows = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    cells = tiles.iloc[start + rows]
+    if categories is not None:
+        cells = cells[cells["category"].isin(list(categories))]
+
+    # Converts each cell to its centre
+    x, y = from_quadkey(cells["quadkey"].to_numpy())
+    lon, lat = xy_to_lonlat(x + 0.5, y + 0.5, zoom + CELL_BITS)
+
+    # Returns dataframe
+    return pd.DataFrame({
+        "category": cells["category"].to_numpy(),
+        "latitude": lat.astype("float32"),
+        "longitude": lon.astype("float32"),
+        "crime_count": cells["crime_count"].to_numpy(),
+    })
+
+
+def load_tiles(store_path=STORE_PATH):
+
+    """
+
+    A function to load the saved pyramid, building it from the crime store the first time.
+
+    Input: Store path.
+
+    Output: Pyramid dataframe.
+
+    """
+
+    # Reads the saved pyramid
+    if TILES_PATH.exists():
+        return pd.read_parquet(TILES_PATH)
+
+    # Returns a freshly built pyramid
+    return rebuild_tiles(store_path)
+
+
+def rebuild_tiles(store_path=STORE_PATH):
+
+    """
+
+    A function to build the pyramid from the crime store, saving it when the store exists.
+
+    Input: Store path.
+
+    Output: Pyramid dataframe.
+
+    """
+
+    # Reads only the columns the pyramid needs
+    tiles = build_tiles(read_crimes(columns=["latitude", "longitude", "category"], path=store_path))
+
+    # Only saves pyramids of the store, not of the CSV fallback
+    if store_exists(store_path):
+        TILES_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tiles.to_parquet(TILES_PATH, index=False)
+
+    # Returns pyramid
+    return tiles
@@ -0,0 +1,238 @@
+## ==============================================================================================================
+## Precomputed Force Triangulation Index
+"""
+Builds the simplified boundary and query triangles of every force KML once and stores them in a
+compressed NumPy file, so the fetch path and map renderers never re-parse the KMLs.
+"""
+## ==============================================================================================================
+
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+# Folder holding the force KML boundaries
+DATA_DIR = Path(__file__).parent / "data"
+
+# Default index location (built on first use)
+INDEX_PATH = Path(os.getenv("CRIME_CACHE_DIR", Path(__file__).parent / "cache")) / "force_index.npz"
+
+# Bumped whenever simplification or triangulation changes so old index files are rebuilt
+INDEX_VERSION = 2
+
+# Index loaded by this process
+_index = None
+_index_lock = threading.Lock()
+
+
+def build_index(path=INDEX_PATH, data_dir=DATA_DIR):
+
+    """
+
+    A function to precompute the simplified polygon and query triangles of every force KML.
+
+    Input: Path to write the index to. Folder of force KML files.
+
+    Output: Path of the written index.
+
+    """
+
+    # Imported here because backend_functions reads the index
+    import shapely
+    from backend_files.backend_functions import load_polygon_from_kml, simplify_polygon, triangulate_polygon
+
+    forces, polygons, triangle_coords, triangle_counts = [], [], [], []
+
+    for kml_path in sorted(Path(data_dir).glob("*.kml")):
+
+        # Loads, simplifies and triangulates the boundary
+        polygon = simplify_polygon(load_polygon_from_kml(kml_path))
+        triangles = triangulate_polygon(polygon)
+
+        # Keeps the three corners of every triangle
+        coords = shapely.get_coordinates(triangles).reshape(-1, 4, 2)[:, :3] if triangles else np.empty((0, 3, 2))
+
+        forces.append(kml_path.stem)
+        polygons.append(shapely.to_wkb(polygon))
+        triangle_coords.append(coords)
+        triangle_counts.append(len(coords))
+
+    # Packs the WKB polygons into one byte array with offsets
+    wkb_sizes = [len(wkb) for wkb in polygons]
+
+    # Writes the index
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        path,
+        version=np.array(INDEX_VERSION),
+        forces=np.array(forces),
+        polygon_wkb=np.frombuffer(b"".join(polygons), dtype=np.uint8),
+        polygon_offsets=np.concatenate([[0], np.cumsum(wkb_sizes)]),
+        triangles=np.concatenate(triangle_coords),
+        triangle_offsets=np.concatenate([[0], np.cumsum(triangle_counts)]),
+    )
+
+    # Returns the path
+    return path
+
+
+def index_exists(path=INDEX_PATH):
+
+    """
+
+    A function to check whether an up-to-date index has been built, without building it.
+
+    Input: Path to the index.
+
+    Output: True if the index file exists and was made by this version.
+
+    """
+
+    path = Path(path)
+    if not path.exists():
+        return False
+
+    with np.load(path) as data:
+        return int(data["version"]) == INDEX_VERSION
+
+
+def load_index(path=INDEX_PATH):
+
+    """
+
+    A function to load the index, building it first if it is missing or out of date.
+
+    Input: Path to the index.
+
+    Output: Dictionary of arrays with a force name → position lookup under "positions".
+
+    """
+
+    global _index
+
+    with _index_lock:
+        if _index is None:
+
+            # Builds the index on first use, or rebuilds it if it was made by an older version
+            path = Path(path)
+            if not index_exists(path):
+                build_index(path)
+
+            # Reads every array into memory
+            with np.load(path) as data:
+                index = {name: data[name] for name in data.files}
+
+            # Adds a lookup from force name to position
+            index["positions"] = {force: i for i, force in enumerate(index["forces"])}
+            _index = index
+
+    return _index
+
+
+def has_force(police_force_id):
+
+    """
+
+    A function to check whether a force is in the index.
+
+    Input: Police force ID.
+
+    Output: True if the force has a KML boundary.
+
+    """
+
+    return police_force_id in load_index()["positions"]
+
+
+def get_force_polygon(police_force_id):
+
+    """
+
+    A function to get the simplified boundary of a force.
+
+    Input: Police force ID.
+
+    Output: Shapely polygon object.
+
+    """
+
+    # Imported here so shapely is only loaded when a boundary is needed (the index itself is plain arrays)
+    import shapely
+
+    # Slices the force's WKB out of the packed array
+    index = load_index()
+    i = index["positions"][police_force_id]
+    start, end = index["polygon_offsets"][i], index["polygon_offsets"][i + 1]
+
+    # Returns polygon
+    return shapely.from_wkb(index["polygon_wkb"][start:end].tobytes())
+
+
+def get_force_triangles(police_force_id):
+
+    """
+
+    A function to get the query triangles of a force.
+
+    Input: Police force ID.
+
+    Output: List of Shapely triangle objects.
+
+    """
+
+    import shapely
+
+    # Slices the force's triangle corners
+    index = load_index()
+    i = index["positions"][police_force_id]
+    coords = index["triangles"][index["triangle_offsets"][i]:index["triangle_offsets"][i + 1]]
+
+    # Builds all triangles in one vectorised call
+    return list(shapely.polygons(coords))
+
+
+def get_force_bounds(police_force_id):
+
+    """
+
+    A function to get the bounding box of a force.
+
+    Input: Police force ID.
+
+    Output: (min longitude, min latitude, max longitude, max latitude) tuple.
+
+    """
+
+    return get_force_polygon(police_force_id).bounds
+
+
+@lru_cache(maxsize=4)
+def get_boundaries_geojson(tolerance=0.005):
+
+    """
+
+    A function to get every force boundary as GeoJSON for drawing on a map.
+
+    Input: Extra simplification tolerance for display (≈ 500m by default).
+
+    Output: GeoJSON FeatureCollection dictionary.
+
+    """
+
+    import shapely.geometry
+
+    # Builds one feature per force
+    features = []
+    for police_force_id in load_index()["forces"]:
+        polygon = get_force_polygon(police_force_id).simplify(tolerance, preserve_topology=True)
+        features.append({
+            "type": "Feature",
+            "properties": {"police_force_id": str(police_force_id)},
+            "geometry": shapely.geometry.mapping(polygon),
+        })
+
+    # Returns the collection
+    return {"type": "FeatureCollection", "features": features}
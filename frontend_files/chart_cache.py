@@ -0,0 +1,173 @@
+## =======================================================================================
+# chart_cache.py
+
+# Caching layer for the data behind every chart, so Streamlit reruns (e.g. changing a
+# selectbox) reuse the previous result instead of re-reading and re-aggregating.
+# Entries are keyed on the dataset version and the call arguments.
+## =======================================================================================
+
+import functools
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import pandas as pd
+import streamlit as st
+from backend_files.datasets import dataset_version, refresh
+
+# Cache limits per chart function
+CACHE_MAX_ENTRIES = 16
+CACHE_TTL = 60 * 60
+
+# Where results are kept: "streamlit" (st.cache_data / st.cache_resource) or "memory" (plain in-process LRU)
+CACHE_BACKEND = "streamlit"
+
+# Hit/miss counters and compute times per chart
+_stats = defaultdict(lambda: {"calls": 0, "misses": 0, "compute_ms": 0.0, "last_compute_ms": 0.0, "render_ms": 0.0})
+_stats_lock = threading.Lock()
+
+# Every function wrapped by cached_chart_data, so they can all be cleared at once
+_CACHED_FUNCTIONS = []
+
+
+def _record(name, field, value=1):
+    # Adds to one of a chart's counters
+    with _stats_lock:
+        _stats[name][field] += value
+
+
+def _memory_cache(func, max_entries, ttl):
+
+    """
+    Wraps a function in a small thread-safe LRU cache with a TTL (the "memory" backend).
+    """
+
+    entries = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+
+        # Returns a fresh cached value if there is one
+        with lock:
+            if key in entries and time.monotonic() - entries[key][0] < ttl:
+                entries.move_to_end(key)
+                return entries[key][1]
+
+        # Computes and stores the value, dropping the oldest entries over the cap
+        value = func(*args, **kwargs)
+        with lock:
+            entries[key] = (time.monotonic(), value)
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+        return value
+
+    wrapper.clear = entries.clear
+    return wrapper
+
+
+def cached_chart_data(name, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, resource=False):
+
+    """
+    Decorator caching a chart's data function on the dataset version and its arguments.
+    Parameters:
+    name (str): Chart name shown in the debug panel
+    max_entries (int): Most results kept for this function
+    ttl (int): Seconds a result stays valid
+    resource (bool): Share the returned object instead of copying it (for figures and other large results)
+    Returns:
+    decorator (function): Wraps the data function
+    """
+
+    def decorator(func):
+
+        def compute(version, *args, **kwargs):
+            # Only runs on a cache miss
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = (time.perf_counter() - start) * 1000
+            _record(name, "misses")
+            _record(name, "compute_ms", elapsed)
+            with _stats_lock:
+                _stats[name]["last_compute_ms"] = elapsed
+            return result
+
+        # Gives the cached function a unique identity so Streamlit keeps a separate cache per chart
+        compute.__module__ = func.__module__
+        compute.__qualname__ = compute.__name__ = f"{func.__qualname__}__cached"
+
+        if CACHE_BACKEND == "streamlit":
+            cache = st.cache_resource if resource else st.cache_data
+            cached = cache(max_entries=max_entries, ttl=ttl, show_spinner=False)(compute)
+        else:
+            cached = _memory_cache(compute, max_entries, ttl)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _record(name, "calls")
+            return cached(dataset_version(), *args, **kwargs)
+
+        wrapper.clear = cached.clear
+        _CACHED_FUNCTIONS.append(wrapper)
+        return wrapper
+
+    return decorator
+
+
+def clear_chart_caches():
+
+    """
+    Clears every chart cache and resets the counters.
+    """
+
+    for wrapper in _CACHED_FUNCTIONS:
+        wrapper.clear()
+    with _stats_lock:
+        _stats.clear()
+
+
+def timed_render(name, render_fn):
+
+    """
+    Calls a chart renderer and records how long it took.
+    Parameters:
+    name (str): Chart name shown in the debug panel
+    render_fn (function): Renderer to call
+    """
+
+    start = time.perf_counter()
+    render_fn()
+    _record(name, "render_ms", (time.perf_counter() - start) * 1000)
+
+
+def get_cache_stats():
+
+    """
+    Returns the cache counters as a DataFrame, one row per chart.
+    """
+
+    with _stats_lock:
+        rows = [{"chart": name, **stats} for name, stats in _stats.items()]
+
+    df = pd.DataFrame(rows, columns=["chart", "calls", "misses", "compute_ms", "last_compute_ms", "render_ms"])
+    df["hits"] = df["calls"] - df["misses"]
+    df["hit_rate"] = (df["hits"] / df["calls"].where(df["calls"] > 0)).round(2)
+    return df[["chart", "calls", "hits", "misses", "hit_rate", "last_compute_ms", "compute_ms", "render_ms"]].round(1)
+
+
+def render_cache_debug_panel():
+
+    """
+    Renders an expander with cache hits and per-chart compute times.
+    """
+
+    with st.expander("Cache debug"):
+        st.caption(f"Backend: {CACHE_BACKEND} · dataset version {dataset_version()}")
+        st.dataframe(get_cache_stats(), hide_index=True, use_container_width=True)
+        if st.button("Clear chart caches"):
+            # Also reloads the tables, so data written by another process is picked up
+            refresh(force=True)
+            clear_chart_caches()
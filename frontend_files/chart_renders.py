@@ -7,12 +7,28 @@ from backend_files.pie_top_3 import get_crime_types_summary
 from backend_files.lollipop_functions import get_columns_for_crime_rate_by_region
 from backend_files.population_functions import get_population_summary
 from backend_files.crime_types_force import get_columns_for_heatmap_table
-import matplotlib.pyplot as plt
-import seaborn as sns
+from backend_files.crime_over_time import get_crime_over_time
+from backend_files.crime_density import DEFAULT_MAP_CENTRE, DEFAULT_MAP_ZOOM, bin_crime_locations, bin_size_for_zoom
+from backend_files.triangle_index import get_boundaries_geojson, get_force_bounds, index_exists, load_index
+from backend_files.tile_pyramid import query_tiles, view_bbox
+from backend_files.datasets import load_crimes, load_tiles
+from frontend_files.chart_cache import cached_chart_data
 import uuid
 import plotly.graph_objects as go
 
 
+## =======================================================================================
+
+## ===== Cached chart data
+# Reruns reuse these until the dataset version or the arguments change
+
+get_crime_rate_data = cached_chart_data("Crime Rate By Region")(get_columns_for_crime_rate_by_region)
+get_crime_types_data = cached_chart_data("Crime Type Pie")(get_crime_types_summary)
+get_population_data = cached_chart_data("Population")(get_population_summary)
+get_heatmap_table_data = cached_chart_data("Crime Types and Force Heatmap")(get_columns_for_heatmap_table)
+get_crime_over_time_data = cached_chart_data("Crime Over Time")(get_crime_over_time)
+
+
 ## =======================================================================================
 
 ## ===== Placeholder chart generation functions
@@ -37,8 +53,40 @@ def render_crime_hotspots_map():
     st.map(uk_data)
 
 def render_crime_over_time():
-    st.subheader("UK Crime Data over time")
-    st.line_chart(np.random.randn(10, 2), use_container_width=True)
+
+    """
+
+    A function to create a line chart of crimes per month.
+
+    Input: None (reads the monthly counts from the aggregate cube).
+
+    Output: Line chart.
+
+    """
+
+    # Splits the line by category if asked
+    by_category = st.checkbox("Split by crime category", key="crime_over_time_by_category")
+    df = get_crime_over_time_data(by_category=by_category)
+
+    # Build the figure
+    fig = px.line(
+        df,
+        x="date",
+        y="crime_count",
+        color="category" if by_category else None,
+        markers=True,
+        labels=dict(date="Month", crime_count="Number of Crimes", category="Crime Category"),
+        title="Recorded Crimes per Month",
+    )
+
+    fig.update_layout(
+        template="plotly_white",
+        margin=dict(l=40, r=20, t=50, b=40)
+    )
+
+    # Streamlit key to avoid component reuse
+    random_key = str(uuid.uuid4())
+    st.plotly_chart(fig, use_container_width=True, key=random_key)
 
 def crime_rate_by_region_graph(df = None, theme = ["whitegrid", "viridis"]):
 
@@ -54,7 +102,10 @@ def crime_rate_by_region_graph(df = None, theme = ["whitegrid", "viridis"]):
 
     # If no df is passed, fetch it
     if df is None:
-        df = get_columns_for_crime_rate_by_region()
+        df = get_crime_rate_data()
+
+    # Forces with no population figure have no rate to plot
+    df = df.dropna(subset=["crime_rate_per_1000"])
 
     # Sort for consistent ordering
     df = df.sort_values("crime_rate_per_1000", ascending=True)
@@ -113,11 +164,10 @@ def crime_rate_by_region_graph(df = None, theme = ["whitegrid", "viridis"]):
 
 def render_crime_type_pie():
 
-    df = get_crime_types_summary(id=None, csv_data='backend_files/street_data/test_crime_data.csv')
-
+    df = get_crime_types_data(id=None)
 
-    palette = sns.color_palette("Set2", n_colors=len(df))  # Set2 is a popular Seaborn palette
-    palette = [f'rgb({int(r*255)},{int(g*255)},{int(b*255)})' for r, g, b in palette]
+    # The ColorBrewer Set2 palette Seaborn uses, as Plotly ships it, so the pie does not load seaborn and matplotlib
+    palette = px.colors.qualitative.Set2
 
     # Create interactive pie chart with Plotly
     fig = px.pie(
@@ -126,7 +176,7 @@ def render_crime_type_pie():
         values='percentage',
         title='Crime Type Distribution',
         color='category',         # assign colors by category
-        color_discrete_sequence=palette  # use Seaborn palette
+        color_discrete_sequence=palette  # use the Set2 palette
     )
     random_key = str(uuid.uuid4())
 
@@ -138,7 +188,7 @@ def render_population_bar_chart():
     Function to render a bar chart of the Population
     each Police Force serves
     """
-    df = get_population_summary(csv_data='backend_files/data/cleaned_population.csv')
+    df = get_population_data(csv_data='backend_files/data/cleaned_population.csv')
     
     df = df.sort_values("population", ascending=False)
 
@@ -175,31 +225,44 @@ def render_population_bar_chart():
     random_key = str(uuid.uuid4())
     st.plotly_chart(fig, use_container_width=True, key=random_key)
 
-def crime_density_heatmap_graph():
+def make_crime_density_figure(df, mode="binned", zoom=DEFAULT_MAP_ZOOM, centre=None, boundaries=False):
 
     """
 
-    A function to create a heatmap of crime on a geographical map.
+    A function to build the heatmap of crime on a geographical map.
 
-    Input: Dataframe with crime locationdata.
+    Input: Dataframe with latitude, longitude and category columns (plus crime_count for "tiles").
+           "raw" to send every crime's location, "binned" to send crime counts per square bin sized for the zoom level,
+           "tiles" when df already holds the tile cells in view. Zoom level the map opens at.
+           (latitude, longitude) the map opens at (None for the middle of the crimes).
+           Whether to outline the police force boundaries (needs the triangle index).
 
-    Output: Heatmap.
+    Output: Plotly figure.
 
     """
-    df = pd.read_csv('backend_files/street_data/test_crime_data.csv')
 
     categories = sorted(df["category"].dropna().unique())
 
+    # Counts crimes per bin so the browser gets one weighted point per bin instead of every crime
+    if mode == "binned":
+        points = bin_crime_locations(df, bin_size_for_zoom(zoom))
+    else:
+        points = df
+
+    if centre is None:
+        centre = (df["latitude"].mean(), df["longitude"].mean())
+
     fig = go.Figure()
 
     # Add one density trace per category
     for cat in categories:
-        df_cat = df[df["category"] == cat]
+        df_cat = points[points["category"] == cat]
 
         fig.add_trace(
             go.Densitymapbox(
                 lat=df_cat["latitude"],
                 lon=df_cat["longitude"],
+                z=df_cat["crime_count"] if mode != "raw" else None,
                 radius=15,
                 name=cat,
                 visible=True
@@ -234,11 +297,20 @@ def crime_density_heatmap_graph():
     fig.update_layout(
         mapbox=dict(
             style="carto-positron",
-            zoom=5,
+            zoom=zoom,
             center=dict(
-                lat=df["latitude"].mean(),
-                lon=df["longitude"].mean()
-            )
+                lat=centre[0],
+                lon=centre[1]
+            ),
+            # Outlines the police force boundaries from the precomputed index when asked to
+            layers=[
+                dict(
+                    source=get_boundaries_geojson(),
+                    type="line",
+                    color="grey",
+                    line=dict(width=1)
+                )
+            ] if boundaries else []
         ),
         updatemenus=[
             dict(
@@ -255,6 +327,67 @@ def crime_density_heatmap_graph():
         margin=dict(r=0, l=0, t=50, b=0)
     )
 
+    # Returns the figure
+    return fig
+
+
+@cached_chart_data("Crime Hotspots Map (...in progress)", resource=True)
+def build_crime_density_figure(mode="tiles", zoom=DEFAULT_MAP_ZOOM, police_force_id=None, boundaries=False):
+
+    """
+
+    A function to build the heatmap of crime from the shared crime locations or tile pyramid.
+
+    Input: "raw", "binned" or "tiles". Zoom level the map opens at. Police force to centre on (None for every force).
+           Whether to outline the police force boundaries.
+
+    Output: Plotly figure.
+
+    """
+
+    # Centres on the force's bounding box
+    centre = None
+    if police_force_id is not None:
+        min_lon, min_lat, max_lon, max_lat = get_force_bounds(police_force_id)
+        centre = ((min_lat + max_lat) / 2, (min_lon + max_lon) / 2)
+
+    if mode == "tiles":
+        # Reads only the tiles in view from the precomputed pyramid
+        centre = centre or DEFAULT_MAP_CENTRE
+        df = query_tiles(load_tiles(), view_bbox(*centre, zoom), zoom)
+    else:
+        df = load_crimes(columns=["latitude", "longitude", "category"])
+
+    # Returns the figure
+    return make_crime_density_figure(df, mode, zoom, centre, boundaries)
+
+
+def crime_density_heatmap_graph():
+
+    """
+
+    A function to create a heatmap of crime on a geographical map.
+
+    Input: None.
+
+    Output: Heatmap.
+
+    """
+
+    # Tiles and binned send weighted points per cell however many crimes there are; tiles only for the area in view
+    mode = st.radio("Points", ["tiles", "binned", "raw"], horizontal=True, format_func=str.title, key="crime_density_mode")
+    zoom = st.select_slider("Map detail (zoom level)", options=list(range(4, 13)), value=DEFAULT_MAP_ZOOM, key="crime_density_zoom")
+
+    # Centring and outlines read the force triangle index, which the ingest builds; the map never builds it itself
+    police_force_id, boundaries = None, False
+    if index_exists():
+        police_force_id = st.selectbox("Centre on", [None] + [str(force) for force in load_index()["forces"]],
+                                       format_func=lambda force: "All forces" if force is None else force, key="crime_density_force")
+        boundaries = st.checkbox("Show force boundaries", value=False, key="crime_density_boundaries")
+
+    # Reuses the figure built on a previous rerun
+    fig = build_crime_density_figure(mode, zoom, police_force_id, boundaries)
+
     # Display the figure in Streamlit
     random_key = str(uuid.uuid4())
     st.plotly_chart(fig, use_container_width=True, key=random_key)
@@ -272,12 +405,9 @@ def type_against_region_heatmap_graph():
 
     """
 
-    df = get_columns_for_heatmap_table(df_crimes = pd.read_csv("backend_files/street_data/test_crime_data.csv"),
-                                          df_population = pd.read_csv("backend_files/data/cleaned_population.csv") ,
-                                            df_forces = pd.read_csv("backend_files/data/forces.csv"))
+    df = get_heatmap_table_data()
     
 
-    print(df.columns.tolist())
     theme = ["whitegrid", "viridis"]
 
     # Use pivot_table to avoid duplicate issues
@@ -1,5 +1,5 @@
 import streamlit as st
-from lollipop_functions import get_columns_for_crime_rate_by_region
+from backend_files.lollipop_functions import get_columns_for_crime_rate_by_region
 #TODO: Grab crime rate table via df = get_columns_for_crime_rate_by_region()
 #TODO: Generate kpi card for streamlit
 #TODO: Add filter to KPI card which lets you pick a single Police force to look at
@@ -18,6 +18,8 @@ from backend_files.population_functions import get_population_summary
 from backend_files.crime_density import crime_density_heatmap_info
 # Crime types by force
 from backend_files.crime_types_force import type_against_region_heatmap_info
+# Crimes over time
+from backend_files.crime_over_time import crime_over_time_info
 # Import chart rendering functions
 from frontend_files.chart_renders import (
     crime_density_heatmap_graph,
@@ -30,11 +32,11 @@ from frontend_files.chart_renders import (
 chart_renderers = {
     "Crime Hotspots Map (...in progress)": {
         "render": crime_density_heatmap_graph,
-        "summary": None,  # or the corresponding summary function if exists
+        "summary": crime_density_heatmap_info,
     },
-    "Crime Over Time (...in progress)": {
+    "Crime Over Time": {
         "render": render_crime_over_time,
-        "summary": None,
+        "summary": crime_over_time_info,
     },
     "Crime Rate By Region": {
         "render": crime_rate_by_region_graph,
@@ -10,7 +10,8 @@ from datetime import date
 import pandas as pd
 import numpy as np
 from frontend_files.tabs.chart_summary_dic import chart_renderers
-from backend_files.lollipop_functions import get_columns_for_crime_rate_by_region
+from frontend_files.chart_renders import get_crime_rate_data
+from frontend_files.chart_cache import render_cache_debug_panel, timed_render
 
 
 
@@ -74,8 +75,8 @@ def render_dashboard_tab():
 
     # == KPI and Filters Column ==
     with col3:
-        # Get the DataFrame first
-        df = get_columns_for_crime_rate_by_region()
+        # Get the DataFrame first (cached between reruns)
+        df = get_crime_rate_data()
 
         # Select police force
         selected_force = st.selectbox(
@@ -110,11 +111,15 @@ def render_dashboard_tab():
         with chart_columns[i % 2]:
             render_fn = chart_renderers.get(chart, {}).get("render")
             if render_fn:
-                render_fn()
+                timed_render(chart, render_fn)
             else:
                 st.error(f"Chart renderer for {chart} not found.")
         # Increment column index        
         i += 1
 
+    # == Cache hits and per-chart timings ==
+    with col3:
+        render_cache_debug_panel()
+
 if __name__ == "__main__":
     render_dashboard_tab()
\ No newline at end of file
@@ -1,11 +1,11 @@
 import streamlit as st
+import time
 from datetime import date
 import pandas as pd
 import numpy as np
 from .chart_summary_dic import chart_renderers
-from backend_files.prompt_function import generate_chart_analysis_summary
+from backend_files.prompt_function import stream_chart_summaries
 from backend_files.population_functions import get_population_summary
-from backend_files.crime_density import crime_density_heatmap_info
 
 ## =======================================================================================================================================
 ## Summary Tab
@@ -32,12 +32,30 @@ def render_summary_tab():
 
     if generate_summary and chosen_charts:
         st.success("Generating summary for selected charts...")
+        start = time.perf_counter()
 
+        # == Start every summary streaming at once, so they are generated while the charts are drawn ==
+        jobs = {}
+        for chart_name in chosen_charts:
+            # Special case for Population data
+            if chart_name == "Population":
+                jobs[chart_name] = dict(
+                    # Wrap the population summary fetcher so it's called later
+                    data_fetcher=get_population_summary,
+                    id=None,
+                    csv_data="backend_files/data/cleaned_population.csv",
+                    word_limit=50,
+                    prompt_template=None,
+                )
+            elif chart_renderers[chart_name]["summary"]:
+                jobs[chart_name] = dict(data_fetcher=chart_renderers[chart_name]["summary"])
+        streams = stream_chart_summaries(jobs)
+
+        placeholders = {}
         for chart_name in chosen_charts:
             col1, col2 = st.columns([3, 2])
 
             # == Display chosen charts and summaries ==
-
             with col1:
                 chart_renderers[chart_name]["render"]()
 
@@ -45,28 +63,36 @@ def render_summary_tab():
             # == Display chart summary ==
             with col2:
                 st.markdown(f"**{chart_name} Summary:**")
-                # Special case for Population data
-                if chart_name == "Population":
-                    summary = generate_chart_analysis_summary(
-                                # Wrap the population summary fetcher so it's called later
-                                get_population_summary,
-                                id=None,
-                                csv_data="backend_files/data/cleaned_population.csv",
-                                word_limit=50,
-                                prompt_template=None
-                            )
-
-                    st.write(summary)
 
+                if chart_name in jobs:
+                    # Replaced by the summary as it streams in
+                    placeholders[chart_name] = st.empty()
+                    placeholders[chart_name].info("Generating summary...")
                 else:
-                    summary_func = chart_renderers[chart_name]["summary"]
-                    
-                    if summary_func:
-                        # Call the summary function (you can pass arguments if needed)
-                        summary = generate_chart_analysis_summary(summary_func)
-                        st.write(summary)
-                    else:
-                        st.write(f"This is a placeholder summary for the {chart_name}. Detailed insights will be generated here based on actual data analysis.")
+                    st.write(f"This is a placeholder summary for the {chart_name}. Detailed insights will be generated here based on actual data analysis.")
+
+        # == Stream each summary into its column; later ones have kept generating in the background ==
+        seconds_per_chart = []
+        for chart_name, placeholder in placeholders.items():
+            stream, stats = streams[chart_name]
+            with placeholder.container():
+                st.write_stream(stream)
+
+                # Time to first token and generation speed
+                if stats.get("coalesced"):
+                    st.caption("Shared with an identical summary generated at the same time")
+                elif stats.get("cached"):
+                    st.caption("From the summary cache")
+                elif "seconds" in stats:
+                    st.caption(f"First token after {stats.get('ttft', 0):.2f}s · {stats['tokens_per_second'] or 0:.0f} tokens/s · {stats['seconds']:.1f}s in total")
+            seconds_per_chart.append(stats.get("seconds", 0))
+
+        # == Timing readout ==
+        if seconds_per_chart:
+            st.caption(
+                f"{len(seconds_per_chart)} summaries in {time.perf_counter() - start:.1f}s "
+                f"(one after another: {sum(seconds_per_chart):.1f}s, slowest: {max(seconds_per_chart):.1f}s)"
+            )
 
 if __name__ == "__main__":
     render_summary_tab()
@@ -0,0 +1,79 @@
+## =======================================================================================
+# conftest.py
+
+# Shared fixtures: the local police.uk stub with a throwaway response cache, the force
+# triangulation index built outside backend_files/cache, and the fake LLM backend with a
+# throwaway summary cache, so no test touches the network or the local data.
+## =======================================================================================
+
+import pytest
+from backend_files import backend_functions, prompt_function, response_cache, summary_cache, triangle_index
+from backend_files.api_stub import StubPoliceAPI
+from backend_files.fetch_engine import POLICE_API_LIMITER
+
+
+@pytest.fixture
+def response_cache_path(tmp_path, monkeypatch):
+
+    """
+    Points the backend at an empty response cache for the test.
+    """
+
+    path = tmp_path / "responses.sqlite"
+    monkeypatch.setattr(response_cache, "_response_cache", response_cache.ResponseCache(path))
+    return path
+
+
+@pytest.fixture
+def stub(response_cache_path, monkeypatch):
+
+    """
+    Runs the police.uk stub and points the backend at it, without the police.uk rate limit.
+    """
+
+    monkeypatch.setattr(POLICE_API_LIMITER, "rate", 1e9)
+    monkeypatch.setattr(POLICE_API_LIMITER, "burst", 1e9)
+
+    with StubPoliceAPI() as api:
+        monkeypatch.setattr(backend_functions, "API_BASE_URL", api.url)
+        yield api
+
+
+@pytest.fixture(scope="session")
+def force_index_dir(tmp_path_factory):
+
+    """
+    Builds the force triangulation index once per session in a throwaway cache folder.
+    """
+
+    cache_dir = tmp_path_factory.mktemp("cache")
+    triangle_index.build_index(cache_dir / triangle_index.INDEX_PATH.name)
+    return cache_dir
+
+
+@pytest.fixture
+def force_index(force_index_dir, monkeypatch):
+
+    """
+    Loads the throwaway force index, and points spawned ingest workers at the same cache folder.
+    """
+
+    monkeypatch.setenv("CRIME_CACHE_DIR", str(force_index_dir))
+    monkeypatch.setattr(triangle_index, "_index", None)
+    return triangle_index.load_index(force_index_dir / triangle_index.INDEX_PATH.name)
+
+
+@pytest.fixture
+def fake_llm(tmp_path, monkeypatch):
+
+    """
+    Answers completions from the fake backend, quickly, with an empty summary cache.
+    """
+
+    monkeypatch.setattr(prompt_function, "COMPLETION_BACKEND", "fake")
+    monkeypatch.setattr(prompt_function, "FAKE_LATENCY", 0.2)
+    monkeypatch.setattr(prompt_function, "FAKE_TTFT", 0.05)
+
+    cache = summary_cache.SummaryCache(tmp_path / "summaries.sqlite")
+    monkeypatch.setattr(summary_cache, "_summary_cache", cache)
+    return cache
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import shapely
+from backend_files import backend_functions
+
+
+def crimes_at(points, first_id=1):
+    # Stub crimes at (latitude, longitude) points
+    lat, lon = np.asarray(points).T
+    n = len(lat)
+    return pd.DataFrame({
+        "id": np.arange(first_id, first_id + n), "category": np.zeros(n, dtype=int), "latitude": lat, "longitude": lon,
+        "month": "2025-10", "street_id": np.arange(n), "outcome": np.zeros(n, dtype=int),
+    })
+
+
+def test_overflowing_triangle_keeps_the_other_crimes(stub, monkeypatch):
+    triangle = shapely.Polygon([(-1.0, 51.0), (-0.9, 51.0), (-0.95, 51.1)])
+
+    # A cluster the API can never return at the centre, and a few crimes near each corner
+    cx, cy = triangle.centroid.x, triangle.centroid.y
+    centre = [(cy, cx)] * 50
+    corners = [(y + t * (cy - y), x + t * (cx - x)) for x, y in list(triangle.exterior.coords)[:3] for t in (0.1, 0.15, 0.2)]
+    stub.crimes, stub._by_month, stub.crime_cap = crimes_at(centre + corners), None, 10
+    monkeypatch.setattr(backend_functions, "MAX_SPLIT_DEPTH", 1)
+
+    before = backend_functions.get_split_stats()
+    dfs = backend_functions.get_street_level_crimes_adaptive((triangle, [triangle]), "2025-10")
+    after = backend_functions.get_split_stats()
+
+    # The corner crimes come back; only the centre triangle is left out and counted
+    assert sorted(pd.concat(dfs)["id"]) == list(range(51, 51 + len(corners)))
+    assert after["unfetched_polygons"] - before["unfetched_polygons"] == 1
+    assert after["splits"] - before["splits"] == 1
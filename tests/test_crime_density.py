@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backend_files.crime_density import find_hotspots, top_cells
+
+# Crimes in three cells: four in (5, 7), two in (5, 8), one in (6, 7)
+LAT = np.array([5, 5, 5, 5, 5, 5, 6])
+LON = np.array([7, 7, 7, 7, 8, 8, 7])
+
+
+@pytest.mark.parametrize("top_n", [0, -1, -5])
+def test_no_cells_when_top_n_is_not_positive(top_n):
+    lat, lon, counts = top_cells(LAT, LON, top_n)
+    assert len(lat) == len(lon) == len(counts) == 0
+
+
+def test_top_n_is_clamped_to_cells_with_crimes():
+    lat, lon, counts = top_cells(LAT, LON, top_n=10)
+    assert list(zip(lat, lon, counts)) == [(5, 7, 4), (5, 8, 2), (6, 7, 1)]
+
+    # Cells whose weights add up to nothing are never returned
+    lat, lon, counts = top_cells(LAT, LON, top_n=10, weights=np.zeros(len(LAT)))
+    assert len(counts) == 0
+
+
+def test_find_hotspots_with_zero_top_n_is_empty():
+    df = pd.DataFrame({"latitude": LAT * 0.01 + 0.005, "longitude": LON * 0.01 + 0.005})
+
+    assert find_hotspots(df, [0.01], top_n=0).empty
+    assert find_hotspots(df, [0.01], top_n=2)["count"].tolist() == [4, 2]
@@ -0,0 +1,42 @@
+import pandas as pd
+from backend_files import aggregate_cube, datasets, tile_pyramid
+from backend_files.crime_store import write_crimes
+
+
+def crimes_for(month):
+    # A few cleaned crimes for one force and month
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "category": ["burglary", "robbery", "burglary"],
+        "police_force_id": "leicestershire",
+        "year": 2025,
+        "month": month,
+        "latitude": [52.63, 52.64, 52.65],
+        "longitude": [-1.13, -1.12, -1.11],
+    })
+
+
+def test_refresh_reloads_after_another_process_writes(tmp_path, monkeypatch):
+    store = tmp_path / "store"
+    for module, name in [(aggregate_cube, "CUBE_PATH"), (aggregate_cube, "GRID_CUBE_PATH"), (tile_pyramid, "TILES_PATH")]:
+        monkeypatch.setattr(module, name, tmp_path / f"{name.lower()}.parquet")
+    monkeypatch.setattr(datasets, "_datasets", {})
+    monkeypatch.setattr(datasets, "_disk_signature", None)
+
+    write_crimes(crimes_for(9), store)
+    assert not datasets.refresh(store_path=store)
+
+    # Nothing changed on disk, so the loaded table is kept
+    datasets._datasets[("crimes", None)] = "loaded"
+    assert not datasets.refresh(store_path=store)
+    assert ("crimes", None) in datasets._datasets
+
+    # A new month written elsewhere makes the next run reload
+    version = datasets.dataset_version()
+    write_crimes(crimes_for(10), store)
+    assert datasets.refresh(store_path=store)
+    assert datasets._datasets == {}
+    assert datasets.dataset_version() > version
+
+    # The Clear chart caches button reloads regardless
+    assert datasets.refresh(force=True, store_path=store)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pandas as pd
+from backend_files import backend_functions
+from backend_files.fetch_engine import RateLimiter, fetch_concurrently
+from backend_files.triangle_index import get_force_triangles
+
+
+def test_results_keep_item_order_when_calls_finish_out_of_order():
+    finished = []
+    lock = threading.Lock()
+
+    def fetch(i):
+        # Later items finish first
+        time.sleep((5 - i) * 0.02)
+        with lock:
+            finished.append(i)
+        return i * 10
+
+    assert fetch_concurrently(fetch, range(5), max_workers=5) == [0, 10, 20, 30, 40]
+    assert finished != sorted(finished)
+
+
+def test_serial_path_runs_in_order():
+    calls = []
+    assert fetch_concurrently(lambda i: calls.append(i) or i, [3, 1, 2], max_workers=1) == [3, 1, 2]
+    assert calls == [3, 1, 2]
+
+
+def test_rate_limiter_spaces_out_calls():
+    limiter = RateLimiter(rate=50, burst=1)
+
+    starts = fetch_concurrently(lambda i: time.monotonic(), range(11), max_workers=4, rate_limiter=limiter)
+
+    # One token up front, then one every 1/50 s
+    assert max(starts) - min(starts) >= 10 / 50 * 0.9
+
+
+def test_concurrent_street_crimes_match_serial(stub, force_index):
+    poly_strs = [backend_functions.triangle_to_poly_string(t) for t in get_force_triangles("city-of-london")][:12]
+    fetch = lambda poly_str: backend_functions.get_street_level_crimes(poly_str, use_cache=False)
+
+    serial = [fetch(poly_str) for poly_str in poly_strs]
+    concurrent = fetch_concurrently(fetch, poly_strs, max_workers=6)
+
+    assert sum(len(df) for df in serial) > 0
+    pd.testing.assert_frame_equal(pd.concat(concurrent, ignore_index=True), pd.concat(serial, ignore_index=True))
+    assert stub.request_count == 2 * len(poly_strs)
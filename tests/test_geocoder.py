@@ -0,0 +1,26 @@
+import pytest
+from backend_files import geocoder
+from backend_files.api_stub import make_synthetic_crimes
+from backend_files.crime_density import crime_density_heatmap_info, prefetch_hotspot_names
+
+
+@pytest.fixture
+def lookups(tmp_path, monkeypatch):
+    # An empty geocode cache and a stand-in for Nominatim that records each lookup
+    calls = []
+    monkeypatch.setattr(geocoder, "_geocode_cache", geocoder.GeocodeCache(tmp_path / "geocode.sqlite"))
+    monkeypatch.setattr(geocoder, "nominatim_reverse", lambda lat, lon: calls.append((lat, lon)) or f"Area {lat:.2f},{lon:.2f}")
+    return calls
+
+
+def test_prefetch_warms_the_summary(lookups):
+    crimes = make_synthetic_crimes(50_000, months=("2025-10",))
+
+    assert prefetch_hotspot_names(crimes) == 10
+    assert len(lookups) == 10
+
+    # The summary names the same hotspots from the cache
+    summary = crime_density_heatmap_info(crimes)
+    assert len(lookups) == 10
+    assert summary["area_name"].str.startswith("Area ").all()
+    assert geocoder.get_geocode_stats()["cache_hits"] == 10
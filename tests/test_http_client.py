@@ -0,0 +1,60 @@
+import pytest
+from backend_files import http_client
+from backend_files.http_client import api_get
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Records the backoff waits instead of sleeping through them
+    waits = []
+    monkeypatch.setattr(http_client.time, "sleep", waits.append)
+    http_client.reset_request_stats()
+    return waits
+
+
+def test_retries_429_and_5xx_then_succeeds(stub, sleeps):
+    stub.failures = [(429, {"Retry-After": "3"}), (503, {}), (500, {})]
+
+    response = api_get(f"{stub.url}/forces", endpoint="forces")
+
+    assert response.status_code == 200
+    assert stub.request_count == 4
+
+    # Retry-After is honoured, then the backoff doubles from BACKOFF_FACTOR
+    assert sleeps == [3, http_client.BACKOFF_FACTOR * 2, http_client.BACKOFF_FACTOR * 4]
+
+    stats = http_client.get_request_stats().set_index("endpoint").loc["forces"]
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (1, 3, 0)
+
+
+def test_retry_after_is_capped(stub, sleeps):
+    stub.failures = [(429, {"Retry-After": "3600"})]
+
+    assert api_get(f"{stub.url}/forces", endpoint="forces").status_code == 200
+    assert sleeps == [http_client.MAX_BACKOFF]
+
+
+def test_gives_up_after_max_retries(stub, sleeps):
+    stub.failures = [(502, {})] * 3
+
+    response = api_get(f"{stub.url}/forces", endpoint="forces", max_retries=2)
+
+    # The last failure is returned and counted as an error
+    assert response.status_code == 502
+    assert stub.request_count == 3
+    assert len(sleeps) == 2
+    assert http_client.get_request_stats().set_index("endpoint").loc["forces", "errors"] == 1
+
+
+def test_status_not_in_retry_list_is_returned_at_once(stub, sleeps):
+    stub.failures = [(503, {})]
+
+    # The street crimes fetch treats 503 as "too many crimes", so it is not retried
+    response = api_get(f"{stub.url}/forces", endpoint="forces", retry_statuses=(429, 500, 502, 504))
+
+    assert response.status_code == 503
+    assert sleeps == []
+
+
+def test_session_is_shared():
+    assert http_client.get_session() is http_client.get_session()
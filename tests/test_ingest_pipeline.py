@@ -0,0 +1,69 @@
+import pandas as pd
+from backend_files import aggregate_cube, benchmarks, ingest_pipeline
+from backend_files.aggregate_cube import CELL_DIMENSIONS, DIMENSIONS, GRID_SIZE, build_cube, save_cube
+from backend_files.api_stub import make_synthetic_crimes
+from backend_files.crime_store import CRIME_CSV, read_crimes, write_crimes
+from backend_files.ingest_pipeline import run_parallel_ingest, run_pipeline, write_batches
+
+# Neighbouring forces whose query polygons share boundary crimes
+FORCES = ["metropolitan", "city-of-london"]
+
+
+def cube_for(path, grid_size=None):
+    # Force × category × month counts, in a fixed order for comparing
+    cube = build_cube(read_crimes(DIMENSIONS + ["id", "latitude", "longitude"], path=path), grid_size)
+    return comparable(cube)
+
+
+def comparable(cube):
+    # Plain string dimensions, sorted, so cubes with different category sets compare equal
+    cube = cube.astype({"police_force_id": str, "category": str})
+    return cube.sort_values(list(cube.columns[:-1])).reset_index(drop=True)
+
+
+def test_parallel_ingest_matches_serial(stub, force_index, tmp_path):
+    # One month of crimes around the City, where the two forces meet
+    crimes = make_synthetic_crimes(300_000, months=("2025-10",))
+    stub.crimes = crimes[crimes["latitude"].between(51.49, 51.53) & crimes["longitude"].between(-0.13, -0.06)].reset_index(drop=True)
+    stub._by_month = None
+
+    serial = run_pipeline(FORCES, "2025-10", path=tmp_path / "serial")
+    parallel = run_parallel_ingest(FORCES, workers=2, date="2025-10", path=tmp_path / "parallel", checkpoint_dir=tmp_path / "checkpoints",
+                                   api_url=stub.url, worker_setup=benchmarks.use_stub_environment, progress=None)
+
+    # Every crime is stored once, under the first force that returned it, whichever way the forces were fetched
+    assert (parallel["status"] == "done").all()
+    assert read_crimes(["id"], path=tmp_path / "parallel")["id"].is_unique
+    pd.testing.assert_frame_equal(cube_for(tmp_path / "parallel"), cube_for(tmp_path / "serial"))
+
+    # The pool's counts add up to the serial run's
+    assert parallel["crimes_written"].sum() == serial["crimes_written"]
+    assert parallel["duplicates_dropped"].sum() == serial["duplicates_dropped"] > 0
+
+
+def test_write_batches_updates_saved_cubes_once(tmp_path, monkeypatch):
+    crimes = pd.read_csv(CRIME_CSV.parent / "leicestershire_street.csv").assign(police_force_id="leicestershire")
+
+    # Points the default store and the saved cubes at throwaway files
+    store = tmp_path / "crimes"
+    monkeypatch.setattr(ingest_pipeline, "STORE_PATH", store)
+    monkeypatch.setattr(aggregate_cube, "CUBE_PATH", tmp_path / "cube.parquet")
+    monkeypatch.setattr(aggregate_cube, "GRID_CUBE_PATH", tmp_path / "grid_cube.parquet")
+
+    # An earlier run stored a stale copy of this month and another force, and the cubes were saved from it
+    earlier = pd.concat([crimes.head(100), crimes.head(500).assign(police_force_id="nottinghamshire")])
+    write_crimes(earlier, store)
+    save_cube(build_cube(earlier), aggregate_cube.CUBE_PATH)
+    save_cube(build_cube(earlier, GRID_SIZE), aggregate_cube.GRID_CUBE_PATH)
+
+    saved = []
+    monkeypatch.setattr(aggregate_cube, "save_cube", lambda cube, path: saved.append(path) or save_cube(cube, path))
+
+    # The month arrives again in four batches, the later ones appending to it
+    stats = write_batches([("leicestershire", crimes.iloc[i::4], 0) for i in range(4)], store)
+
+    # Each cube is written once and matches the store, with the stale month replaced
+    assert stats["crimes_written"] == len(crimes)
+    assert saved == [aggregate_cube.CUBE_PATH, aggregate_cube.GRID_CUBE_PATH]
+    pd.testing.assert_frame_equal(comparable(pd.read_parquet(aggregate_cube.CUBE_PATH)), cube_for(store))
+    pd.testing.assert_frame_equal(comparable(pd.read_parquet(aggregate_cube.GRID_CUBE_PATH)), cube_for(store, GRID_SIZE))
@@ -0,0 +1,40 @@
+import pandas as pd
+from backend_files.outcomes import NO_SUSPECT, get_outcome_rates
+
+# Outcomes other than the one counted
+CHARGED = "Suspect charged"
+
+
+def test_outcome_rates_per_force_and_category():
+    crimes = pd.DataFrame({
+        "police_force_id": ["leicestershire"] * 5 + ["nottinghamshire"] * 3,
+        "category": pd.Categorical(["burglary", "burglary", "burglary", "drugs", "drugs", "burglary", "burglary", "drugs"],
+                                   categories=["burglary", "drugs", "robbery"]),
+        "outcome_category": [NO_SUSPECT, NO_SUSPECT, CHARGED, None, CHARGED, NO_SUSPECT, NO_SUSPECT, NO_SUSPECT],
+    })
+
+    rates = get_outcome_rates(crimes)
+
+    # One row per force/category with crimes, the unused robbery category left out
+    expected = pd.DataFrame({
+        "police_force_id": ["leicestershire", "leicestershire", "nottinghamshire", "nottinghamshire"],
+        "category": ["burglary", "drugs", "burglary", "drugs"],
+        "crime_count": [3, 2, 2, 1],
+        "outcome_count": [2, 0, 2, 1],
+        "outcome_rate": [2 / 3, 0.0, 1.0, 1.0],
+    })
+    pd.testing.assert_frame_equal(rates.astype({"category": str}), expected, check_dtype=False)
+
+
+def test_outcome_rates_for_another_outcome_and_grouping():
+    crimes = pd.DataFrame({
+        "police_force_id": ["leicestershire", "leicestershire", "leicestershire", "nottinghamshire"],
+        "outcome_category": [CHARGED, NO_SUSPECT, CHARGED, NO_SUSPECT],
+    })
+
+    rates = get_outcome_rates(crimes, outcome=CHARGED, by=["police_force_id"])
+
+    assert rates["police_force_id"].tolist() == ["leicestershire", "nottinghamshire"]
+    assert rates["crime_count"].tolist() == [3, 1]
+    assert rates["outcome_count"].tolist() == [2, 0]
+    assert rates["outcome_rate"].tolist() == [2 / 3, 0.0]
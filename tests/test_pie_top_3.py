@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+from backend_files import pie_top_3
+from backend_files.aggregate_cube import build_cube
+from backend_files.crime_store import CRIME_CSV
+
+# Cleaned crimes the pie is drawn from
+SAMPLE_CSV = CRIME_CSV.parent / "leicestershire_street.csv"
+
+
+@pytest.fixture
+def crimes():
+    return pd.read_csv(SAMPLE_CSV).assign(police_force_id="leicestershire")
+
+
+def test_cube_pie_adds_up_to_the_crime_total(crimes, monkeypatch):
+    # The cube lists categories alphabetically rather than largest first
+    monkeypatch.setattr(pie_top_3, "load_cube", lambda: build_cube(crimes))
+    pie = pie_top_3.get_crime_types_summary()
+
+    assert pie["count"].sum() == len(crimes)
+    expected_other = len(crimes) - crimes["category"].value_counts().head(3).sum()
+    assert pie.loc[pie["category"] == "Other", "count"].item() == expected_other
+
+
+def test_csv_pie_adds_up_to_the_crime_total(crimes):
+    pie = pie_top_3.get_crime_types_summary(csv_data=SAMPLE_CSV)
+
+    assert pie["count"].sum() == len(crimes)
+    assert pie["percentage"].sum() == pytest.approx(100)
+
+
+def test_cube_and_csv_pies_match(crimes, monkeypatch):
+    monkeypatch.setattr(pie_top_3, "load_cube", lambda: build_cube(crimes))
+    cube_pie = pie_top_3.get_crime_types_summary()
+    csv_pie = pie_top_3.get_crime_types_summary(csv_data=SAMPLE_CSV)
+
+    pd.testing.assert_frame_equal(cube_pie.astype({"count": "int64"}), csv_pie.astype({"count": "int64"}))
@@ -0,0 +1,29 @@
+import pandas as pd
+from backend_files.prompt_digest import build_digest, tidy_frame
+
+
+def hotspots():
+    # Neighbouring hotspot cells, as crime_density_heatmap_info returns them
+    return pd.DataFrame({
+        "lat_bin": pd.Series([52.634, 52.636, 52.631, 52.629], dtype="float32"),
+        "lon_bin": pd.Series([-1.128, -1.126, -1.131, -1.133], dtype="float32"),
+        "count": [412, 398, 120, 95],
+        "area_name": ["Clock Tower", "Haymarket", "Cathedral", "Castle Gardens"],
+    })
+
+
+def test_coordinates_keep_their_decimal_places():
+    tidy = tidy_frame(hotspots())
+
+    # Each hotspot keeps its own coordinates instead of collapsing to 52.6 / -1.13
+    assert tidy["lat_bin"].tolist() == [52.634, 52.636, 52.631, 52.629]
+    assert tidy["lon_bin"].tolist() == [-1.128, -1.126, -1.131, -1.133]
+    assert len(tidy[["lat_bin", "lon_bin"]].drop_duplicates()) == 4
+
+
+def test_hotspots_are_ranked_by_count_not_latitude():
+    digest = build_digest(hotspots(), token_budget=20, top_k=2)
+
+    assert "by count" in digest
+    assert "52.634,-1.128,412,Clock Tower" in digest
+    assert "Cathedral" not in digest
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from backend_files import backend_functions, response_cache
+from backend_files.response_cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A clock the test moves forward by hand
+    now = [1_000_000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_round_trip_and_key_parts(tmp_path):
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+    cache.put("crimes-street", "1,1:2,2:3,1", "2025-10", b"[1, 2]")
+
+    assert cache.get("crimes-street", "1,1:2,2:3,1", "2025-10") == b"[1, 2]"
+    assert cache.get("crimes-street", "1,1:2,2:3,1", "2025-09") is None
+    assert cache.get("crimes-street", "1,1:2,2:3,2", "2025-10") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_latest_month_expires_after_ttl(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "responses.sqlite", latest_ttl=60)
+    cache.put("crimes-street", "poly", None, b"latest")
+    cache.put("crimes-street", "poly", "2025-10", b"october")
+
+    clock[0] += 61
+
+    # Only the latest-month response goes stale; an explicit month never changes
+    assert cache.get("crimes-street", "poly") is None
+    assert cache.get("crimes-street", "poly", "2025-10") == b"october"
+    assert cache.get_stats()["expired"] == 1
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_evicts_least_recently_used_over_size_cap(tmp_path, clock):
+    body = lambda: os.urandom(1000)  # incompressible, so each entry is about 1 KB on disk
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_bytes=2500)
+
+    cache.put("crimes-street", "a", "2025-10", body())
+    clock[0] += 1
+    cache.put("crimes-street", "b", "2025-10", body())
+    clock[0] += 1
+
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("crimes-street", "a", "2025-10") is not None
+    clock[0] += 1
+    cache.put("crimes-street", "c", "2025-10", body())
+
+    assert cache.get("crimes-street", "b", "2025-10") is None
+    assert cache.get("crimes-street", "a", "2025-10") is not None
+    assert cache.get("crimes-street", "c", "2025-10") is not None
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["bytes"] <= 2500
+
+
+def test_warm_fetch_reads_from_disk(stub):
+    poly_str = "51.51,-0.10:51.52,-0.09:51.51,-0.08"
+
+    cold = backend_functions.get_street_level_crimes(poly_str, "2025-10")
+    requests = stub.request_count
+    warm = backend_functions.get_street_level_crimes(poly_str, "2025-10")
+
+    assert stub.request_count == requests
+    assert warm.equals(cold)
+    assert response_cache.get_response_cache().get_stats()["hits"] == 1
+
+
+def test_too_many_crimes_is_cached(stub):
+    stub.crime_cap = 0
+    poly_str = "51.45,-0.20:51.55,-0.20:51.50,0.00"
+
+    for _ in range(2):
+        with pytest.raises(backend_functions.TooManyCrimesError):
+            backend_functions.get_street_level_crimes(poly_str, "2025-10")
+
+    # The second call knows to split without asking the API again
+    assert stub.request_count == 1
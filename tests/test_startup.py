@@ -0,0 +1,157 @@
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from backend_files.crime_store import write_crimes
+from backend_files.outcomes import add_outcome_columns
+
+# App whose startup is measured
+APP_PATH = Path(__file__).parent.parent / "app.py"
+
+# Cleaned crimes the fixture store is built from
+SAMPLE_CSV = APP_PATH.parent / "backend_files" / "street_data" / "leicestershire_street.csv"
+
+# Packages that only load when their tab or feature is first used
+LAZY_MODULES = ["geopandas", "shapely", "seaborn", "matplotlib", "openai", "bs4", "geopy", "pycountry_convert"]
+
+# Most milliseconds of import time the lazy packages may add before the first paint
+LAZY_IMPORT_BUDGET_MS = 5
+
+# Packages the first paint needs whatever the app does, left out of the app's own budget
+REQUIRED_MODULES = ["streamlit", "pandas", "numpy", "plotly"]
+
+# Most milliseconds the app's other top-level imports may take (its own modules are about 40 ms)
+APP_IMPORT_BUDGET_MS = 150
+
+# Most milliseconds all of app.py's top-level imports may take together
+STARTUP_IMPORT_BUDGET_MS = 3000
+
+# One line of -X importtime output: self µs | cumulative µs | indented module name
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+# Imports the startup modules and lists any data files read while they import
+STARTUP_IMPORTS = """
+import pandas
+reads = []
+for name in ["read_csv", "read_parquet"]:
+    setattr(pandas, name, lambda *args, _name=name, _read=getattr(pandas, name), **kwargs: reads.append(_name) or _read(*args, **kwargs))
+import {modules}
+print(reads)
+"""
+
+# Draws the default tab in a fresh interpreter and reports what it loaded
+FIRST_RENDER = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=300).run()
+print(json.dumps({{"exceptions": [e.value for e in at.exception], "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def startup_modules(app_path=APP_PATH):
+    # The modules app.py imports at the top level; imports inside tabs only run when the tab is opened
+    tree = ast.parse(Path(app_path).read_text())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def lazy_import_ms(importtime_output):
+    # Cumulative import time of each lazy package, counting only the outermost of any nested lazy imports.
+    # -X importtime prints a module after its imports, so reading it backwards visits parents first.
+    lines = [IMPORTTIME_LINE.match(line) for line in importtime_output.splitlines()]
+    totals, parents = {}, []
+
+    for match in reversed([match for match in lines if match]):
+        depth, name = len(match[3]), match[4]
+        package = name.split(".")[0] if name.split(".")[0] in LAZY_MODULES else None
+
+        while parents and parents[-1][0] >= depth:
+            parents.pop()
+        if package and not any(lazy for _, lazy in parents):
+            totals[package] = totals.get(package, 0) + int(match[2]) / 1000
+        parents.append((depth, package))
+
+    return totals
+
+
+def top_level_import_ms(importtime_output, skip=()):
+    # Cumulative import time of each module imported at the top level, leaving out the modules in skip
+    lines = [IMPORTTIME_LINE.match(line) for line in importtime_output.splitlines()]
+    return {match[4]: int(match[2]) / 1000 for match in lines if match and len(match[3]) == 1 and match[4] not in skip}
+
+
+def run_importtime(code, env=None):
+    # Runs code in a fresh interpreter from the repo root
+    env = {**os.environ, **(env or {})}
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=APP_PATH.parent, capture_output=True, text=True, check=True, env=env)
+
+
+@pytest.fixture
+def fixture_data(tmp_path):
+    # A small crime store for two forces, with empty caches, that the app is pointed at instead of the local data
+    sample = add_outcome_columns(pd.read_csv(SAMPLE_CSV))
+    crimes = pd.concat([
+        sample.assign(police_force_id="leicestershire"),
+        sample.assign(police_force_id="nottinghamshire", id=sample["id"] + sample["id"].max()),
+    ], ignore_index=True)
+    write_crimes(crimes, tmp_path / "crime_store")
+    return {"CRIME_STORE_PATH": str(tmp_path / "crime_store"), "CRIME_CACHE_DIR": str(tmp_path / "cache")}
+
+
+def test_lazy_import_ms_counts_outermost_imports():
+    output = "\n".join([
+        "import time:       100 |        100 |     numpy",
+        "import time:        50 |         50 |       shapely.lib",
+        "import time:        20 |       1170 |   shapely",
+        "import time:        10 |         10 |   matplotlib.colors",
+        "import time:         5 |       1185 | geopandas",
+        "import time:         7 |          7 | seaborn",
+    ])
+    assert lazy_import_ms(output) == {"geopandas": 1.185, "seaborn": 0.007}
+
+
+def test_startup_imports_skip_lazy_modules():
+    result = run_importtime(f"import {', '.join(startup_modules())}")
+
+    loaded = lazy_import_ms(result.stderr)
+    assert sum(loaded.values()) <= LAZY_IMPORT_BUDGET_MS, f"loaded before the first paint: {loaded}"
+
+
+def test_startup_imports_stay_within_budget():
+    # Modules every interpreter imports before running any code
+    interpreter = top_level_import_ms(run_importtime("pass").stderr)
+    result = run_importtime(STARTUP_IMPORTS.format(modules=", ".join(startup_modules())))
+    imported = top_level_import_ms(result.stderr, skip=interpreter)
+
+    # No data is read while the app imports
+    assert result.stdout.strip() == "[]", f"read while importing: {result.stdout.strip()}"
+
+    # Everything besides the packages the first paint needs stays cheap, including any new top-level import
+    app_ms = {name: ms for name, ms in imported.items() if name.split(".")[0] not in REQUIRED_MODULES}
+    assert sum(app_ms.values()) <= APP_IMPORT_BUDGET_MS, f"slow imports before the first paint: {app_ms}"
+    assert sum(imported.values()) <= STARTUP_IMPORT_BUDGET_MS, f"slow imports before the first paint: {imported}"
+
+
+def test_first_render_skips_lazy_modules(fixture_data):
+    result = run_importtime(FIRST_RENDER.format(app=str(APP_PATH), lazy=LAZY_MODULES), fixture_data)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # The whole default tab is drawn without loading anything meant for a later tab or feature
+    assert report["exceptions"] == []
+    assert report["loaded"] == []
+    loaded = lazy_import_ms(result.stderr)
+    assert sum(loaded.values()) <= LAZY_IMPORT_BUDGET_MS, f"loaded by the first render: {loaded}"
+
+    # The charts were drawn from the fixture store, whose cube was saved beside it
+    assert (Path(fixture_data["CRIME_CACHE_DIR"]) / "crime_cube.parquet").exists()
@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from backend_files import prompt_function
+
+PROMPT = "Analyze the following summary data:\n category  crime_count\n burglary 120\nLimit to 50 words."
+
+
+@pytest.fixture
+def fake_streams(fake_llm, monkeypatch):
+    # Counts the streamed completions the fake backend starts
+    calls = []
+    fake = prompt_function.fake_stream
+    monkeypatch.setattr(prompt_function, "fake_stream", lambda *args, **kwargs: calls.append(1) or fake(*args, **kwargs))
+    return calls
+
+
+def test_concurrent_streams_share_one_completion(fake_llm, fake_streams):
+    started = threading.Event()
+
+    def read(first):
+        stats = {}
+        stream = prompt_function.stream_completion(PROMPT, stats=stats)
+        if first:
+            # Holds the others back until this stream owns the prompt
+            chunks = [next(stream)]
+            started.set()
+        else:
+            started.wait(5)
+            chunks = []
+        return "".join(chunks + list(stream)), stats
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(read, [True, False, False, False]))
+
+    # One completion, replayed in full to the three waiting streams
+    texts = {text for text, _ in results}
+    assert len(texts) == 1 and texts.pop()
+    assert len(fake_streams) == 1
+    assert [stats["coalesced"] for _, stats in results] == [False, True, True, True]
+    assert fake_llm.get_stats()["coalesced"] == 3
+
+    # The finished text is cached for the next request
+    stats = {}
+    assert "".join(prompt_function.stream_completion(PROMPT, stats=stats)) == results[0][0]
+    assert stats["cached"] and not stats["coalesced"]
+    assert len(fake_streams) == 1
+
+
+def test_stream_and_completion_share_one_completion(fake_llm, fake_streams):
+    stream = prompt_function.stream_completion(PROMPT)
+    first = next(stream)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # get_completion waits on the stream in progress instead of starting its own
+        waiting = pool.submit(prompt_function.get_completion, PROMPT)
+        text = first + "".join(stream)
+
+        assert waiting.result(timeout=5) == text
+    assert len(fake_streams) == 1
+
+
+def test_closed_stream_releases_waiters(fake_llm, fake_streams):
+    stream = prompt_function.stream_completion(PROMPT)
+    next(stream)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        waiting = pool.submit(lambda: "".join(prompt_function.stream_completion(PROMPT)))
+        while fake_llm.get_stats()["coalesced"] < 1:
+            time.sleep(0.01)
+
+        # The reader gives up part way, so the waiter fails rather than hanging, and nothing half-finished is cached
+        stream.close()
+        with pytest.raises(RuntimeError):
+            waiting.result(timeout=5)
+
+    assert fake_llm.get_stats()["entries"] == 0
+
+
+def test_failed_stream_setup_releases_waiters(fake_llm, monkeypatch):
+    release = threading.Event()
+
+    def get_client():
+        # Fails like a missing API key, once a waiter has joined
+        release.wait(5)
+        raise ValueError("OPENAI_API_KEY not set in .env")
+
+    monkeypatch.setattr(prompt_function, "COMPLETION_BACKEND", "openai")
+    monkeypatch.setattr(prompt_function, "get_client", get_client)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        owner = pool.submit(lambda: "".join(prompt_function.stream_completion(PROMPT)))
+        while fake_llm.get_stats()["misses"] < 1:
+            time.sleep(0.01)
+        waiter = pool.submit(prompt_function.get_completion, PROMPT)
+        while fake_llm.get_stats()["coalesced"] < 1:
+            time.sleep(0.01)
+        release.set()
+
+        # The caller and the request waiting on it both see the failure instead of hanging
+        for future in [owner, waiter]:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+    assert fake_llm._in_flight == {}
+    assert fake_llm.get_stats()["entries"] == 0
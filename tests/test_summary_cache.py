@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from backend_files import prompt_function, summary_cache
+from backend_files.summary_cache import SummaryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A clock the test moves forward by hand
+    now = [1_000_000.0]
+    monkeypatch.setattr(summary_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_concurrent_callers_share_one_create(tmp_path):
+    cache = SummaryCache(tmp_path / "summaries.sqlite")
+    calls = []
+    release = threading.Event()
+
+    def create():
+        # Holds the completion open until every caller has arrived
+        calls.append(1)
+        release.wait(5)
+        return "summary"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get_or_create, "prompt", "model", 0.7, create) for _ in range(8)]
+        while cache.get_stats()["coalesced"] < 7:
+            time.sleep(0.01)
+        release.set()
+
+    assert [future.result() for future in futures] == ["summary"] * 8
+    assert len(calls) == 1
+    assert cache.get_stats()["misses"] == 1
+    assert cache.get_or_create("prompt", "model", 0.7, create) == "summary"
+    assert cache.hits == 1
+
+
+def test_waiting_callers_see_the_failure(tmp_path):
+    cache = SummaryCache(tmp_path / "summaries.sqlite")
+    started = threading.Event()
+
+    def create():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("backend down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        owner = pool.submit(cache.get_or_create, "prompt", "model", 0.7, create)
+        started.wait(5)
+        waiter = pool.submit(cache.get_or_create, "prompt", "model", 0.7, create)
+
+        for future in [owner, waiter]:
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    # The waiter joined the failing completion; nothing is stored, so the next caller tries again
+    assert cache.get_stats()["coalesced"] == 1
+    assert cache.get_stats()["entries"] == 0
+
+
+def stored(cache, prompt):
+    # The stored summary for a prompt, or None, leaving nothing claimed
+    text, entry, owner = cache.claim(prompt, "model", 0.7)
+    if owner:
+        cache.finish(prompt, "model", 0.7, entry)
+    return text
+
+
+def test_summary_expires_after_ttl(tmp_path, clock):
+    cache = SummaryCache(tmp_path / "summaries.sqlite", ttl=60)
+    cache.get_or_create("prompt", "model", 0.7, lambda: "summary")
+
+    clock[0] += 59
+    assert stored(cache, "prompt") == "summary"
+    clock[0] += 2
+    assert stored(cache, "prompt") is None
+    assert cache.get_stats()["expired"] == 1
+    assert cache._in_flight == {}
+
+
+def test_evicts_least_recently_used_over_entry_cap(tmp_path, clock):
+    cache = SummaryCache(tmp_path / "summaries.sqlite", max_entries=2)
+
+    cache.get_or_create("a", "model", 0.7, lambda: "A")
+    clock[0] += 1
+    cache.get_or_create("b", "model", 0.7, lambda: "B")
+    clock[0] += 1
+
+    # Reading "a" makes "b" the least recently used
+    assert stored(cache, "a") == "A"
+    clock[0] += 1
+    cache.get_or_create("c", "model", 0.7, lambda: "C")
+
+    assert stored(cache, "b") is None
+    assert stored(cache, "a") == "A"
+    assert stored(cache, "c") == "C"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_key_covers_model_and_temperature():
+    keys = {SummaryCache.make_key("prompt", model, temperature) for model in ["a", "b"] for temperature in [0, 0.7]}
+    assert len(keys) == 4
+
+
+def test_concurrent_completions_call_the_backend_once(fake_llm, monkeypatch):
+    calls = []
+    fake = prompt_function.fake_completion
+    monkeypatch.setattr(prompt_function, "fake_completion", lambda *args, **kwargs: calls.append(1) or fake(*args, **kwargs))
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        texts = list(pool.map(lambda _: prompt_function.get_completion("Summarise: burglary 120"), range(6)))
+
+    assert len(set(texts)) == 1
+    assert len(calls) == 1
+    assert fake_llm.get_stats()["misses"] == 1